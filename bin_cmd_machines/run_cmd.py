@@ -3,18 +3,26 @@
 import subprocess as sp
 from pathlib import Path
 import argparse
+import getpass
+import sys
 
 script_path = Path(__file__).resolve()
 bin_dir = script_path.parent
 root_dir = bin_dir.parent
 
+sys.path.insert(0, str(root_dir))
+from utils.fanout_utils import run_fan_out, print_host_line, format_result_table, DEFAULT_PER_HOST_LIMIT
+
 def return_parser():
     parse = argparse.ArgumentParser(description="Run command on multiple machines")
     parse.add_argument("-l", "--list-host-files", help="list of host files", action="store_true", required=False)
     parse.add_argument("-s", "--show-machines", help="show list of machines", action="store_true", required=False)
     parse.add_argument("-th", "--target-host", help="host file", required=False, default=None)
     parse.add_argument("-c", "--cmd", help="command to run", required=False, default=None)
-    parse.add_argument("-b", "--batch", type=int, help="batch size for running command", required=False, default=1)
+    parse.add_argument("-b", "--batch", type=int, help="maximum number of hosts running the command at once (0: all)", required=False, default=0)
+    parse.add_argument("-ph", "--per-host", type=int, help="maximum number of commands at once per host", required=False, default=DEFAULT_PER_HOST_LIMIT)
+    parse.add_argument("-to", "--timeout", type=float, help="kill the command after this many seconds", required=False, default=None)
+    parse.add_argument("-pw", "--password", help="ask for a password written to the standard input of the command (e.g., sudo -S)", action="store_true", required=False)
     return parse
 
 def list_host_files():
@@ -33,22 +41,7 @@ def show_host_machines(target_host):
     print(f"Number of machines in {target_host} file: {num_machines}")
 
 
-def start_program(target_host, cmd):
-    tot_cmd = f"stty -echo; printf 'Password: '; read PASS; stty echo; echo ${{PASS}} | parallel-ssh -h ~/.hosts/{target_host} -x -tt -t 0 -I \"{cmd}\""
-
-    # check if user wants to run the command
-    final_check = input(f"Are you sure you want to run the command \"{cmd}\" on {target_host}? (y/n): ")
-    if final_check.lower() != "y":
-        print("Exiting program")
-        exit(1)
-
-    try:
-        sp.run(tot_cmd, shell=True, check=True)
-    except sp.CalledProcessError as e:
-        print(f"Error: {e}")
-        exit(1)
-
-def start_program_batch(target_host, cmd, batch):
+def read_hosts(target_host):
     host_file = Path.home() / ".hosts" / target_host
     if not host_file.exists():
         print(f"Host file {host_file} does not exist.")
@@ -58,30 +51,32 @@ def start_program_batch(target_host, cmd, batch):
     if not hosts:
         print("No hosts found in the file.")
         exit(1)
-    batches = [hosts[i:i+batch] for i in range(0, len(hosts), batch)]
-    print(f"Total hosts: {len(hosts)}. Running in {len(batches)} batches of up to {batch}.")
-    final_check = input(f"Are you sure you want to run the command \"{cmd}\" on {len(hosts)} hosts in {len(batches)} batches? (y/n): ")
+    return hosts
+
+def start_program(target_host, cmd, batch, per_host, timeout, ask_password):
+    hosts = read_hosts(target_host)
+    max_concurrency = batch if batch > 0 else len(hosts)
+    print(f"Total hosts: {len(hosts)}. Running on up to {max_concurrency} hosts at once.")
+
+    # check if user wants to run the command
+    final_check = input(f"Are you sure you want to run the command \"{cmd}\" on {target_host}? (y/n): ")
     if final_check.lower() != "y":
         print("Exiting program")
         exit(1)
-    import tempfile
-    for idx, batch in enumerate(batches):
-        print(f"\n=== Running batch {idx+1}/{len(batches)} (hosts: {len(batch)}) ===")
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tf:
-            for h in batch:
-                tf.write(h + "\n")
-            tf.flush()
-            tot_cmd = f"stty -echo; printf 'Password: '; read PASS; stty echo; echo ${{PASS}} | parallel-ssh -h {tf.name} -x -tt -t 0 -I \"{cmd}\""
-            try:
-                sp.run(tot_cmd, shell=True, check=True)
-            except sp.CalledProcessError as e:
-                print(f"Error in batch {idx+1}: {e}")
-        # Optionally, remove the temp file
-        Path(tf.name).unlink(missing_ok=True)
-
-
-# stty -echo; printf "Password: "; read PASS; stty echo; echo "${PASS}" |
-# parallel-ssh -h ~/.hosts/fastera -x -tt -t 0 -I "sudo ls"
+
+    # the password is written to the standard input of each command (e.g., for sudo -S)
+    stdin_data = getpass.getpass("Password: ") + "\n" if ask_password else None
+    results = run_fan_out(
+        [(host, cmd) for host in hosts],
+        max_concurrency=max_concurrency, per_host_limit=per_host,
+        on_line=print_host_line, timeout_sec=timeout, stdin_data=stdin_data
+    )
+    print()
+    print(format_result_table(results))
+    if any(result["exit_code"] != 0 for result in results):
+        exit(1)
+
+
 if __name__ == "__main__":
     parse = return_parser()
     args = parse.parse_args()
@@ -91,6 +86,9 @@ if __name__ == "__main__":
     target_host = args.target_host
     cmd = args.cmd
     batch = args.batch
+    per_host = args.per_host
+    timeout = args.timeout
+    ask_password = args.password
 
     # show list of host files
     if list_hosts:
@@ -113,8 +111,5 @@ if __name__ == "__main__":
 
     # run command on target host
     if target_host is not None and cmd is not None:
-        if batch != 1:
-            start_program_batch(target_host, cmd, batch)
-        else:
-            start_program(target_host, cmd)
+        start_program(target_host, cmd, batch, per_host, timeout, ask_password)
     
\ No newline at end of file
@@ -1,6 +1,8 @@
-import os
-import subprocess as sp
-import multiprocessing
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.fanout_utils import run_fan_out, print_host_line, format_result_table
 
 # Servers list
 servers = {    
@@ -40,34 +42,19 @@ servers = {
     "faster51.swtv"
 }
 
-# Function to execute the zip command for each core on a server
-def execute_command(server, core_name):
-    try:
-        # Construct the command
-        command = [
-            "ssh", f"{server}",
-            f"cd /home/yangheechan/FL-dataset-generation-opencv_core/work/opencv_core/working_env/{server}/{core_name}/ && zip -rq coverage.zip coverage/"
-        ]
-        # Execute the command
-        sp.check_call(command)
+NUM_CORES = 16
 
-        # Print success message (for debugging purposes)
-        print(f"Executed on {server}:{core_name}")
-    except sp.CalledProcessError as e:
-        print(f"Error executing on {server}:{core_name} - {e}")
-import time
-# Function to handle each server with all core* directories
-def handle_server(server):
-    for i in range(0, 16):
-        core_name = f"core{i}"
-        print(f"Executing on {server}:{core_name}")
-        execute_command(server, core_name)
+# Command that zips the coverage of a core directory on a server
+def zip_command(server, core_name):
+    return f"cd /home/yangheechan/FL-dataset-generation-opencv_core/work/opencv_core/working_env/{server}/{core_name}/ && zip -rq coverage.zip coverage/"
 
-# Main function to execute multiprocessing with a maximum of 10 processes
+# Main function to zip the core* directories of all servers, at most 10 at once and one per server
 if __name__ == "__main__":
-    # Create a multiprocessing pool with a maximum of 10 processes
-    with multiprocessing.Pool(processes=10) as pool:
-        # Map the handle_server function to the servers list
-        pool.map(handle_server, servers)
+    tasks = [(server, zip_command(server, f"core{i}")) for server in sorted(servers) for i in range(0, NUM_CORES)]
+    results = run_fan_out(tasks, max_concurrency=10, per_host_limit=1, on_line=print_host_line)
+    for result in results:
+        if result["exit_code"] != 0:
+            print(f"Error executing on {result['host']}: {result['command']} (exit status {result['exit_code']})")
 
+    print(format_result_table(results))
     print("All commands executed.")
@@ -0,0 +1,250 @@
+import concurrent.futures
+import logging
+
+from lib.tracer import span
+
+LOGGER = logging.getLogger(__name__)
+
+class BugPipeline:
+    """
+    Commands that process one bug on a server (checkout and compile, mutant generation,
+    mutation testing, saving), run through an execute function (command -> bool),
+    e.g., over ssh by the ExtractorEngine or locally by a WorkerEngine.
+    """
+    def __init__(self, pid, experiment_label, parallel, d4j_dir, with_mutation_coverage=False, time_measurement=False,
+                 coverage_free=False, class_data_sharing=False, stream_results=False, code_dir=None, trace=False, profile_memory=False):
+        self.PID = pid
+        self.EL = experiment_label
+        self.PARALLEL = parallel
+        self.WITH_MUTATION_COVERAGE = with_mutation_coverage
+        self.TIME_MEASUREMENT = time_measurement
+        self.COVERAGE_FREE = coverage_free
+        self.CLASS_DATA_SHARING = class_data_sharing
+        self.STREAM_RESULTS = stream_results
+        # the python steps append their spans to the trace of the bug (see get_trace_file)
+        self.TRACE = trace
+        # the saver writes the memory profile of its stages next to the trace
+        self.PROFILE_MEMORY = profile_memory
+
+        self.D4J_DIR = d4j_dir
+        self.WORK_DIR = f"{self.D4J_DIR}{self.EL}/{self.PID}"
+        # where scripts/ and main.py are (the deployed copy in D4J_DIR by default)
+        self.CODE_DIR = code_dir or d4j_dir
+
+    def get_options(self):
+        """
+        Options of the pipeline (e.g., stored with a job of the job queue).
+        """
+        return {
+            "pid": self.PID,
+            "experiment_label": self.EL,
+            "parallel": self.PARALLEL,
+            "with_mutation_coverage": self.WITH_MUTATION_COVERAGE,
+            "time_measurement": self.TIME_MEASUREMENT,
+            "coverage_free": self.COVERAGE_FREE,
+            "class_data_sharing": self.CLASS_DATA_SHARING,
+            "stream_results": self.STREAM_RESULTS,
+            "trace": self.TRACE,
+            "profile_memory": self.PROFILE_MEMORY,
+        }
+
+    def get_log_file(self, bid, name):
+        return f"{self.WORK_DIR}/out_dir/{self.PID}-{bid}b-result/subjectInfo/{name}-exec.log"
+
+    def get_trace_file(self, bid):
+        # next to the result directory, which is zipped and removed by the saver
+        return f"{self.WORK_DIR}/out_dir/{self.PID}-{bid}b-trace.json"
+
+    def get_trace_flag(self):
+        return " --trace" if self.TRACE else ""
+
+    def prepare_dir(self, bid):
+        return f"mkdir -p {self.WORK_DIR}/out_dir/{self.PID}-{bid}b-result/subjectInfo"
+
+    def compile2prepare(self, bid):
+        return f"cd {self.CODE_DIR}scripts/ && bash 0_compile2prepare.sh {self.PID} {bid} {self.EL} > {self.get_log_file(bid, 'compile2prepare')} 2>&1"
+
+    def prepare_cds(self, bid):
+        return f"cd {self.CODE_DIR}scripts/ && bash 0_prepare_cds.sh {self.PID} {bid} {self.EL} > {self.get_log_file(bid, 'prepare-cds')} 2>&1"
+
+    def generate_mutants(self, bid):
+        return f"cd {self.CODE_DIR}scripts/ && bash run_pit.sh {self.PID} {bid} {self.EL} {self.PARALLEL}"
+
+    def conduct_mutation_testing(self, bid):
+        if self.TIME_MEASUREMENT:
+            mode_flags = " --time-measurement"
+        else:
+            mode_flags = ""
+            if self.COVERAGE_FREE:
+                mode_flags += " --coverage-free"
+            if self.STREAM_RESULTS:
+                mode_flags += " --stream-results"
+        return f"cd {self.CODE_DIR} && python3 main.py -pid {self.PID} -bid {bid} -el {self.EL} -p {self.PARALLEL} --mutation-testing{mode_flags}{self.get_trace_flag()} -d > {self.get_log_file(bid, 'mutation-testing')} 2>&1"
+
+    def prepare_shards(self, bid):
+        return f"cd {self.CODE_DIR} && python3 main.py -pid {self.PID} -bid {bid} -el {self.EL} -p {self.PARALLEL} --mutation-testing --shard-prepare{self.get_shard_flags()} -d > {self.get_log_file(bid, 'shard-prepare')} 2>&1"
+
+    def conduct_shard(self, bid, shard_index, num_shards):
+        return f"cd {self.CODE_DIR} && python3 main.py -pid {self.PID} -bid {bid} -el {self.EL} -p {self.PARALLEL} --mutation-testing --shard {shard_index}/{num_shards}{self.get_shard_flags()} -d > {self.get_log_file(bid, f'mutation-testing-shard{shard_index}')} 2>&1"
+
+    def merge_shards(self, bid, num_shards):
+        return f"cd {self.CODE_DIR} && python3 main.py -pid {self.PID} -bid {bid} -el {self.EL} --mutation-testing --merge-shards {num_shards}{self.get_shard_flags()} -d > {self.get_log_file(bid, 'merge-shards')} 2>&1"
+
+    def get_shard_flags(self):
+        # results of shards are merged before saving, they are never streamed
+        return (" --coverage-free" if self.COVERAGE_FREE else "") + self.get_trace_flag()
+
+    def copy_to_server(self, bid, server):
+        """
+        Command (run where the bug was prepared) that copies its checkout and the prepared part of its result directory
+        (subjectInfo and the baseline) to another server.
+        """
+        result_dir = f"{self.WORK_DIR}/out_dir/{self.PID}-{bid}b-result"
+        # the core directories and mutant results of shard 0 are written while the bug is copied
+        prepared = " ".join(
+            f"--include '{pattern}'" for pattern in
+            ["/subjectInfo/***", "/coverage_results/", "/coverage_results/baseline/***", "/coverage_results/baseline_outcomes/***"]
+        )
+        return (
+            f"rsync -a --exclude '/{self.PID}-{bid}b/core[0-9]*' {self.WORK_DIR}/{self.PID}-{bid}b {server}:{self.WORK_DIR}/ && "
+            f"rsync -a {prepared} --exclude '*' {result_dir}/ {server}:{result_dir}/"
+        )
+
+    def copy_shard_results_to_server(self, bid, shard_index, server):
+        """
+        Command (run on a shard) that copies the results of the finished mutants of the shard
+        (listed by MutationTestingEngine.save_shard_results_list) and its ledger to the server of shard 0.
+        """
+        result_dir = f"{self.WORK_DIR}/out_dir/{self.PID}-{bid}b-result"
+        return (
+            f"rsync -a -r --files-from={result_dir}/subjectInfo/shard_results.shard{shard_index}.txt {result_dir}/coverage_results/ {server}:{result_dir}/coverage_results/ && "
+            f"rsync -a {result_dir}/subjectInfo/mutant_ledger.shard{shard_index}.jsonl {server}:{result_dir}/subjectInfo/"
+        )
+
+    def clean(self, bid):
+        return f"rm -rf {self.WORK_DIR}/{self.PID}-{bid}b {self.WORK_DIR}/out_dir/{self.PID}-{bid}b-result"
+
+    def measure_expected_time(self, bid): # DEPRECATED
+        return f"cd {self.CODE_DIR}scripts/ && python3 measureExpectedTime.py --pid {self.PID} --bid {bid} --num-threads {self.PARALLEL}"
+
+    def run_pit(self, bid): # DEPRECATED
+        return f"cd {self.CODE_DIR}scripts/ && python3 run_pit_all.py --pid {self.PID} --bid {bid} --num-threads {self.PARALLEL}"
+
+    def save_results(self, bid):
+        mode_flags = " --time-measurement" if self.TIME_MEASUREMENT else ""
+        if self.PROFILE_MEMORY:
+            mode_flags += " --profile-memory"
+        return f"cd {self.CODE_DIR} && python3 main.py -pid {self.PID} -bid {bid} -el {self.EL} --save-results{mode_flags}{self.get_trace_flag()} -d > {self.get_log_file(bid, 'saver')} 2>&1"
+
+    def saves_during_mutation_testing(self):
+        # streamed results are saved during mutation testing
+        return self.STREAM_RESULTS and self.WITH_MUTATION_COVERAGE and not self.TIME_MEASUREMENT
+
+    def cancel(self, bid):
+        """
+        Command that kills the processes of a bug and deletes its directories (e.g., a cancelled duplicate).
+        The patterns start with a bracket expression so that pkill does not match its own shell.
+        """
+        repo_dir = f"{self.WORK_DIR}/{self.PID}-{bid}b"
+        patterns = [
+            f"[-]pid {self.PID} -bid {bid} -el {self.EL} ",
+            f"[{repo_dir[0]}]{repo_dir[1:]}",
+            f"[r]un_pit.sh {self.PID} {bid} {self.EL} ",
+            f"[0]_compile2prepare.sh {self.PID} {bid} {self.EL}",
+        ]
+        kills = "; ".join([f'pkill -9 -f -- "{pattern}"' for pattern in patterns])
+        return f"{kills}; {self.clean(bid)}"
+
+    def run(self, bid, execute, label="", is_cancelled=None, before_save=None, failed_steps=None, telemetry=None, server=None):
+        """
+        Process a bug.
+        :param bid: Bug ID.
+        :param execute: Function that executes a command and returns True on success.
+        :param label: Where the bug is processed (for logging, e.g., the server).
+        :param is_cancelled: Function checked before each step, the bug is abandoned when it returns True.
+        :param before_save: Function called before saving, the results are not saved when it returns False.
+        :param failed_steps: List that receives (step name, command) of the failed steps, the log of a step is get_log_file(bid, name).
+        :param telemetry: Telemetry that receives the start and end of each step (on server).
+        :return: True if the bug was processed, False otherwise.
+        """
+        def step(name, command):
+            if is_cancelled is not None and is_cancelled():
+                return False
+            if telemetry is None or name is None:
+                with span(name or "step", "step", bid=bid):
+                    res = execute(command)
+            else:
+                telemetry.emit("stage_started", name, bid, server)
+                with span(name, "step", bid=bid) as step_span:
+                    res = execute(command)
+                telemetry.emit("stage_finished", name, bid, server, duration_sec=step_span.duration_sec, success=bool(res))
+            if not res and name is not None and failed_steps is not None:
+                failed_steps.append((name, command))
+            return res
+
+        res = step("prepare-dir", self.prepare_dir(bid))
+        res = step("compile2prepare", self.compile2prepare(bid))
+        if self.CLASS_DATA_SHARING and not step(None, self.prepare_cds(bid)):
+            # the scripts run without the archive when it is missing (not a failed step)
+            LOGGER.warning(f"{label} failed to prepare the CDS archive for bug {bid}")
+        if self.WITH_MUTATION_COVERAGE:
+            res = step("pit", self.generate_mutants(bid))
+            res = step("mutation-testing", self.conduct_mutation_testing(bid))
+        else:
+            res = step("measure-expected-time", self.measure_expected_time(bid))
+            res = step("run-pit", self.run_pit(bid))
+        if is_cancelled is not None and is_cancelled():
+            return False
+        if before_save is not None and not before_save(res):
+            return False
+        if res and not self.saves_during_mutation_testing():
+            res = step("saver", self.save_results(bid))
+        return res
+
+    def run_sharded(self, bid, servers, execute, label=""):
+        """
+        Process a bug on several servers: the first server prepares the bug (checkout, mutants, baseline)
+        and tests shard 0, every other server gets a copy of the prepared bug, tests its shard and sends
+        its results back; the first server then merges the shards and saves the results.
+        :param bid: Bug ID.
+        :param servers: Servers of the shards (the first one prepares and saves the bug).
+        :param execute: Function that executes a command on a server (command, server) and returns True on success.
+        :param label: Where the bug is processed (for logging).
+        :return: True if the bug was processed, False otherwise.
+        """
+        primary = servers[0]
+        num_shards = len(servers)
+
+        res = execute(self.prepare_dir(bid), primary)
+        res = execute(self.compile2prepare(bid), primary)
+        if self.CLASS_DATA_SHARING and not execute(self.prepare_cds(bid), primary):
+            LOGGER.warning(f"{label} failed to prepare the CDS archive for bug {bid}")
+        res = execute(self.generate_mutants(bid), primary)
+        if not execute(self.prepare_shards(bid), primary):
+            LOGGER.warning(f"{label} failed to prepare the shards of bug {bid}")
+            return False
+
+        def run_shard(shard_index, server):
+            if shard_index == 0:
+                return execute(self.conduct_shard(bid, 0, num_shards), primary)
+            try:
+                return (
+                    execute(f"mkdir -p {self.WORK_DIR}/out_dir", server)
+                    and execute(self.copy_to_server(bid, server), primary)
+                    and execute(self.conduct_shard(bid, shard_index, num_shards), server)
+                    and execute(self.copy_shard_results_to_server(bid, shard_index, primary), server)
+                )
+            finally:
+                execute(self.clean(bid), server)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_shards) as executor:
+            futures = {executor.submit(run_shard, shard_index, server): shard_index for shard_index, server in enumerate(servers)}
+            for future in concurrent.futures.as_completed(futures):
+                if not future.result():
+                    # the mutants of a failed shard are saved without results (like failed mutants)
+                    LOGGER.warning(f"{label} failed shard {futures[future]}/{num_shards} of bug {bid}")
+
+        res = execute(self.merge_shards(bid, num_shards), primary)
+        if res:
+            res = execute(self.save_results(bid), primary)
+        return res
@@ -0,0 +1,98 @@
+import heapq
+import itertools
+import logging
+
+from lib.task_scheduler import TaskScheduler
+
+LOGGER = logging.getLogger(__name__)
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class ClusterSimulator:
+    """
+    Replays tasks through the TaskScheduler against virtual workers (e.g., slots of servers with bugs,
+    or cores with mutants) with a virtual clock: each worker takes its next task from the scheduler when
+    it finishes the previous one, exactly as the workers of the ExtractorEngine and MutationTestingEngine do,
+    but a task takes its duration divided by the speed and cores of the worker without running anything.
+    """
+    def __init__(self, workers, policy="fifo", work_stealing=False, worker_speeds=None, cores_per_worker=1, straggler_factor=1.5):
+        self.workers = list(workers)
+        self.policy = policy
+        self.work_stealing = work_stealing
+        self.worker_speeds = {worker: (worker_speeds or {}).get(worker, 1.0) for worker in self.workers}
+        self.cores_per_worker = cores_per_worker
+        self.straggler_factor = straggler_factor
+
+    def run(self, task2cost, task2duration=None):
+        """
+        Simulate the tasks.
+        :param task2cost: Mapping of task IDs to the cost estimated by the scheduler (in seconds on one core).
+        :param task2duration: Mapping of task IDs to their actual duration (in seconds on one core), the estimated cost by default.
+        :return: Report of the scheduler (see TaskScheduler.get_report, with tasks) with the simulated lower bound and stragglers.
+        """
+        task2duration = task2duration or task2cost
+        clock = VirtualClock()
+        scheduler = TaskScheduler(
+            self.workers, policy=self.policy, work_stealing=self.work_stealing,
+            worker_speeds=self.worker_speeds, clock=clock
+        )
+        for task_id, cost in task2cost.items():
+            scheduler.submit(task_id, cost=cost)
+        scheduler.start()
+
+        events = []  # (finish time, sequence number, worker, task ID)
+        sequence = itertools.count()
+        worker2out_of_work = {}
+
+        def dispatch(worker):
+            task = scheduler.get_task(worker)
+            if task is None:
+                worker2out_of_work[worker] = clock.now
+                return
+            task_id, _ = task
+            duration = task2duration[task_id] / (self.worker_speeds[worker] * self.cores_per_worker)
+            heapq.heappush(events, (clock.now + duration, next(sequence), worker, task_id))
+
+        for worker in self.workers:
+            dispatch(worker)
+        while events:
+            finish_time, _, worker, task_id = heapq.heappop(events)
+            clock.now = finish_time
+            scheduler.task_done(worker, task_id)
+            dispatch(worker)
+
+        report = scheduler.get_report(include_tasks=True)
+        capacity = sum(self.worker_speeds.values()) * self.cores_per_worker
+        max_speed = max(self.worker_speeds.values(), default=1.0) * self.cores_per_worker
+        report["lower_bound_sec"] = max(
+            sum(task2duration.values()) / capacity if capacity > 0 else 0.0,
+            max(task2duration.values(), default=0.0) / max_speed
+        )
+        # time from the first worker running out of work to the end: the tail left by long or slow tasks
+        report["tail_sec"] = report["makespan_sec"] - min(worker2out_of_work.values(), default=0.0)
+        report["stragglers"] = self.get_straggler_stats(report["tasks"])
+        return report
+
+    def get_straggler_stats(self, tasks):
+        """
+        Stragglers among the finished tasks: tasks whose duration/cost ratio exceeds straggler_factor x the median ratio
+        (as StragglerTracker decides which bugs to duplicate).
+        """
+        ratios = sorted(task["duration_sec"] / task["cost"] for task in tasks if task["cost"] > 0)
+        if not ratios:
+            return {"num_stragglers": 0, "max_slowdown": 0.0, "task_ids": []}
+        median_ratio = ratios[len(ratios) // 2]
+        stragglers = [
+            (task["duration_sec"] / task["cost"] / median_ratio, task["task_id"])
+            for task in tasks if task["cost"] > 0 and task["duration_sec"] / task["cost"] > self.straggler_factor * median_ratio
+        ]
+        return {
+            "num_stragglers": len(stragglers),
+            "max_slowdown": ratios[-1] / median_ratio if median_ratio > 0 else 0.0,
+            "task_ids": [task_id for _, task_id in sorted(stragglers, reverse=True)],
+        }
@@ -1,5 +1,7 @@
 from lib.database import CRUD
 from utils.consructor_utils import *
+from lib.tracer import span, traced, start_tracing, stop_tracing, name_thread
+from lib.memory_profiler import start_profiling, stop_profiling, profile_task
 
 import json
 import os
@@ -13,10 +15,14 @@ from dotenv import load_dotenv
 LOGGER = logging.getLogger(__name__)
 
 class ConstructorEngine:
-    def __init__(self, pid, experiment_label, parallel=50):
+    def __init__(self, pid, experiment_label, parallel=50, trace=False, profile_memory=False, memory_budget_gb=0):
         self.PID = pid
         self.EL = experiment_label
         self.PARALLEL = parallel
+        self.TRACE = trace
+        self.PROFILE_MEMORY = profile_memory
+        # soft budget: new tasks wait while the RSS is close to it (0 for no budget)
+        self.MEMORY_BUDGET_GB = memory_budget_gb
 
         load_dotenv()
         self.os_copy = os.environ.copy()
@@ -36,6 +42,8 @@ class ConstructorEngine:
         self.OUT_DIR = f"{self.RESEARCH_DATA}/{self.EL}/{self.PID}/experiment_raw_results"
         if not os.path.exists(self.OUT_DIR):
             os.makedirs(self.OUT_DIR, exist_ok=True)
+        self.TRACE_FILE = f"{self.OUT_DIR}/trace.json"
+        self.MEMORY_PROFILE_FILE = f"{self.OUT_DIR}/memory_profile.json"
 
         curr_path = os.getcwd()
         exp_config_file = os.path.join(curr_path, ".experiment_config")
@@ -43,6 +51,20 @@ class ConstructorEngine:
             self.EXP_CONFIG = json.load(f)
 
     def run(self):
+        if self.TRACE:
+            start_tracing(self.TRACE_FILE, f"constructor {self.PID}")
+        if self.PROFILE_MEMORY or self.MEMORY_BUDGET_GB:
+            start_profiling(
+                self.MEMORY_PROFILE_FILE, budget_mb=self.MEMORY_BUDGET_GB * 1024 if self.MEMORY_BUDGET_GB else None,
+                trace_allocations=self.PROFILE_MEMORY
+            )
+        try:
+            self.construct()
+        finally:
+            stop_profiling()
+            stop_tracing()
+
+    def construct(self):
         # Get the lines in DB
         self.BID2FID = get_bid2fid(self.DB, self.PID, self.EL)
 
@@ -52,6 +74,7 @@ class ConstructorEngine:
         self.save_ground_truth()
         self.write_suspiciousness_scores()
 
+    @traced()
     def save_ground_truth(self):
         # Check if ground truth already exists
         result = self.DB.value_exists(
@@ -171,6 +194,7 @@ class ConstructorEngine:
         
         def worker(task_queue, worker_id):
             """Worker function that processes tasks from a shared queue"""
+            name_thread(f"worker{worker_id}")
             while True:
                 try:
                     task = task_queue.get(timeout=1)
@@ -181,7 +205,8 @@ class ConstructorEngine:
                     LOGGER.info(f"Worker {worker_id}: Starting repeat {rid}, bug ID {bid}")
                     
                     try:
-                        self._process_single_task(rid, bid, fid)
+                        with profile_task(f"repeat{rid}-{bid}"), span("task", rid=rid, bid=bid):
+                            self._process_single_task(rid, bid, fid)
                         LOGGER.info(f"Worker {worker_id}: Successfully processed repeat {rid}, bug ID {bid}")
                     except Exception as e:
                         LOGGER.error(f"Worker {worker_id}: Failed to process repeat {rid}, bug ID {bid}: {e}")
@@ -234,28 +259,29 @@ class ConstructorEngine:
         rid_dir = f"{self.OUT_DIR}/repeat_{rid}"
         
         # Create a thread-local database connection for thread safety
-        db_start = time.time()
-        thread_db = CRUD(
-            host=self.os_copy.get("DB_HOST"),
-            port=self.os_copy.get("DB_PORT"),
-            user=self.os_copy.get("DB_USER"),
-            password=self.os_copy.get("DB_PASSWORD"),
-            database=self.os_copy.get("DB"),
-            slack_channel=self.os_copy.get("SLACK_CHANNEL"),
-            slack_token=self.os_copy.get("SLACK_TOKEN"),
-        )
-        db_connection_time = time.time() - db_start
+        with span("connect_db") as db_span:
+            thread_db = CRUD(
+                host=self.os_copy.get("DB_HOST"),
+                port=self.os_copy.get("DB_PORT"),
+                user=self.os_copy.get("DB_USER"),
+                password=self.os_copy.get("DB_PASSWORD"),
+                database=self.os_copy.get("DB"),
+                slack_channel=self.os_copy.get("SLACK_CHANNEL"),
+                slack_token=self.os_copy.get("SLACK_TOKEN"),
+            )
+        db_connection_time = db_span.duration_sec
         LOGGER.debug(f"Repeat {rid}, Bug ID {bid}: Database connection established in {db_connection_time:.2f}s")
         
         try:
             output_file = os.path.join(rid_dir, f"{bid}_lineIdx2lineData.pkl")
 
-            if not os.path.exists(output_file):
-                # Get the lines in DB using thread-local connection
-                lineIdx2lineData = get_lineIdx2lineData(thread_db, self.BID2FID, bid)
-            else:
-                with open(output_file, "rb") as f:
-                    lineIdx2lineData = pickle.load(f)
+            with span("load_lineIdx2lineData"):
+                if not os.path.exists(output_file):
+                    # Get the lines in DB using thread-local connection
+                    lineIdx2lineData = get_lineIdx2lineData(thread_db, self.BID2FID, bid)
+                else:
+                    with open(output_file, "rb") as f:
+                        lineIdx2lineData = pickle.load(f)
 
             # check if "fault_line" exists as key of first item of lineIdx2lineData
             first_key = next(iter(lineIdx2lineData))
@@ -264,10 +290,11 @@ class ConstructorEngine:
                 assign_groundtruth(thread_db, self.PID, bid, lineIdx2lineData)
 
             # Measure sbfl and mbfl scores using thread-local connection
-            measure_scores(self.EXP_CONFIG, thread_db, fid, lineIdx2lineData, rid=rid)
+            with span("measure_scores"):
+                measure_scores(self.EXP_CONFIG, thread_db, fid, lineIdx2lineData, rid=rid)
 
             # Save the results to file as pickled JSON
-            with open(output_file, "wb") as f:
+            with span("pickle_lineIdx2lineData"), open(output_file, "wb") as f:
                 pickle.dump(lineIdx2lineData, f)
             
             total_time = time.time() - start_time
@@ -141,6 +141,19 @@ class CRUD(Database):
         self.safe_execute(query, values)
         self.commit()
 
+    def insert_many(self, table_name, columns, rows, page_size=100):
+        """
+        Insert rows with one statement per page and a single commit.
+        """
+        if not rows:
+            return
+        placeholders = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        for start in range(0, len(rows), page_size):
+            page = rows[start:start + page_size]
+            query = f"INSERT INTO {table_name} ({columns}) VALUES " + ", ".join([placeholders] * len(page))
+            self.safe_execute(query, [value for row in page for value in row])
+        self.commit()
+
     def read(self, table_name, columns="*", conditions={}, special=""):
         query = f"SELECT {columns} FROM {table_name}"
         if conditions:
@@ -1,24 +1,85 @@
 from lib.database import CRUD
+from lib.task_scheduler import TaskScheduler, SCHEDULING_POLICIES
+from lib.cluster_simulator import ClusterSimulator
+from lib.bug_pipeline import BugPipeline
+from lib.job_queue import JobQueue
+from lib.straggler_tracker import StragglerTracker
+from lib.retry_tracker import RetryTracker, BUG_STATES
+from lib.server_health import ServerHealth
+from lib.telemetry import Telemetry
+from lib.tracer import span, start_tracing, stop_tracing, name_thread
 
 from utils.file_utils import *
 from utils.general_utils import *
 from utils.command_utils import *
+from utils.scheduling_utils import estimate_bug_costs, compute_server_slots, partition_cores, format_cpu_list, synthetic_bug_costs, perturb_costs
+from utils.failure_utils import classify_failure, FAILURE_TYPES
+from utils.health_utils import health_probe_command, parse_health_probe
+from utils.fanout_utils import run_fan_out, format_result_table, DEFAULT_PER_HOST_LIMIT
 
 import os
+import json
+import time
+import shutil
+import shlex
+import tempfile
 import concurrent.futures
 import logging
-import queue
 from dotenv import load_dotenv
 
 LOGGER = logging.getLogger(__name__)
 
 class ExtractorEngine:
-    def __init__(self, pid, parallel=10, experiment_label=None, with_mutation_coverage=False, time_measurement=False):
+    # resources of one bug, used to size the slots of a server (see get_server_slots)
+    PIT_MEMORY_GB = 20      # -Xmx20g of the PIT scripts
+    CORE_MEMORY_GB = 4      # MaxHeapSize of a GZoltar/test JVM (scripts/setup_d4j.sh), one per core
+    BUG_DISK_GB = 10
+
+    # speculative duplicates of stragglers (see StragglerTracker)
+    STRAGGLER_FACTOR = 1.5
+    STRAGGLER_MIN_ELAPSED_SEC = 600
+    # duplicates rerun the whole bug (sharding only applies to the bugs scheduled with --num-shards)
+    MAX_DUPLICATES = 1
+    # admission of servers (see ServerHealth)
+    MIN_FREE_DISK_GB = 50
+    MAX_LOAD_PER_CORE = 2.0
+    HEALTH_PROBE_INTERVAL_SEC = 300
+
+    # name of this machine with the local backend
+    LOCAL_SERVER = "localhost"
+    # slots of a remote server, each runs one ssh session at a time over the shared control connection
+    # (sshd allows MaxSessions 10), the remaining sessions are left to health probes, cancels and log reads
+    MAX_SLOTS_PER_SERVER = DEFAULT_PER_HOST_LIMIT - 2
+
+    # an idle slot checks for bugs to retry and stragglers to duplicate this often
+    IDLE_POLL_SEC = 60
+
+    # retries of bugs that failed with a transient failure (see RetryTracker)
+    MAX_BUG_RETRIES = 2
+    FAILURE_LOG_LINES = 50
+
+    def __init__(self, pid, *, parallel=10, experiment_label=None, with_mutation_coverage=False, time_measurement=False, coverage_free=False, class_data_sharing=False, stream_results=False, bug_scheduler="fifo", speculate=False, num_shards=1, num_sharded_bugs=0, retry_failed=False, local=False, trace=False, profile_memory=False):
         self.PID = pid
         self.PARALLEL = parallel
         self.EL = experiment_label
         self.WITH_MUTATION_COVERAGE = with_mutation_coverage
         self.TIME_MEASUREMENT = time_measurement
+        self.COVERAGE_FREE = coverage_free
+        self.CLASS_DATA_SHARING = class_data_sharing
+        self.STREAM_RESULTS = stream_results
+        self.BUG_SCHEDULER = bug_scheduler
+        self.TRACE = trace
+        self.PROFILE_MEMORY = profile_memory
+        # local backend: the bugs run on this machine, without ssh or deployment
+        self.LOCAL = local
+        self.slot2cores = {}
+        # shards copy bugs between servers
+        self.NUM_SHARDS = num_shards if not (time_measurement or local) else 1
+        self.NUM_SHARDED_BUGS = num_sharded_bugs
+        # duplicates would save streamed results twice
+        self.SPECULATE = speculate and not (stream_results and with_mutation_coverage and not time_measurement)
+        if speculate and not self.SPECULATE:
+            LOGGER.warning("Speculative duplicates are disabled with --stream-results.")
 
         load_dotenv()
         self.os_copy = os.environ.copy()
@@ -38,65 +99,161 @@ class ExtractorEngine:
         self.UTILS_DIR = self.CURR_ROOT_PATH + "/utils"
         self.SCRIPTS_DIR = self.CURR_ROOT_PATH + "/scripts"
         self.MAIN_SCRIPT = self.CURR_ROOT_PATH + "/main.py"
+        self.REPORTS_DIR = self.CURR_ROOT_PATH + "/reports"
 
-        self.SERVER_LIST = get_servers_list(self.os_copy.get("SERVER_LIST_FILE"))
+        if self.LOCAL:
+            self.SERVER_LIST = [self.LOCAL_SERVER]
+        else:
+            self.SERVER_LIST = get_servers_list(self.os_copy.get("SERVER_LIST_FILE"))
         self.BID_LIST = get_active_bugs_list(self.PID, self.os_copy.get("D4J_HOME"))
+        if retry_failed:
+            failed_bids = self.get_failed_bugs()
+            self.BID_LIST = [bug_id for bug_id in self.BID_LIST if str(bug_id) in failed_bids]
+            LOGGER.info(f"Retrying the {len(self.BID_LIST)} failed bugs of the last run: {self.BID_LIST}")
 
         self.REMOTE_D4J_DIR = self.os_copy.get("SERVER_HOME") + f"defects4j/"
         self.REMOTE_WORK_DIR = f"{self.REMOTE_D4J_DIR}{self.EL}/{self.PID}"
 
+        self.TELEMETRY = Telemetry(
+            self.EL, self.PID, db=self.DB,
+            jsonl_file=os.path.join(self.REPORTS_DIR, f"progress_{self.PID}_{self.EL}.jsonl")
+        )
+
+        self.PIPELINE = BugPipeline(
+            self.PID, self.EL, self.PARALLEL, self.REMOTE_D4J_DIR,
+            with_mutation_coverage=self.WITH_MUTATION_COVERAGE,
+            time_measurement=self.TIME_MEASUREMENT,
+            coverage_free=self.COVERAGE_FREE,
+            class_data_sharing=self.CLASS_DATA_SHARING,
+            stream_results=self.STREAM_RESULTS,
+            # the local backend runs the scripts of this repository
+            code_dir=self.CURR_ROOT_PATH + "/" if self.LOCAL else None,
+            trace=self.TRACE,
+            profile_memory=self.PROFILE_MEMORY
+        )
+
     def run(self):
-        self.prepare_for_testing()
-        self.run_mutation_testing()
+        if self.TRACE:
+            # the spans of the bugs and their steps on each slot (the servers trace the steps they run, see BugPipeline.get_trace_file)
+            os.makedirs(self.REPORTS_DIR, exist_ok=True)
+            start_tracing(os.path.join(self.REPORTS_DIR, f"trace_{self.PID}_{self.EL}.json"), f"extractor {self.PID} {self.EL}")
+        try:
+            self.prepare_for_testing()
+            self.run_mutation_testing()
+        finally:
+            stop_tracing()
+            if not self.LOCAL:
+                for server in self.SERVER_LIST:
+                    close_control_connection(server)
+
+    def simulate(self, num_synthetic_bugs=0, noise_sigma=0.3, seed=0):
+        """
+        Simulate the bug schedule of each policy on the slots of the servers (see ClusterSimulator) without running anything:
+        the bugs of the project with the costs estimated from d4j_time_measurement_info, or num_synthetic_bugs synthetic bugs,
+        take their cost perturbed by a log-normal error (noise_sigma) on PARALLEL cores.
+        :return: Mapping of policies to simulation reports.
+        """
+        slot2server = self.get_server_slots()
+        server_speeds = self.get_server_speeds()
+        if num_synthetic_bugs > 0:
+            bid2cost = synthetic_bug_costs(num_synthetic_bugs, seed=seed)
+        else:
+            bid2cost, _ = self.get_bug_costs(self.BID_LIST)
+        bid2duration = perturb_costs(bid2cost, noise_sigma, seed)
+
+        policy2report = {}
+        for policy in SCHEDULING_POLICIES:
+            simulator = ClusterSimulator(
+                slot2server.keys(), policy=policy, work_stealing=policy == "lpt",
+                worker_speeds={slot: server_speeds.get(server, 1.0) for slot, server in slot2server.items()},
+                cores_per_worker=self.PARALLEL, straggler_factor=self.STRAGGLER_FACTOR
+            )
+            report = simulator.run(bid2cost, bid2duration)
+            report.pop("tasks")
+            policy2report[policy] = report
+            LOGGER.info(
+                f"Simulated {policy}: makespan {report['makespan_sec']:.1f}s (lower bound {report['lower_bound_sec']:.1f}s), "
+                f"utilization {report['utilization']:.2%}, tail {report['tail_sec']:.1f}s, {report['stragglers']['num_stragglers']} stragglers."
+            )
+
+        os.makedirs(self.REPORTS_DIR, exist_ok=True)
+        report_file = os.path.join(self.REPORTS_DIR, f"simulation_{self.PID}_{self.EL}.json")
+        with open(report_file, 'w') as f:
+            json.dump({"num_bugs": len(bid2cost), "num_slots": len(slot2server), "noise_sigma": noise_sigma, "policies": policy2report}, f, indent=2)
+        LOGGER.info(f"Simulation report: {report_file}")
+        return policy2report
+
+    def execute(self, command, server):
+        """
+        Execute a command on a server (on this machine with the local backend).
+        :return: True if command execution is successful, False otherwise.
+        """
+        if self.LOCAL:
+            return execute_local_command(command)
+        return execute_command(command, server)
+
+    def run_on_slot(self, command, slot, server):
+        """
+        Execute a step of a bug on a slot, with the local backend pinned to the cores of the slot.
+        :return: Exit status of the command.
+        """
+        if not self.LOCAL:
+            return run_command(command, server)
+        if slot in self.slot2cores and shutil.which("taskset"):
+            command = f"taskset -c {format_cpu_list(self.slot2cores[slot])} sh -c {shlex.quote(command)}"
+        return run_local_command(command)
+
+    def read_output(self, command, server):
+        if self.LOCAL:
+            return read_local_output(command)
+        return read_remote_output(command, server)
+
+    def enqueue_jobs(self):
+        """
+        Deploy to the servers, queue the bugs in the job queue (longest estimated bug first with lpt)
+        and start a worker (main.py --worker) per slot of each server. The workers pull bugs from the
+        queue on their own, so this process can exit and further workers can join later.
+        """
+        try:
+            self.prepare_for_testing()
+
+            bid2priority = {bug_id: 0.0 for bug_id in self.BID_LIST}
+            if self.BUG_SCHEDULER == "lpt":
+                bid2priority, _ = self.get_bug_costs(self.BID_LIST)
+            job_queue = JobQueue(self.DB)
+            job_queue.create_table()
+            job_queue.enqueue(self.PID, self.EL, bid2priority, self.PIPELINE.get_options())
+            self.TELEMETRY.emit("run_started", num_bugs=len(self.BID_LIST), bids=list(self.BID_LIST), num_servers=len(self.SERVER_LIST))
+
+            self.start_workers()
+        finally:
+            for server in self.SERVER_LIST:
+                close_control_connection(server)
+
+    def start_workers(self):
+        slot2server = self.get_server_slots()
+        tasks = []
+        for slot, server in slot2server.items():
+            slot_name = slot.split("/")[-1]
+            log_file = f"{self.REMOTE_WORK_DIR}/worker-{slot_name}.log"
+            command = f"mkdir -p {self.REMOTE_WORK_DIR} && cd {self.REMOTE_D4J_DIR} && setsid nohup python3 main.py -el {self.EL} --worker -d > {log_file} 2>&1 < /dev/null &"
+            tasks.append((server, command))
+
+        results = run_fan_out(tasks)
+        for (slot, server), result in zip(slot2server.items(), results):
+            if result["exit_code"] == 0:
+                LOGGER.info(f"Started worker {slot} on {server}")
+            else:
+                LOGGER.error(f"Failed to start worker {slot} on {server}: exit status {result['exit_code']}")
+        LOGGER.info(f"Workers:\n{format_result_table(results)}")
 
     def prepare_for_testing(self, batch_size=5):
         # 1. Initialize file system in remote servers in parallel batches
-        def prepare_server(server):
+        def prepare_server(server, archive_path, archive_hash):
+            open_control_connection(server)
             make_directory(self.REMOTE_WORK_DIR, server)
-
-            scripts_dir = self.REMOTE_D4J_DIR + "scripts/"
-
-            # send 0_compile2prepare.sh
-            send_file(self.SCRIPTS_DIR + "/0_compile2prepare.sh", scripts_dir, server)
-            chmod_file(scripts_dir + "0_compile2prepare.sh", "777", server)
-
-            if self.WITH_MUTATION_COVERAGE:
-                # send run_pit.sh
-                send_file(self.SCRIPTS_DIR + "/run_pit.sh", scripts_dir, server)
-                chmod_file(scripts_dir + "run_pit.sh", "777", server)
-
-                # send 1_list_tests.sh
-                send_file(self.SCRIPTS_DIR + "/1_list_tests.sh", scripts_dir, server)
-                chmod_file(scripts_dir + "1_list_tests.sh", "777", server)
-
-                # send 2_instrument.sh
-                send_file(self.SCRIPTS_DIR + "/2_instrument.sh", scripts_dir, server)
-                chmod_file(scripts_dir + "2_instrument.sh", "777", server)
-
-                # send 3_execute_with_coverage.sh
-                send_file(self.SCRIPTS_DIR + "/3_execute_with_coverage.sh", scripts_dir, server)
-                chmod_file(scripts_dir + "3_execute_with_coverage.sh", "777", server)
-
-                # send 4_process_cov.sh
-                send_file(self.SCRIPTS_DIR + "/4_process_cov.sh", scripts_dir, server)
-                chmod_file(scripts_dir + "4_process_cov.sh", "777", server)
-            else:
-                # send measureExpectedTime.py and perFile_expected_time.sh
-                send_file(self.SCRIPTS_DIR + "/measureExpectedTime.py", scripts_dir, server)
-                send_file(self.SCRIPTS_DIR + "/perFile_expected_time.sh", scripts_dir, server)
-                chmod_file(scripts_dir + "perFile_expected_time.sh", "777", server)
-
-                # send run_pit_all.py and perFile_pit.sh
-                send_file(self.SCRIPTS_DIR + "/run_pit_all.py", scripts_dir, server)
-                send_file(self.SCRIPTS_DIR + "/perFile_pit.sh", scripts_dir, server)
-                chmod_file(scripts_dir + "perFile_pit.sh", "777", server)
-
-            # send main.py
-            send_directory(self.LIB_DIR, self.REMOTE_D4J_DIR, server)
-            send_directory(self.UTILS_DIR, self.REMOTE_D4J_DIR, server)
-            send_file(self.MAIN_SCRIPT, self.REMOTE_D4J_DIR, server)
-
-            send_file(self.CURR_ROOT_PATH + "/.env", self.REMOTE_D4J_DIR, server)
+            if not deploy_archive(archive_path, archive_hash, self.REMOTE_D4J_DIR, server):
+                LOGGER.error(f"Server {server} does not have the current scripts and sources.")
 
         def prepare_database():
             if not self.DB.table_exists("d4j_fault_info"):
@@ -189,6 +346,24 @@ class ExtractorEngine:
                     "fault_idx"
                 )
 
+            if not self.DB.table_exists("d4j_mutant_dedup_info"):
+                columns = [
+                    "fault_idx INT NOT NULL", # -- Foreign key to d4j_fault_info(fault_idx)
+                    "normalize BOOLEAN",
+                    "num_mutants INT",
+                    "num_unique INT",
+                    "num_duplicates INT",
+                    "num_equivalent INT",
+                    "FOREIGN KEY (fault_idx) REFERENCES d4j_fault_info(fault_idx) ON DELETE CASCADE ON UPDATE CASCADE",
+                ]
+                col_str = ", ".join(columns)
+                self.DB.create_table("d4j_mutant_dedup_info", col_str)
+                self.DB.create_index(
+                    "d4j_mutant_dedup_info",
+                    "idx_d4j_mutant_dedup_info_fault_idx",
+                    "fault_idx"
+                )
+
             if not self.DB.table_exists("d4j_time_measurement_info"):
                 columns = [
                     "pid TEXT NOT NULL",
@@ -212,114 +387,414 @@ class ExtractorEngine:
                     "pid, bid"
                 )
 
-        # Preparing for server
+            self.TELEMETRY.create_table()
+
+        if self.LOCAL:
+            # the scripts run from this repository
+            os.makedirs(self.REMOTE_WORK_DIR, exist_ok=True)
+            prepare_database()
+            return
+
+        # Preparing for server: one archive of the scripts and sources, unpacked where it changed
+        archive_dir = tempfile.mkdtemp(prefix="d4j_extractor_deploy_")
+        archive_path = os.path.join(archive_dir, "deploy.tar.gz")
+        archive_hash = build_deploy_archive(self.CURR_ROOT_PATH, self.get_deploy_paths(), archive_path)
+        LOGGER.info(f"Deploying {archive_hash[:12]} ({os.path.getsize(archive_path)} bytes).")
+
         servers = self.SERVER_LIST
         for i in range(0, len(servers), batch_size):
             batch = servers[i:i+batch_size]
             with concurrent.futures.ThreadPoolExecutor(max_workers=batch_size) as executor:
-                futures = [executor.submit(prepare_server, server) for server in batch]
+                futures = [executor.submit(prepare_server, server, archive_path, archive_hash) for server in batch]
                 for future in concurrent.futures.as_completed(futures):
                     try:
                         future.result()
                     except Exception as e:
                         LOGGER.error(f"Error preparing server: {e}")
+        shutil.rmtree(archive_dir, ignore_errors=True)
 
         # Preparing database
         prepare_database()
 
-    def run_mutation_testing(self):
-        def prepare_dir(server, pid, bid):
-            command = f"mkdir -p {self.REMOTE_WORK_DIR}/out_dir/{pid}-{bid}b-result/subjectInfo"
-            return execute_command(command, server)
-
-        def compile2prepare(server, pid, bid):
-            command = f"cd {self.REMOTE_D4J_DIR}scripts/ && bash 0_compile2prepare.sh {pid} {bid} {self.EL} > {self.REMOTE_WORK_DIR}/out_dir/{pid}-{bid}b-result/subjectInfo/compile2prepare-exec.log 2>&1"
-            return execute_command(command, server)
-        
-        def generate_mutants(server, pid, bid):
-            command = f"cd {self.REMOTE_D4J_DIR}scripts/ && bash run_pit.sh {pid} {bid} {self.EL} {self.PARALLEL}"
-            return execute_command(command, server)
-
-        def conduct_mutation_testing(server, pid, bid):
-            if self.TIME_MEASUREMENT:
-                command = f"cd {self.REMOTE_D4J_DIR} && python3 main.py -pid {pid} -bid {bid} -el {self.EL} -p {self.PARALLEL} --mutation-testing --time-measurement -d > {self.REMOTE_WORK_DIR}/out_dir/{pid}-{bid}b-result/subjectInfo/mutation-testing-exec.log 2>&1"
-            else:
-                command = f"cd {self.REMOTE_D4J_DIR} && python3 main.py -pid {pid} -bid {bid} -el {self.EL} -p {self.PARALLEL} --mutation-testing -d > {self.REMOTE_WORK_DIR}/out_dir/{pid}-{bid}b-result/subjectInfo/mutation-testing-exec.log 2>&1"
-            return execute_command(command, server)
-
-        def measure_expected_time(server, pid, bid): # DEPRECATED
-            command = f"cd {self.REMOTE_D4J_DIR}scripts/ && python3 measureExpectedTime.py --pid {pid} --bid {bid} --num-threads {self.PARALLEL}"
-            return execute_command(command, server)
-        
-        def run_pit(server, pid, bid): # DEPRECATED
-            command = f"cd {self.REMOTE_D4J_DIR}scripts/ && python3 run_pit_all.py --pid {pid} --bid {bid} --num-threads {self.PARALLEL}"
-            return execute_command(command, server)
-
-        def save_results(server, pid, bid, el):
-            if self.TIME_MEASUREMENT:
-                command = f"cd {self.REMOTE_D4J_DIR} && python3 main.py -pid {pid} -bid {bid} -el {el} --save-results --time-measurement -d > {self.REMOTE_WORK_DIR}/out_dir/{pid}-{bid}b-result/subjectInfo/saver-exec.log 2>&1"
-            else:
-                command = f"cd {self.REMOTE_D4J_DIR} && python3 main.py -pid {pid} -bid {bid} -el {el} --save-results -d > {self.REMOTE_WORK_DIR}/out_dir/{pid}-{bid}b-result/subjectInfo/saver-exec.log 2>&1"
-            return execute_command(command, server)
+    def get_deploy_paths(self):
+        """
+        Files and directories (relative to the repository root) deployed to REMOTE_D4J_DIR of each server.
+        """
+        scripts = ["0_compile2prepare.sh", "0_prepare_cds.sh"]
+        if self.WITH_MUTATION_COVERAGE:
+            scripts += [
+                "run_pit.sh", "1_list_tests.sh", "2_instrument.sh", "3_execute_with_coverage.sh", "4_process_cov.sh",
+                # coverage-free mode
+                "3_execute_outcomes.sh", "3_start_outcome_server.sh", "OutcomeRunner.java",
+            ]
+        else:
+            scripts += ["measureExpectedTime.py", "perFile_expected_time.sh", "run_pit_all.py", "perFile_pit.sh"]
+
+        return [f"scripts/{script}" for script in scripts] + ["lib", "utils", "main.py", ".env", ".experiment_config"]
 
-        # Dynamic task distribution: servers pick up tasks as they become available
-        def process_bug_tasks(server, task_queue):
-            """Worker function that processes bugs from a shared queue"""
+    def run_mutation_testing(self):
+        def run_attempt(bug_id, slot, server):
+            """Process a bug on a server, the first attempt of a (duplicated) bug that reaches the save step wins"""
+            def before_save(res):
+                if res and not health.check_save(server):
+                    # e.g., a full disk may have truncated the results
+                    unhealthy.append(server)
+                    return False
+                if not res or not self.SPECULATE:
+                    return res
+                won, losers = tracker.claim_win(bug_id, slot)
+                for loser_slot, loser_server in losers:
+                    LOGGER.info(f"Bug {bug_id} finished on {slot} first, cancelling {loser_slot}")
+                    self.execute(self.PIPELINE.cancel(bug_id), loser_server)
+                return won
+
+            command2exit_code = {}
+            unhealthy = []
+            def execute(command):
+                exit_code = self.run_on_slot(command, slot, server)
+                if exit_code != 0:
+                    command2exit_code[command] = exit_code
+                    LOGGER.error(f"Failed to execute command '{command}' on server {server}: exit status {exit_code}")
+                return exit_code == 0
+
+            tracker.start(bug_id, slot, server, bid2cost.get(bug_id, 1.0))
+            retries.start(bug_id, server)
+            self.TELEMETRY.emit("bug_started", bid=bug_id, server=server, slot=slot)
+            started_at = time.time()
+            res = False
+            failed_steps = []
+            try:
+                with span(f"{self.PID}-{bug_id}", "bug", server=server):
+                    res = self.PIPELINE.run(
+                        bug_id, execute, f"Server {server}",
+                        is_cancelled=lambda: tracker.is_cancelled(bug_id, slot), before_save=before_save,
+                        failed_steps=failed_steps, telemetry=self.TELEMETRY, server=server
+                    )
+            finally:
+                tracker.finish(bug_id, slot, res)
+                if tracker.is_cancelled(bug_id, slot):
+                    self.TELEMETRY.emit("bug_cancelled", bid=bug_id, server=server)
+                else:
+                    self.TELEMETRY.emit("bug_finished", bid=bug_id, server=server, success=bool(res), duration_sec=time.time() - started_at)
+                if tracker.is_cancelled(bug_id, slot):
+                    retries.abandon(bug_id, server)
+                elif unhealthy:
+                    retries.finish(bug_id, server, "unhealthy")
+                else:
+                    retries.finish(bug_id, server, None if res else self.get_failure_type(bug_id, server, failed_steps, command2exit_code))
+            if tracker.is_cancelled(bug_id, slot):
+                LOGGER.info(f"Server {server} abandoned bug {bug_id} (a duplicate finished first)")
+                # the cancel command may have run before this attempt created its directories
+                self.execute(self.PIPELINE.cancel(bug_id), server)
+                return None
+            return res
+
+        def get_next_bug(slot, server, scheduler):
+            """The next bug of a slot from the scheduler, then failed bugs to retry (and stragglers to duplicate) until all bugs finished"""
+            while not health.check(server):
+                # drained: wait until the server recovers or no work is left
+                if scheduler.num_queued() == 0 and not retries.has_work():
+                    return None, False
+                time.sleep(self.IDLE_POLL_SEC)
+            task = scheduler.get_task(slot)
+            if task is not None:
+                return task[0], True
+            while retries.has_work():
+                bug_id = retries.get_retry(server)
+                if bug_id is None and self.SPECULATE:
+                    for expired_bug_id, _, expired_server in tracker.find_expired_duplicates():
+                        self.execute(self.PIPELINE.cancel(expired_bug_id), expired_server)
+                    bug_id = tracker.find_straggler(server)
+                if bug_id is not None:
+                    return bug_id, False
+                time.sleep(self.IDLE_POLL_SEC)
+            return None, False
+
+        # Dynamic task distribution: server slots pick up bugs from the scheduler as they become available
+        def process_bug_tasks(slot, scheduler):
+            """Worker function that processes the bugs the scheduler dispatches to a slot of a server"""
+            server = slot2server[slot]
+            name_thread(slot)
             while True:
+                bug_id, scheduled = get_next_bug(slot, server, scheduler)
+                if bug_id is None:
+                    break
+
+                LOGGER.info(f"Server {server} starting work on bug {bug_id}")
                 try:
-                    # Get next bug_id from queue with timeout
-                    bug_id = task_queue.get(timeout=1)
-                    if bug_id is None:  # Sentinel value to signal shutdown
-                        break
-                    
-                    LOGGER.info(f"Server {server} starting work on bug {bug_id}")
-                    try:
-                        res = prepare_dir(server, self.PID, bug_id)
-                        res = compile2prepare(server, self.PID, bug_id)
-                        if self.WITH_MUTATION_COVERAGE:
-                            res = generate_mutants(server, self.PID, bug_id)
-                            res = conduct_mutation_testing(server, self.PID, bug_id)
-                        else:
-                            res = measure_expected_time(server, self.PID, bug_id)
-                            res = run_pit(server, self.PID, bug_id)
-                        if res:
-                            save_results(server, self.PID, bug_id, self.EL)
-                            LOGGER.info(f"Server {server} completed work on bug {bug_id}")
-                        else:
-                            LOGGER.warning(f"Server {server} failed to process bug {bug_id}")
+                    res = run_attempt(bug_id, slot, server)
+                    if res:
+                        LOGGER.info(f"Server {server} completed work on bug {bug_id}")
+                    elif res is not None:
+                        LOGGER.warning(f"Server {server} failed to process bug {bug_id}")
 
-                    except Exception as e:
-                        LOGGER.error(f"Server {server} failed on bug {bug_id}: {e}")
-                    finally:
-                        task_queue.task_done()
-                        
-                except queue.Empty:
-                    # No more tasks available, worker can exit
-                    break
+                except Exception as e:
+                    LOGGER.error(f"Server {server} failed on bug {bug_id}: {e}")
+                finally:
+                    if scheduled:
+                        scheduler.task_done(slot, bug_id)
 
-        servers = self.SERVER_LIST
         bid_list = self.BID_LIST
-        
-        # Create a shared task queue and populate it with all bug IDs
-        task_queue = queue.Queue()
+        retries = RetryTracker(self.SERVER_LIST, self.MAX_BUG_RETRIES)
+        os.makedirs(self.REPORTS_DIR, exist_ok=True)
+        self.TELEMETRY.emit("run_started", num_bugs=len(bid_list), bids=list(bid_list), num_servers=len(self.SERVER_LIST))
+        if self.NUM_SHARDS > 1 and self.WITH_MUTATION_COVERAGE:
+            # the largest bugs first, each on a group of NUM_SHARDS servers
+            sharded_bids = self.run_sharded_bugs(bid_list, retries)
+            bid_list = [bug_id for bug_id in bid_list if bug_id not in sharded_bids]
+
+        slot2server = self.get_server_slots()
+        server_speeds = self.get_server_speeds()
+
+        # Longest (estimated) bugs first on the server that finishes them first, or active-bugs.csv order with fifo
+        bid2cost = {bug_id: 1.0 for bug_id in bid_list}
+        if self.BUG_SCHEDULER == "lpt":
+            bid2cost, _ = self.get_bug_costs(bid_list)
+        # costs are in seconds of one core and a slot tests the mutants of a bug on PARALLEL cores
+        scheduler = TaskScheduler(
+            slot2server.keys(),
+            policy=self.BUG_SCHEDULER,
+            work_stealing=self.BUG_SCHEDULER == "lpt",
+            worker_speeds={slot: server_speeds.get(server, 1.0) * self.PARALLEL for slot, server in slot2server.items()}
+        )
         for bug_id in bid_list:
-            task_queue.put(bug_id)
-            LOGGER.debug(f"Added bug {bug_id} to task queue")
+            scheduler.submit(bug_id, cost=bid2cost[bug_id])
+            LOGGER.debug(f"Added bug {bug_id} to scheduler (estimated cost: {bid2cost[bug_id]:.1f}s)")
+        scheduler.start()
+        tracker = StragglerTracker(self.STRAGGLER_FACTOR, self.STRAGGLER_MIN_ELAPSED_SEC, self.MAX_DUPLICATES)
+        health = ServerHealth(
+            self.probe_server, self.MIN_FREE_DISK_GB, self.MAX_LOAD_PER_CORE, self.get_bug_memory_gb(),
+            self.HEALTH_PROBE_INTERVAL_SEC
+        )
+
+        # Start worker threads for each slot
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(slot2server)) as executor:
+            futures = [executor.submit(process_bug_tasks, slot, scheduler) for slot in slot2server]
 
-        # Start worker threads for each server
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(servers)) as executor:
-            futures = [executor.submit(process_bug_tasks, server, task_queue) for server in servers]
-            
-            # Wait for all tasks to be completed
-            task_queue.join()
-            
-            # Signal all workers to shut down by adding sentinel values
-            for _ in servers:
-                task_queue.put(None)
-            
             # Wait for all workers to finish
             for future in concurrent.futures.as_completed(futures):
                 try:
                     future.result()
                 except Exception as e:
                     LOGGER.error(f"Error in worker thread: {e}")
+
+        self.save_schedule_report(scheduler, tracker, health)
+        self.save_bug_status_report(retries)
+
+    def probe_server(self, server):
+        """
+        Probe the health of a server over its ssh control connection.
+        :return: Health of the server (see parse_health_probe), None if the probe failed.
+        """
+        output = self.read_output(health_probe_command(self.REMOTE_WORK_DIR), server)
+        if output is None:
+            return None
+        return parse_health_probe(output)
+
+    def get_failure_type(self, bug_id, server, failed_steps, command2exit_code):
+        """
+        Classify the failure of a bug from its first failed step: its exit status and the tail of its log.
+        :return: One of FAILURE_TYPES.
+        """
+        if not failed_steps:
+            return "other"
+        step, command = failed_steps[0]
+        log_file = self.PIPELINE.get_log_file(bug_id, step)
+        log_tail = self.read_output(f"tail -n {self.FAILURE_LOG_LINES} {log_file}", server)
+        failure = classify_failure(step, command2exit_code.get(command), log_tail)
+        LOGGER.info(f"Bug {bug_id} failed at step {step} on server {server}: {failure}")
+        return failure
+
+    def run_sharded_bugs(self, bid_list, retries):
+        """
+        Process the largest (estimated) bugs with their mutants split across groups of NUM_SHARDS servers
+        (see BugPipeline.run_sharded), before the other bugs are scheduled.
+        :return: List of the sharded bug IDs.
+        """
+        servers = self.SERVER_LIST
+        groups = [servers[i:i + self.NUM_SHARDS] for i in range(0, len(servers), self.NUM_SHARDS)]
+        groups = {f"group{idx}": group for idx, group in enumerate(groups)}
+
+        bid2cost, _ = self.get_bug_costs(bid_list)
+        num_sharded_bugs = self.NUM_SHARDED_BUGS or len(groups)
+        # sorted() is stable: without measurements the first bugs of active-bugs.csv are sharded
+        sharded_bids = sorted(bid_list, key=lambda bug_id: bid2cost[bug_id], reverse=True)[:num_sharded_bugs]
+        LOGGER.info(f"Sharding bugs {sharded_bids} on {len(groups)} groups of up to {self.NUM_SHARDS} servers.")
+
+        def process_sharded_bugs(group_name, scheduler):
+            group = groups[group_name]
+            name_thread(group_name)
+            while True:
+                task = scheduler.get_task(group_name)
+                if task is None:
+                    break
+                bug_id, _ = task
+                LOGGER.info(f"Servers {group} starting work on bug {bug_id} ({len(group)} shards)")
+                # sharded bugs are not retried, a failure is final (see --retry-failed)
+                retries.start(bug_id, group[0])
+                self.TELEMETRY.emit("bug_started", bid=bug_id, server=group[0], shards=group)
+                started_at = time.time()
+                res = False
+                try:
+                    with span(f"{self.PID}-{bug_id}", "bug", servers=group):
+                        res = self.PIPELINE.run_sharded(bug_id, group, execute_command, f"Servers {group}")
+                    if res:
+                        LOGGER.info(f"Servers {group} completed work on bug {bug_id}")
+                    else:
+                        LOGGER.warning(f"Servers {group} failed to process bug {bug_id}")
+                except Exception as e:
+                    LOGGER.error(f"Servers {group} failed on bug {bug_id}: {e}")
+                finally:
+                    retries.finish(bug_id, group[0], None if res else "other")
+                    self.TELEMETRY.emit("bug_finished", bid=bug_id, server=group[0], success=bool(res), duration_sec=time.time() - started_at)
+                    scheduler.task_done(group_name, bug_id)
+
+        scheduler = TaskScheduler(
+            groups.keys(), policy="lpt",
+            worker_speeds={group_name: float(len(group) * self.PARALLEL) for group_name, group in groups.items()}
+        )
+        for bug_id in sharded_bids:
+            scheduler.submit(bug_id, cost=bid2cost[bug_id])
+        scheduler.start()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            futures = [executor.submit(process_sharded_bugs, group_name, scheduler) for group_name in groups]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    LOGGER.error(f"Error in worker thread: {e}")
+        return sharded_bids
+
+    def get_bug_costs(self, bid_list):
+        """
+        Estimate the mutation testing time of each bug from d4j_time_measurement_info
+        (see --time-measurement), bugs without a measurement get the median cost of the measured bugs.
+        :return: (mapping of bug IDs to estimated cost in seconds, list of bug IDs without a measurement).
+        """
+        columns = [
+            "bid", "instr_duration_sec", "exec_duration_sec", "process_duration_sec",
+            "relevant_test_total_time_ms", "num_mutants"
+        ]
+        measurements = []
+        if self.DB.table_exists("d4j_time_measurement_info"):
+            if self.DB.column_exists("d4j_time_measurement_info", "num_executed_mutants"):
+                columns.append("num_executed_mutants")
+            rows = self.DB.read("d4j_time_measurement_info", ", ".join(columns), {"pid": self.PID})
+            measurements = [dict(zip(columns, row)) for row in rows]
+        return estimate_bug_costs(bid_list, measurements)
+
+    def read_machines(self):
+        """
+        Read the MACHINES_FILE json (e.g., configs/machines.json): server -> {"cores", "memory_gb", "free_disk_gb", "speed", ...}.
+        """
+        machines_file = self.os_copy.get("MACHINES_FILE")
+        if not machines_file or not os.path.exists(machines_file):
+            return {}
+        with open(machines_file, 'r') as f:
+            return json.load(f)
+
+    def get_server_speeds(self):
+        """
+        Read the relative speed of each server ("speed" of the server in MACHINES_FILE, default 1.0).
+        """
+        machines = self.read_machines()
+        return {
+            server: float(machines[server].get("speed", 1.0))
+            for server in self.SERVER_LIST if server in machines
+        }
+
+    def get_bug_memory_gb(self):
+        if self.WITH_MUTATION_COVERAGE:
+            # mutants are generated by PIT before the cores test them
+            return max(self.PIT_MEMORY_GB, self.PARALLEL * self.CORE_MEMORY_GB)
+        return self.PIT_MEMORY_GB
+
+    def get_local_machine(self):
+        """
+        Capacity of this machine (see read_machines), for the local backend.
+        """
+        memory_gb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3
+        os.makedirs(self.REMOTE_D4J_DIR, exist_ok=True)
+        free_disk_gb = shutil.disk_usage(self.REMOTE_D4J_DIR).free / 1024 ** 3
+        return {"cores": os.cpu_count(), "memory_gb": memory_gb, "free_disk_gb": free_disk_gb}
+
+    def get_server_slots(self):
+        """
+        Split each server into slots that process one bug each (with PARALLEL cores),
+        as many as the cores, memory and free disk of the server in MACHINES_FILE allow.
+        Servers that are not listed in MACHINES_FILE get one slot, remote servers at most MAX_SLOTS_PER_SERVER.
+        With the local backend, the cores of this machine are partitioned across its slots (see run_on_slot).
+        :return: Mapping of slot names ("<server>/slot<N>") to servers.
+        """
+        machines = self.read_machines()
+        if self.LOCAL and self.LOCAL_SERVER not in machines:
+            machines[self.LOCAL_SERVER] = self.get_local_machine()
+        bug_memory_gb = self.get_bug_memory_gb()
+
+        slot2server = {}
+        for server in self.SERVER_LIST:
+            num_slots = compute_server_slots(machines.get(server, {}), self.PARALLEL, bug_memory_gb, self.BUG_DISK_GB)
+            if not self.LOCAL:
+                num_slots = min(num_slots, self.MAX_SLOTS_PER_SERVER)
+            for slot in range(num_slots):
+                slot2server[f"{server}/slot{slot}"] = server
+            if self.LOCAL:
+                num_cores = int(machines[server].get("cores", os.cpu_count()))
+                for slot, cores in enumerate(partition_cores(num_cores, num_slots, self.PARALLEL)):
+                    self.slot2cores[f"{server}/slot{slot}"] = cores
+            LOGGER.info(f"Server {server}: {num_slots} slots of {self.PARALLEL} cores.")
+        return slot2server
+
+    def get_bug_status_report_file(self):
+        return os.path.join(self.REPORTS_DIR, f"bug_status_{self.PID}_{self.EL}.json")
+
+    def read_bug_status_report(self):
+        report_file = self.get_bug_status_report_file()
+        if not os.path.exists(report_file):
+            return {"bugs": {}}
+        with open(report_file, 'r') as f:
+            return json.load(f)
+
+    def get_failed_bugs(self):
+        """
+        Bugs whose final status is failed in the bug status report (see save_bug_status_report).
+        """
+        bugs = self.read_bug_status_report()["bugs"]
+        return {bug_id for bug_id, info in bugs.items() if info["status"] == "failed"}
+
+    def save_bug_status_report(self, retries):
+        """
+        Update the final status of the bugs of this run (done or failed with a failure type, and their attempts)
+        in reports/bug_status_<pid>_<el>.json, the bugs of earlier runs keep their status.
+        """
+        report = self.read_bug_status_report()
+        report["bugs"].update(retries.get_report())
+        report["summary"] = {state: 0 for state in BUG_STATES}
+        report["failures"] = {failure: 0 for failure in FAILURE_TYPES}
+        for info in report["bugs"].values():
+            report["summary"][info["status"]] += 1
+            if info["status"] == "failed":
+                report["failures"][info["failure"]] += 1
+
+        os.makedirs(self.REPORTS_DIR, exist_ok=True)
+        report_file = self.get_bug_status_report_file()
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        LOGGER.info(f"Bug status: {report['summary']}, failures: {report['failures']} (see {report_file}).")
+
+    def save_schedule_report(self, scheduler, tracker=None, health=None):
+        report = scheduler.get_report(include_tasks=True)
+        if tracker is not None:
+            report["speculated"] = tracker.get_report()
+        if health is not None:
+            report["health"] = health.get_report()
+        os.makedirs(self.REPORTS_DIR, exist_ok=True)
+        report_file = os.path.join(self.REPORTS_DIR, f"bug_schedule_{self.PID}_{self.EL}.json")
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        projected = f", projected {report['projected_makespan']:.1f}s" if "projected_makespan" in report else ""
+        LOGGER.info(f"Bug schedule ({report['policy']}): makespan {report['makespan_sec']:.1f}s{projected}, utilization {report['utilization']:.2%} (see {report_file}).")
+        for server, stats in report["workers"].items():
+            LOGGER.debug(f"{server}: {stats['num_tasks']} bugs ({stats['num_stolen']} stolen), busy {stats['busy_sec']:.1f}s, idle {stats['idle_sec']:.1f}s")
@@ -0,0 +1,178 @@
+import json
+import threading
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+JOB_STATES = ["queued", "running", "done", "failed"]
+
+class JobQueue:
+    """
+    Queue of bugs to process, stored in the d4j_job_queue table so that workers
+    (main.py --worker on each server) pull bugs at their own pace without a coordinator.
+    A job is claimed with SELECT ... FOR UPDATE SKIP LOCKED (no two workers get the same job),
+    running jobs send heartbeats, and jobs whose heartbeat is older than heartbeat_timeout_sec
+    (the worker died) are queued again, up to max_attempts times.
+    """
+    TABLE = "d4j_job_queue"
+
+    def __init__(self, db, worker_id=None, heartbeat_timeout_sec=300, max_attempts=3):
+        self.DB = db
+        self.worker_id = worker_id
+        self.heartbeat_timeout_sec = heartbeat_timeout_sec
+        self.max_attempts = max_attempts
+        # the connection is shared with the heartbeat thread
+        self.lock = threading.Lock()
+
+    def create_table(self):
+        if self.DB.table_exists(self.TABLE):
+            return
+        columns = [
+            "job_idx SERIAL PRIMARY KEY",
+            "project TEXT NOT NULL",
+            "bug_id TEXT NOT NULL",
+            "experiment_label TEXT NOT NULL",
+            "options TEXT",  # -- json of BugPipeline.get_options
+            "priority DOUBLE PRECISION DEFAULT 0",  # -- higher first (e.g., estimated cost)
+            "status TEXT NOT NULL DEFAULT 'queued'",
+            "worker TEXT",
+            "attempts INT DEFAULT 0",
+            "created_at TIMESTAMP DEFAULT NOW()",
+            "started_at TIMESTAMP",
+            "heartbeat_at TIMESTAMP",
+            "finished_at TIMESTAMP",
+            "UNIQUE (project, bug_id, experiment_label)"
+        ]
+        self.DB.create_table(self.TABLE, ", ".join(columns))
+        self.DB.create_index(self.TABLE, "idx_d4j_job_queue_status", "experiment_label, status, priority")
+
+    def enqueue(self, pid, experiment_label, bid2priority, options):
+        """
+        Queue a job per bug. Bugs that are already queued for the experiment are re-queued
+        with the new priority and options unless they are running or done.
+        :param pid: Project ID.
+        :param experiment_label: Experiment label.
+        :param bid2priority: Mapping of bug IDs to priorities (higher is claimed first).
+        :param options: Options of the bug pipeline (see BugPipeline.get_options).
+        :return: Number of queued jobs.
+        """
+        options_str = json.dumps(options)
+        with self.lock:
+            for bid, priority in bid2priority.items():
+                self.DB.safe_execute(
+                    f"INSERT INTO {self.TABLE} (project, bug_id, experiment_label, options, priority) "
+                    "VALUES (%s, %s, %s, %s, %s) "
+                    "ON CONFLICT (project, bug_id, experiment_label) DO UPDATE "
+                    "SET options = EXCLUDED.options, priority = EXCLUDED.priority, status = 'queued', attempts = 0, worker = NULL "
+                    f"WHERE {self.TABLE}.status IN ('queued', 'failed')",
+                    [pid, str(bid), experiment_label, options_str, priority]
+                )
+            self.DB.commit()
+        LOGGER.info(f"Queued {len(bid2priority)} jobs of {pid} for experiment {experiment_label}.")
+        return len(bid2priority)
+
+    def requeue_stale_jobs(self, experiment_label):
+        """
+        Queue again the running jobs without a heartbeat for heartbeat_timeout_sec
+        (jobs that already used max_attempts fail).
+        :return: Number of re-queued jobs.
+        """
+        with self.lock:
+            rows = self.DB.execute(
+                f"UPDATE {self.TABLE} "
+                "SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'queued' END, worker = NULL "
+                "WHERE experiment_label = %s AND status = 'running' "
+                "AND heartbeat_at < NOW() - make_interval(secs => %s) "
+                "RETURNING job_idx, bug_id, status",
+                [self.max_attempts, experiment_label, self.heartbeat_timeout_sec]
+            )
+            self.DB.commit()
+        for job_idx, bid, status in rows:
+            LOGGER.warning(f"Job {job_idx} (bug {bid}) lost its worker, it is {status} now.")
+        return len([row for row in rows if row[2] == "queued"])
+
+    def claim(self, experiment_label):
+        """
+        Claim the queued job with the highest priority.
+        :return: Job dict (job_idx, pid, bid, options, attempts) or None if no job is queued.
+        """
+        self.requeue_stale_jobs(experiment_label)
+        with self.lock:
+            rows = self.DB.execute(
+                f"UPDATE {self.TABLE} "
+                "SET status = 'running', worker = %s, attempts = attempts + 1, started_at = NOW(), heartbeat_at = NOW() "
+                f"WHERE job_idx = (SELECT job_idx FROM {self.TABLE} "
+                "WHERE experiment_label = %s AND status = 'queued' "
+                "ORDER BY priority DESC, job_idx LIMIT 1 FOR UPDATE SKIP LOCKED) "
+                "RETURNING job_idx, project, bug_id, options, attempts",
+                [self.worker_id, experiment_label]
+            )
+            self.DB.commit()
+        if not rows:
+            return None
+        job_idx, pid, bid, options, attempts = rows[0]
+        LOGGER.info(f"Worker {self.worker_id} claimed job {job_idx} ({pid}-{bid}, attempt {attempts}).")
+        return {
+            "job_idx": job_idx, "pid": pid, "bid": bid,
+            "options": json.loads(options) if options else {}, "attempts": attempts
+        }
+
+    def heartbeat(self, job_idx):
+        """
+        Record that the worker is still processing a job.
+        :return: False if the job is no longer owned by this worker (e.g., it was re-queued).
+        """
+        with self.lock:
+            rows = self.DB.execute(
+                f"UPDATE {self.TABLE} SET heartbeat_at = NOW() "
+                "WHERE job_idx = %s AND worker = %s AND status = 'running' RETURNING job_idx",
+                [job_idx, self.worker_id]
+            )
+            self.DB.commit()
+        return len(rows) > 0
+
+    def finish(self, job_idx, success):
+        """
+        Mark a job of this worker as done (or failed, or queued again while it has attempts left).
+        """
+        with self.lock:
+            self.DB.safe_execute(
+                f"UPDATE {self.TABLE} "
+                "SET status = CASE WHEN %s THEN 'done' WHEN attempts >= %s THEN 'failed' ELSE 'queued' END, "
+                "finished_at = NOW(), worker = CASE WHEN %s THEN worker ELSE NULL END "
+                "WHERE job_idx = %s AND worker = %s AND status = 'running'",
+                [success, self.max_attempts, success, job_idx, self.worker_id]
+            )
+            self.DB.commit()
+
+    def count_states(self, experiment_label):
+        with self.lock:
+            rows = self.DB.execute(
+                f"SELECT status, COUNT(*) FROM {self.TABLE} WHERE experiment_label = %s GROUP BY status",
+                [experiment_label]
+            )
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def start_heartbeat(self, job_idx, interval_sec):
+        """
+        Send heartbeats for a job on a background thread until the stop event is set.
+        :return: (stop, lost) events, lost is set when the worker no longer owns the job (e.g., it was re-queued
+                 to another worker), the worker should then abandon it.
+        """
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def beat():
+            while not stop.wait(interval_sec):
+                try:
+                    if not self.heartbeat(job_idx):
+                        LOGGER.warning(f"Worker {self.worker_id} no longer owns job {job_idx}.")
+                        lost.set()
+                        return
+                except Exception as e:
+                    LOGGER.error(f"Heartbeat of job {job_idx} failed: {e}")
+
+        threading.Thread(target=beat, daemon=True).start()
+        return stop, lost
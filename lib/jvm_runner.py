@@ -0,0 +1,102 @@
+import os
+import select
+import subprocess as sp
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+class JvmRunner:
+    """
+    Long-lived OutcomeRunner JVM of a core (see scripts/OutcomeRunner.java --server).
+    Commands are written to stdin and answered on stdout, one line each.
+    A JVM that crashes (e.g., a test calls System.exit) or exceeds the timeout
+    of a run is killed and started again for the next run.
+    """
+    def __init__(self, command, core, cwd=None, env=None, startup_timeout=120):
+        self.command = command
+        self.core = core
+        self.cwd = cwd
+        self.env = env
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.num_starts = 0
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.process = sp.Popen(
+            self.command, shell=True, cwd=self.cwd, env=self.env,
+            stdin=sp.PIPE, stdout=sp.PIPE, stderr=sp.DEVNULL, text=True,
+            start_new_session=True
+        )
+        self.num_starts += 1
+        try:
+            response = self._read_line(self.startup_timeout)
+        except sp.TimeoutExpired:
+            response = f"no answer within {self.startup_timeout}s"
+        if response != "ready":
+            self.kill()
+            raise RuntimeError(f"core{self.core} runner failed to start: {response}")
+        LOGGER.debug(f"core{self.core} runner started (pid {self.process.pid}, start #{self.num_starts}).")
+
+    def _read_line(self, timeout):
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise sp.TimeoutExpired(self.command, timeout)
+        line = self.process.stdout.readline()
+        if not line:
+            return None  # the JVM exited
+        return line.strip()
+
+    def run(self, tests_file, output_file, timeout=None):
+        """
+        Run the tests of tests_file and write their outcomes to output_file.
+        :return: True if the runner wrote output_file, False otherwise.
+        :raises sp.TimeoutExpired: If the run exceeds timeout (the runner is killed).
+        """
+        if not self.is_alive():
+            self.start()
+
+        try:
+            self.process.stdin.write(f"run {tests_file} {output_file}\n")
+            self.process.stdin.flush()
+            response = self._read_line(timeout)
+        except sp.TimeoutExpired:
+            LOGGER.warning(f"core{self.core} runner timed out, restarting it for the next run")
+            self.kill()
+            raise
+        except (BrokenPipeError, OSError) as e:
+            LOGGER.error(f"core{self.core} runner is not reachable: {e}")
+            self.kill()
+            return False
+
+        if response is None:
+            LOGGER.error(f"core{self.core} runner exited during a run (exit code {self.process.wait()}), restarting it for the next run")
+            self.process = None
+            return False
+        if not response.startswith("done"):
+            LOGGER.error(f"core{self.core} runner failed: {response}")
+            return False
+        return True
+
+    def kill(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, 9)
+            except ProcessLookupError:
+                pass
+        self.process.wait()
+        self.process = None
+
+    def close(self):
+        if self.is_alive():
+            try:
+                self.process.stdin.write("exit\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=10)
+            except (BrokenPipeError, OSError, sp.TimeoutExpired):
+                pass
+        self.kill()
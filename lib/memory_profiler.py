@@ -0,0 +1,204 @@
+import json
+import time
+import threading
+import tracemalloc
+import contextlib
+import logging
+
+from utils.memory_utils import get_rss_mb, get_peak_rss_mb, get_top_allocations
+
+LOGGER = logging.getLogger(__name__)
+
+# new tasks wait while the RSS is above this fraction of the memory budget
+SOFT_BUDGET_FRACTION = 0.9
+
+class MemoryProfiler:
+    """
+    Records the memory of each stage (spans of category "stage", see lib/tracer.py) of each task: RSS at its start and end,
+    peak RSS while it ran (sampled by a background thread), and the top tracemalloc allocation sites of the task at the end
+    of its stage with the most traced memory. With a memory budget, tasks are admitted (see task) only while the RSS is below
+    SOFT_BUDGET_FRACTION of the budget or no other task runs, so concurrency drops when the budget is approached.
+    Stages of concurrent tasks share the process: their RSS includes the memory of the other tasks.
+    """
+    def __init__(self, report_file, budget_mb=None, trace_allocations=True, top_n=10, sample_interval_sec=0.2, get_rss=get_rss_mb, clock=time.time):
+        self.REPORT_FILE = report_file
+        self.BUDGET_MB = budget_mb
+        self.TRACE_ALLOCATIONS = trace_allocations
+        self.TOP_N = top_n
+        self.sample_interval_sec = sample_interval_sec
+        self.get_rss = get_rss
+        self.clock = clock
+
+        self.lock = threading.Condition()
+        self.local = threading.local()  # task of the current thread
+        self.active = []  # records of running stages and tasks, their peak RSS is updated by sample
+        self.stages = []  # records of finished stages
+        self.task2profile = {}
+        self.rss_mb = get_rss()
+        self.peak_rss_mb = self.rss_mb
+        self.num_running = 0
+        self.max_running = 0
+        self.num_throttled = 0
+
+        self.stop_event = threading.Event()
+        self.sampler = None
+
+    def start(self):
+        if self.TRACE_ALLOCATIONS and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.sampler = threading.Thread(target=self.run_sampler, name="memory-sampler", daemon=True)
+        self.sampler.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.sampler is not None:
+            self.sampler.join()
+        self.save_report()
+        if self.TRACE_ALLOCATIONS and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def run_sampler(self):
+        while not self.stop_event.wait(self.sample_interval_sec):
+            self.sample()
+
+    def sample(self):
+        rss_mb = self.get_rss()
+        with self.lock:
+            self.rss_mb = rss_mb
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            for record in self.active:
+                record["peak_rss_mb"] = max(record["peak_rss_mb"], rss_mb)
+            # waiting tasks check the budget again
+            self.lock.notify_all()
+
+    def is_over_budget(self):
+        return self.BUDGET_MB is not None and self.rss_mb >= self.BUDGET_MB * SOFT_BUDGET_FRACTION
+
+    @contextlib.contextmanager
+    def task(self, name):
+        """
+        Run a task (e.g., a bug of the constructor) once the memory budget admits it.
+        """
+        with self.lock:
+            throttled = False
+            while self.num_running > 0 and self.is_over_budget():
+                if not throttled:
+                    throttled = True
+                    self.num_throttled += 1
+                    LOGGER.warning(f"RSS {self.rss_mb:.0f} MB is close to the memory budget of {self.BUDGET_MB:.0f} MB, task {name} waits for one of {self.num_running} running tasks.")
+                self.lock.wait(self.sample_interval_sec)
+            self.num_running += 1
+            self.max_running = max(self.max_running, self.num_running)
+            record = {"task": name, "rss_start_mb": self.rss_mb, "peak_rss_mb": self.rss_mb, "started_at": self.clock()}
+            self.active.append(record)
+            self.task2profile[name] = {"concurrent_tasks": self.num_running, "traced_mb": 0.0, "top_allocators": []}
+        self.local.task = name
+        try:
+            yield
+        finally:
+            self.local.task = None
+            rss_mb = self.get_rss()
+            with self.lock:
+                self.active.remove(record)
+                self.num_running -= 1
+                self.task2profile[name].update({
+                    "duration_sec": self.clock() - record["started_at"],
+                    "rss_start_mb": record["rss_start_mb"],
+                    "rss_end_mb": rss_mb,
+                    "peak_rss_mb": max(record["peak_rss_mb"], rss_mb),
+                    "throttled": throttled,
+                })
+                self.lock.notify_all()
+
+    def enter_stage(self, name):
+        rss_mb = self.get_rss()
+        record = {
+            "task": getattr(self.local, "task", None), "stage": name, "started_at": self.clock(),
+            "rss_start_mb": rss_mb, "peak_rss_mb": rss_mb
+        }
+        with self.lock:
+            self.active.append(record)
+        return record
+
+    def exit_stage(self, record):
+        rss_mb = self.get_rss()
+        traced_mb = tracemalloc.get_traced_memory()[0] / 1024 ** 2 if tracemalloc.is_tracing() else None
+        with self.lock:
+            self.active.remove(record)
+            record.update({
+                "duration_sec": self.clock() - record.pop("started_at"),
+                "rss_end_mb": rss_mb,
+                "peak_rss_mb": max(record["peak_rss_mb"], rss_mb),
+                "traced_mb": traced_mb,
+            })
+            self.stages.append(record)
+            profile = self.task2profile.get(record["task"])
+            largest = profile is not None and traced_mb is not None and traced_mb > profile["traced_mb"]
+        if largest:
+            # the structures of the task are still alive at the end of its stages
+            top_allocators = get_top_allocations(tracemalloc.take_snapshot(), self.TOP_N)
+            with self.lock:
+                if traced_mb > profile["traced_mb"]:
+                    profile.update({"traced_mb": traced_mb, "top_stage": record["stage"], "top_allocators": top_allocators})
+
+    def get_report(self):
+        with self.lock:
+            stage2summary = {}
+            for record in self.stages:
+                summary = stage2summary.setdefault(record["stage"], {"count": 0, "max_peak_rss_mb": 0.0, "max_growth_mb": 0.0, "total_sec": 0.0})
+                summary["count"] += 1
+                summary["max_peak_rss_mb"] = max(summary["max_peak_rss_mb"], record["peak_rss_mb"])
+                summary["max_growth_mb"] = max(summary["max_growth_mb"], record["rss_end_mb"] - record["rss_start_mb"])
+                summary["total_sec"] += record["duration_sec"]
+            return {
+                "budget_mb": self.BUDGET_MB,
+                "peak_rss_mb": max(self.peak_rss_mb, get_peak_rss_mb()),
+                "max_concurrent_tasks": self.max_running,
+                "num_throttled": self.num_throttled,
+                "stage_summary": stage2summary,
+                "tasks": {str(name): dict(profile) for name, profile in self.task2profile.items()},
+                "stages": [dict(record) for record in self.stages],
+            }
+
+    def save_report(self):
+        report = self.get_report()
+        try:
+            with open(self.REPORT_FILE, 'w') as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            LOGGER.warning(f"Failed to write the memory profile to {self.REPORT_FILE}: {e}")
+            return
+        LOGGER.info(f"Memory profile: peak RSS {report['peak_rss_mb']:.0f} MB, {report['num_throttled']} throttled tasks, written to {self.REPORT_FILE}")
+
+
+# profiler of this process, None while memory profiling is disabled
+_PROFILER = None
+
+def start_profiling(report_file, budget_mb=None, trace_allocations=True):
+    """
+    Profile the memory of the stages of this process until stop_profiling (which writes report_file).
+    :param budget_mb: Soft memory budget of the tasks (see MemoryProfiler.task), None for no budget.
+    :param trace_allocations: Record the top allocation sites with tracemalloc (slows allocations down).
+    """
+    global _PROFILER
+    _PROFILER = MemoryProfiler(report_file, budget_mb, trace_allocations)
+    _PROFILER.start()
+    return _PROFILER
+
+def stop_profiling():
+    global _PROFILER
+    profiler, _PROFILER = _PROFILER, None
+    if profiler is not None:
+        profiler.stop()
+
+def get_profiler():
+    return _PROFILER
+
+def profile_task(name):
+    """
+    Context of a task: waits for the memory budget and attributes the stages of the thread to the task.
+    """
+    profiler = _PROFILER
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.task(name)
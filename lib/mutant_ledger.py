@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+LEDGER_STATES = ["pending", "running", "done", "timeout", "error", "saved"]
+
+# states of mutants that are not executed again when mutation testing is resumed
+# (saved: the results were streamed to the DB and the result directory was deleted)
+FINISHED_STATES = ["done", "timeout", "saved"]
+
+REPORT_FILES = ["spectra.csv", "tests.csv", "matrix.txt"]
+
+# coverage-free mode only writes the test outcomes
+OUTCOME_REPORT_FILES = ["tests.csv"]
+
+
+def compute_result_checksum(result_dir, report_files=REPORT_FILES):
+    """
+    Compute a sha256 checksum over the report files of a mutant result directory.
+    :param result_dir: Path to the coverage_results/<work_name> directory.
+    :param report_files: Report files (under sfl/txt) of the result directory.
+    :return: Hex digest of the report files, None if a report file is missing.
+    """
+    sha = hashlib.sha256()
+    for filename in report_files:
+        file_path = os.path.join(result_dir, "sfl/txt", filename)
+        if not os.path.isfile(file_path):
+            return None
+        sha.update(filename.encode())
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+class MutantLedger:
+    """
+    Per-bug ledger that records the mutation testing state of each mutant.
+    The ledger is an append-only JSONL journal: every update is a single line
+    written under a lock, the last line of a mutant wins when the ledger is loaded.
+    """
+    def __init__(self, ledger_file, report_files=REPORT_FILES):
+        self.ledger_file = ledger_file
+        self.report_files = report_files
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """
+        Replay the journal and compact it into one line per mutant.
+        A torn trailing line (e.g., the node died mid-write) is ignored.
+        """
+        if not os.path.exists(self.ledger_file):
+            return
+
+        with open(self.ledger_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    LOGGER.warning(f"Skipping corrupted ledger line in {self.ledger_file}: {line[:100]}")
+                    continue
+                self.entries[int(entry["mutant_idx"])] = entry
+
+        tmp_file = f"{self.ledger_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            for mutantIdx in sorted(self.entries):
+                f.write(json.dumps(self.entries[mutantIdx]) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.ledger_file)
+        LOGGER.info(f"Loaded {len(self.entries)} ledger entries from {self.ledger_file}.")
+
+    def _append(self, entries):
+        with open(self.ledger_file, 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        for entry in entries:
+            self.entries[entry["mutant_idx"]] = entry
+
+    def register(self, mutantIdxs):
+        """
+        Add unknown mutants to the ledger as pending with a single write.
+        :param mutantIdxs: Iterable of mutant indices.
+        """
+        with self.lock:
+            new_entries = [
+                self._make_entry(mutantIdx, "pending")
+                for mutantIdx in mutantIdxs if mutantIdx not in self.entries
+            ]
+            if new_entries:
+                self._append(new_entries)
+
+    def update(self, mutantIdx, state, result_dir=None, checksum=None):
+        """
+        Atomically record a new state for a mutant (safe to call from worker threads).
+        :param mutantIdx: Mutant index.
+        :param state: One of LEDGER_STATES.
+        :param result_dir: Result directory of the mutant.
+        :param checksum: Checksum of the result directory (see compute_result_checksum).
+        """
+        if state not in LEDGER_STATES:
+            raise ValueError(f"Unknown ledger state {state} for mutant {mutantIdx}.")
+        with self.lock:
+            self._append([self._make_entry(mutantIdx, state, result_dir, checksum)])
+
+    def merge(self, other_ledger_file):
+        """
+        Append the entries of another ledger (e.g., of a shard run on another server).
+        :param other_ledger_file: Path to the other ledger.
+        :return: Number of merged entries.
+        """
+        other = MutantLedger(other_ledger_file, self.report_files)
+        with self.lock:
+            entries = [other.entries[mutantIdx] for mutantIdx in sorted(other.entries)]
+            if entries:
+                self._append(entries)
+        return len(entries)
+
+    def _make_entry(self, mutantIdx, state, result_dir=None, checksum=None):
+        return {
+            "mutant_idx": int(mutantIdx),
+            "state": state,
+            "result_dir": result_dir,
+            "checksum": checksum,
+            "updated_at": time.time()
+        }
+
+    def get_state(self, mutantIdx):
+        entry = self.entries.get(mutantIdx)
+        return entry["state"] if entry else None
+
+    def is_finished(self, mutantIdx):
+        """
+        Check if a mutant does not need to be executed again.
+        Done mutants are only finished while their result directory still matches the recorded checksum.
+        """
+        entry = self.entries.get(mutantIdx)
+        if entry is None or entry["state"] not in FINISHED_STATES:
+            return False
+        if entry["state"] == "done":
+            if entry["result_dir"] is None or entry["checksum"] is None:
+                return False
+            return compute_result_checksum(entry["result_dir"], self.report_files) == entry["checksum"]
+        return True
+
+    def get_unfinished_mutants(self, mutantIdx2mutantInfo):
+        """
+        Filter mutantIdx2mutantInfo to the mutants that still have to be executed.
+        :param mutantIdx2mutantInfo: Mapping of mutant indices to mutant information.
+        :return: Mapping of unfinished mutant indices to mutant information.
+        """
+        return {
+            mutantIdx: mutantInfo
+            for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items()
+            if not self.is_finished(mutantIdx)
+        }
+
+    def count_states(self):
+        counts = {state: 0 for state in LEDGER_STATES}
+        for entry in self.entries.values():
+            counts[entry["state"]] += 1
+        return counts
@@ -2,14 +2,25 @@
 from utils.mutation_testing_utils import *
 from utils.data_read_utils import *
 from utils.general_utils import *
+from utils.sampling_utils import *
+from utils.bytecode_utils import group_duplicate_mutants
+from utils.scheduling_utils import estimate_mutant_costs, get_shard
+from utils.workspace_utils import get_directory_size, get_free_space, assign_core_workspaces, workspace_has_room
+from lib.mutant_ledger import MutantLedger, compute_result_checksum, REPORT_FILES, OUTCOME_REPORT_FILES
+from lib.task_scheduler import TaskScheduler
+from lib.jvm_runner import JvmRunner
+from lib.saver_engine import SaverEngine
+from lib.telemetry import Telemetry
+from lib.tracer import span, traced, start_tracing, stop_tracing, name_thread
+from lib.database import CRUD
 
 
 import json
-import time
 import os
 import subprocess as sp
 import concurrent.futures
 import queue
+import threading
 import shutil
 from dotenv import load_dotenv
 import logging
@@ -17,12 +28,20 @@ import logging
 LOGGER = logging.getLogger(__name__)
 
 class MutationTestingEngine:
-    def __init__(self, pid, bid, experiment_label, parallel, timeMeasurement=False):
+    def __init__(self, pid, bid, experiment_label, parallel, timeMeasurement=False, coverageFree=False, streamResults=False, shard=None, shardPrepare=False, mergeShards=0, trace=False):
         self.PID = pid
         self.BID = bid
         self.EL = experiment_label
         self.PARALLEL = parallel
         self.TIME_MEASUREMENT = timeMeasurement
+        self.COVERAGE_FREE = coverageFree
+        self.REPORT_FILES = OUTCOME_REPORT_FILES if coverageFree else REPORT_FILES
+        self.STREAM_RESULTS = streamResults
+        # sharded mutation testing: (shard index, number of shards), prepare the shards, merge N shards
+        self.SHARD = shard
+        self.SHARD_PREPARE = shardPrepare
+        self.MERGE_SHARDS = mergeShards
+        self.TRACE = trace
 
         load_dotenv()
         self.os_copy = os.environ.copy()
@@ -37,14 +56,53 @@ class MutationTestingEngine:
         self.WORK_DIR = f"{self.D4J_DIR}{self.EL}/{self.PID}"
         self.REPO_DIR = f"{self.WORK_DIR}/{self.PID}-{self.BID}b"
         self.RESULT_DIR = f"{self.WORK_DIR}/out_dir/{self.PID}-{self.BID}b-result"
+        self.TRACE_FILE = f"{self.WORK_DIR}/out_dir/{self.PID}-{self.BID}b-trace.json"
 
+        self.EXP_CONFIG = {}
+        exp_config_file = os.path.join(os.getcwd(), ".experiment_config")
+        if os.path.exists(exp_config_file):
+            with open(exp_config_file, 'r') as f:
+                self.EXP_CONFIG = json.load(f)
 
     def run(self):
+        if self.TRACE:
+            shard_name = f" shard {self.SHARD[0]}/{self.SHARD[1]}" if self.SHARD is not None else ""
+            start_tracing(self.TRACE_FILE, f"mutation-testing {self.PID}-{self.BID}{shard_name}")
+        try:
+            self.run_stages()
+        finally:
+            stop_tracing()
+
+    def run_stages(self):
+        if self.MERGE_SHARDS:
+            self.merge_shards()
+            return
+
+        self.TELEMETRY = self.get_telemetry()
+
+        if self.SHARD is not None and not self.SHARD_PREPARE:
+            # a shard reuses the baseline and the mutant selection of the prepared bug (see save_shard_state)
+            shard_state = self.load_shard_state()
+            time_info = shard_state["time_info"]
+            self.EXEC_DURATION_SECS = shard_state["exec_duration_secs"]
+            baseline_results = self.get_results("baseline")
+            relevant_tests_dict, _ = self.save_relevant_tests(baseline_results)
+
+            mutantIdx2mutantInfo = self.get_mutants()
+            shard_index, num_shards = self.SHARD
+            shard_mutants = get_shard(shard_state["mutant_indices"], shard_index, num_shards)
+            mutantIdx2mutantInfo = {mutantIdx: mutantIdx2mutantInfo[mutantIdx] for mutantIdx in shard_mutants}
+            LOGGER.info(f"Shard {shard_index}/{num_shards}: {len(mutantIdx2mutantInfo)} of {len(shard_state['mutant_indices'])} mutants.")
+            self.set_bin_classes_dir()
+            self.test_mutants(mutantIdx2mutantInfo, baseline_results, relevant_tests_dict, time_info)
+            if shard_index > 0:
+                self.save_shard_results_list(shard_mutants)
+            return
 
         # 1. Test for baseline results
-        startTime = time.time()
-        time_info = self.execute_baseline_results()
-        self.EXEC_DURATION_SECS = (time.time() - startTime) * 2.0
+        with self.TELEMETRY.stage("baseline"), span("baseline") as baseline_span:
+            time_info = self.execute_baseline_results()
+        self.EXEC_DURATION_SECS = baseline_span.duration_sec * 2.0
 
         # 2. Get baseline results
         baseline_results = self.get_results("baseline")
@@ -56,28 +114,189 @@ class MutationTestingEngine:
         mutantIdx2mutantInfo = self.get_mutants()
 
         if self.TIME_MEASUREMENT:
+            # the mutants a run tests after pruning (and sampling), for the cost of the bug (see estimate_bug_cost)
+            linesExecutedByFailTcsBitVal = getLinesExecutedByFailTcs(baseline_results)
+            relevant_lines = get_relevant_lines(baseline_results, linesExecutedByFailTcsBitVal)
+            executed_mutants = self.prune_mutants(mutantIdx2mutantInfo, relevant_lines)
+            if self.EXP_CONFIG.get("mutant_sampling", False):
+                executed_mutants = self.sample_mutants(executed_mutants, baseline_results, relevant_tests_dict, relevant_lines)
             self.save_time_measurement_info(
                 relevant_tests_dict, 
                 mutantIdx2mutantInfo, 
                 time_info,
-                numLinesByFails
+                numLinesByFails,
+                len(executed_mutants)
             )
             return 
 
+        # In coverage-free mode mutants only produce outcomes, which are compared to the outcomes of the same runner
+        self.save_mutation_testing_mode()
+        if self.COVERAGE_FREE:
+            self.execute_baseline_outcomes()
+
+        # Drop mutants on lines that no failing test executes before launching any JVM
+        linesExecutedByFailTcsBitVal = getLinesExecutedByFailTcs(baseline_results)
+        relevant_lines = get_relevant_lines(baseline_results, linesExecutedByFailTcsBitVal)
+        mutantIdx2mutantInfo = self.prune_mutants(mutantIdx2mutantInfo, relevant_lines)
+
+        # Only execute the mutants the constructor can consume within the experiment budget
+        if self.EXP_CONFIG.get("mutant_sampling", False):
+            mutantIdx2mutantInfo = self.sample_mutants(mutantIdx2mutantInfo, baseline_results, relevant_tests_dict, relevant_lines)
+
         # Get target bin classes directory
+        self.set_bin_classes_dir()
+
+        # Execute each group of bytecode-identical mutants once, skip mutants identical to the original
+        mutantIdx2mutantInfo = self.deduplicate_mutants(mutantIdx2mutantInfo)
+
+        if self.SHARD_PREPARE:
+            # the shards (on this and other servers) test the mutants
+            self.save_shard_state(time_info, mutantIdx2mutantInfo)
+            return
+
+        self.test_mutants(mutantIdx2mutantInfo, baseline_results, relevant_tests_dict, time_info)
+
+    def set_bin_classes_dir(self):
         target_bin_classes = ""
         with open(self.RESULT_DIR + "/subjectInfo/dir_bin_classes.txt", 'r') as f:
             target_bin_classes = f.read().strip()
         self.BIN_CLASSES_DIRNAME = target_bin_classes
         self.target_bin_classes_dir = os.path.join(self.REPO_DIR, target_bin_classes)
 
+    def test_mutants(self, mutantIdx2mutantInfo, baseline_results, relevant_tests_dict, time_info):
         # 5. Prepare for mutation testing
         self.prepare_for_mutation_testing()
 
-        # 6. start mutation testing
-        self.start_mutation_testing(mutantIdx2mutantInfo)
+        # 6. skip mutants already finished by a previous (interrupted) run
+        self.LEDGER = MutantLedger(self.get_ledger_file(), self.REPORT_FILES)
+        self.LEDGER.register(mutantIdx2mutantInfo.keys())
+        unfinished_mutants = self.LEDGER.get_unfinished_mutants(mutantIdx2mutantInfo)
+        LOGGER.info(f"Ledger: {len(mutantIdx2mutantInfo) - len(unfinished_mutants)} mutants already finished, {len(unfinished_mutants)} mutants to test.")
+
+        # 7. start mutation testing, longest (estimated) mutants first
+        mutantIdx2cost = estimate_mutant_costs(
+            unfinished_mutants, baseline_results, relevant_tests_dict,
+            overhead_ms=(time_info["instr_duration_sec"] + time_info["process_duration_sec"]) * 1000
+        )
+        if self.STREAM_RESULTS:
+            self.start_streaming()
+        with self.TELEMETRY.stage("mutants"), span("mutants"):
+            self.start_mutation_testing(unfinished_mutants, mutantIdx2cost, num_finished=len(mutantIdx2mutantInfo) - len(unfinished_mutants), num_mutants=len(mutantIdx2mutantInfo))
+        if self.STREAM_RESULTS:
+            self.finish_streaming()
+
+    def get_telemetry(self):
+        """
+        Telemetry of the bug, its events go to the DB (read by main.py --status) and to subjectInfo/progress.jsonl.
+        Without a DB connection the events are only written to the file.
+        """
+        db = None
+        try:
+            db = CRUD(
+                host=self.os_copy.get("DB_HOST"),
+                port=self.os_copy.get("DB_PORT"),
+                user=self.os_copy.get("DB_USER"),
+                password=self.os_copy.get("DB_PASSWORD"),
+                database=self.os_copy.get("DB"),
+                slack_channel=self.os_copy.get("SLACK_CHANNEL"),
+                slack_token=self.os_copy.get("SLACK_TOKEN"),
+            )
+        except Exception as e:
+            LOGGER.warning(f"Progress events of {self.PID}-{self.BID} are not saved to the DB: {e}")
+        jsonl_file = os.path.join(self.RESULT_DIR, "subjectInfo/progress.jsonl")
+        return Telemetry(self.EL, self.PID, self.BID, jsonl_file=jsonl_file, db=db, progress_interval_sec=self.EXP_CONFIG.get("progress_interval_sec", 30))
+
+    def get_ledger_file(self, shard_index=None):
+        """
+        Ledger of this run, shards other than shard 0 (which runs where the bug was prepared)
+        keep their own ledger until it is merged (see merge_shards).
+        """
+        if shard_index is None and self.SHARD is not None:
+            shard_index = self.SHARD[0]
+        if shard_index:
+            return os.path.join(self.RESULT_DIR, f"subjectInfo/mutant_ledger.shard{shard_index}.jsonl")
+        return os.path.join(self.RESULT_DIR, "subjectInfo/mutant_ledger.jsonl")
+
+    @traced()
+    def save_shard_state(self, time_info, mutantIdx2mutantInfo):
+        shard_state = {
+            "time_info": time_info,
+            "exec_duration_secs": self.EXEC_DURATION_SECS,
+            "mutant_indices": sorted(mutantIdx2mutantInfo.keys())
+        }
+        with open(os.path.join(self.RESULT_DIR, "subjectInfo/shard_state.json"), 'w') as f:
+            json.dump(shard_state, f)
+        LOGGER.info(f"Prepared {len(mutantIdx2mutantInfo)} mutants for sharded mutation testing.")
+
+    def load_shard_state(self):
+        with open(os.path.join(self.RESULT_DIR, "subjectInfo/shard_state.json"), 'r') as f:
+            return json.load(f)
+
+    def get_shard_results_file(self, shard_index):
+        return os.path.join(self.RESULT_DIR, f"subjectInfo/shard_results.shard{shard_index}.txt")
+
+    def save_shard_results_list(self, shard_mutants):
+        """
+        List the result directories (relative to coverage_results) of the finished mutants of this shard,
+        the only ones copied back to the server of shard 0 (see BugPipeline.copy_shard_results_to_server).
+        The copy of the prepared bug may hold other mutant directories that are stale on this server.
+        """
+        result_dirs = [
+            f"mutant_{mutantIdx}" for mutantIdx in shard_mutants
+            if self.LEDGER.is_finished(mutantIdx)
+            and os.path.isdir(os.path.join(self.RESULT_DIR, f"coverage_results/mutant_{mutantIdx}"))
+        ]
+        with open(self.get_shard_results_file(self.SHARD[0]), 'w') as f:
+            f.writelines(f"{result_dir}\n" for result_dir in result_dirs)
+        LOGGER.info(f"Shard {self.SHARD[0]}/{self.SHARD[1]}: {len(result_dirs)} of {len(shard_mutants)} mutant results to copy back.")
+
+    @traced()
+    def merge_shards(self):
+        """
+        Merge the ledgers of the shards (their coverage_results were copied into this result directory).
+        """
+        ledger = MutantLedger(self.get_ledger_file(0), self.REPORT_FILES)
+        for shard_index in range(1, self.MERGE_SHARDS):
+            shard_ledger_file = self.get_ledger_file(shard_index)
+            if not os.path.exists(shard_ledger_file):
+                LOGGER.error(f"Ledger of shard {shard_index} is missing, its mutants are saved without results.")
+                continue
+            num_entries = ledger.merge(shard_ledger_file)
+            os.remove(shard_ledger_file)
+            LOGGER.info(f"Merged {num_entries} ledger entries of shard {shard_index}.")
+        LOGGER.info(f"Merged ledger of {self.MERGE_SHARDS} shards: {ledger.count_states()}")
+
+    def start_streaming(self):
+        """
+        Save the results of each mutant to the DB as soon as it finishes (on a separate thread),
+        so the result directory never holds the results of all mutants at once.
+        """
+        self.SAVER = SaverEngine(self.PID, self.BID, self.EL)
+        self.SAVER.prepare_streaming(self.LEDGER, batch_size=self.EXP_CONFIG.get("stream_batch_size", 50))
+        self.STREAM_QUEUE = queue.Queue()
+
+        def ingest():
+            while True:
+                item = self.STREAM_QUEUE.get()
+                if item is None:
+                    break
+                mutantIdx, state = item
+                try:
+                    self.SAVER.ingest_mutant(mutantIdx, state)
+                except Exception as e:
+                    # the mutant is ingested again by finish_streaming
+                    LOGGER.error(f"Failed to stream results of mutant {mutantIdx}: {type(e).__name__}: {str(e)}")
+
+        self.STREAM_THREAD = threading.Thread(target=ingest, daemon=True)
+        self.STREAM_THREAD.start()
 
-    def save_time_measurement_info(self, relevant_tests_dict, mutantIdx2mutantInfo, time_info, numLinesByFails):
+    @traced()
+    def finish_streaming(self):
+        self.STREAM_QUEUE.put(None)
+        self.STREAM_THREAD.join()
+        self.SAVER.finish_streaming()
+
+    def save_time_measurement_info(self, relevant_tests_dict, mutantIdx2mutantInfo, time_info, numLinesByFails, num_executed_mutants):
         relevant_test_total_time_ms = 0
         num_failing_tcs = 0
         num_passing_tcs = 0
@@ -98,6 +317,7 @@ class MutationTestingEngine:
             "num_of_relevant_tests": len(relevant_tests_dict),
             "relevant_test_total_time_ms": relevant_test_total_time_ms,
             "num_mutants": len(mutantIdx2mutantInfo),
+            "num_executed_mutants": num_executed_mutants,
             "num_lines_executed_by_fail_tcs": numLinesByFails
         }
 
@@ -107,29 +327,37 @@ class MutationTestingEngine:
 
     def execute_baseline_results(self):
         # list all tests
-        list_all_tests(self.PID, self.BID, self.EL, 0, self.SCRIPTS_DIR)
+        with span("list_all_tests", "subprocess"):
+            list_all_tests(self.PID, self.BID, self.EL, 0, self.SCRIPTS_DIR)
 
         # instrument
-        inst_start_time = time.time()
-        instrument(self.PID, self.BID, self.EL, 0, "baseline", self.SCRIPTS_DIR)
-        inst_duration_sec = time.time() - inst_start_time
+        with span("instrument", "subprocess", work="baseline") as instr_span:
+            instrument(self.PID, self.BID, self.EL, 0, "baseline", self.SCRIPTS_DIR)
 
         # execute
-        exec_start_time = time.time()
-        execute_with_coverage(self.PID, self.BID, self.EL, 0, "baseline", "all_tests", self.SCRIPTS_DIR)
-        exec_duration_sec = time.time() - exec_start_time
+        with span("execute_with_coverage", "subprocess", work="baseline") as exec_span:
+            execute_with_coverage(self.PID, self.BID, self.EL, 0, "baseline", "all_tests", self.SCRIPTS_DIR)
 
         # process_cov
-        process_start_time = time.time()
-        process_cov(self.PID, self.BID, self.EL, 0, "baseline", self.SCRIPTS_DIR)
-        process_duration_sec = time.time() - process_start_time
+        with span("process_cov", "subprocess", work="baseline") as process_span:
+            process_cov(self.PID, self.BID, self.EL, 0, "baseline", self.SCRIPTS_DIR)
 
         return {
-            "instr_duration_sec": inst_duration_sec,
-            "exec_duration_sec": exec_duration_sec,
-            "process_duration_sec": process_duration_sec
+            "instr_duration_sec": instr_span.duration_sec,
+            "exec_duration_sec": exec_span.duration_sec,
+            "process_duration_sec": process_span.duration_sec
         }
 
+    def save_mutation_testing_mode(self):
+        with open(os.path.join(self.RESULT_DIR, "subjectInfo/mutation_testing_mode.json"), 'w') as f:
+            json.dump({"coverage_free": self.COVERAGE_FREE}, f)
+
+    @traced()
+    def execute_baseline_outcomes(self):
+        if not execute_outcomes(self.PID, self.BID, self.EL, 0, "baseline_outcomes", "relevant_tests", self.SCRIPTS_DIR):
+            raise RuntimeError(f"Failed to execute baseline outcomes for {self.PID}-{self.BID}.")
+
+    @traced()
     def get_results(self, work_name):
         # Get the results for the specified work name
         lineIdx2lineInfo = get_line_info(os.path.join(
@@ -150,6 +378,7 @@ class MutationTestingEngine:
             "tcsResults": tcsResults
         }
 
+    @traced()
     def save_relevant_tests(self, baseline_results):
         # get lines executed by all failing tcs
         linesExecutedByFailTcsBitVal = getLinesExecutedByFailTcs(baseline_results)
@@ -183,6 +412,7 @@ class MutationTestingEngine:
         numLinesByFails = linesExecutedByFailTcsBitStr.count("1")
         return relevant_tests, numLinesByFails
 
+    @traced()
     def get_mutants(self):
         mutants_dir = os.path.join(self.RESULT_DIR, "pit-results/mutants")
         # traverse through mutant files
@@ -200,12 +430,150 @@ class MutationTestingEngine:
                     mutantIdx2mutantInfo[mutantIdx] = mutantInfo
         return mutantIdx2mutantInfo
 
+    @traced()
+    def prune_mutants(self, mutantIdx2mutantInfo, relevant_lines):
+        kept_mutants = prune_mutants_to_lines(mutantIdx2mutantInfo, relevant_lines)
+
+        num_mutants = len(mutantIdx2mutantInfo)
+        num_pruned = num_mutants - len(kept_mutants)
+        pruning_info = {
+            "num_mutants": num_mutants,
+            "num_kept_mutants": len(kept_mutants),
+            "num_pruned_mutants": num_pruned,
+            "pruned_ratio": num_pruned / num_mutants if num_mutants else 0.0,
+            "num_relevant_lines": len(relevant_lines)
+        }
+        with open(os.path.join(self.RESULT_DIR, "subjectInfo/mutant_pruning.json"), 'w') as f:
+            json.dump(pruning_info, f)
+
+        LOGGER.info(f"Pruned {num_pruned}/{num_mutants} mutants ({pruning_info['pruned_ratio']:.2%}) not on the {len(relevant_lines)} lines executed by failing tests.")
+        return kept_mutants
+
+    @traced()
+    def sample_mutants(self, mutantIdx2mutantInfo, baseline_results, relevant_tests, relevant_lines):
+        line_selection_formula = self.EXP_CONFIG["line_selection_formula"]
+        target_lines = max(self.EXP_CONFIG["target_lines"])
+        mut_cnt = max(self.EXP_CONFIG["mutation_cnt"])
+        reserve_cnt = self.EXP_CONFIG.get("mutant_sampling_reserve", 0)
+        seed = self.EXP_CONFIG.get("mutant_sampling_seed", 0)
+
+        # rank the lines on the baseline spectrum, as the constructor does from the DB
+        set_relevant_line_cov_bit(relevant_tests, relevant_lines, baseline_results)
+        lineIdx2lineData, tcIdx2tcInfo = get_baseline_lineIdx2lineData(relevant_tests, relevant_lines)
+        selected_lineIdx = select_target_lines(lineIdx2lineData, tcIdx2tcInfo, line_selection_formula, target_lines / 100.0)
+
+        sampled_mutants, reserve_mutants = sample_mutants(
+            mutantIdx2mutantInfo, lineIdx2lineData, selected_lineIdx, mut_cnt, reserve_cnt, seed
+        )
+
+        sampling_info = {
+            "seed": seed,
+            "line_selection_formula": line_selection_formula,
+            "target_lines": target_lines,
+            "mutation_cnt": mut_cnt,
+            "reserve_cnt": reserve_cnt,
+            "num_lines": len(lineIdx2lineData),
+            "num_selected_lines": len(selected_lineIdx),
+            "num_mutants": len(mutantIdx2mutantInfo),
+            "sampled_mutants": sampled_mutants,
+            "reserve_mutants": reserve_mutants
+        }
+        with open(os.path.join(self.RESULT_DIR, "subjectInfo/mutant_sampling.json"), 'w') as f:
+            json.dump(sampling_info, f)
+
+        LOGGER.info(f"Sampling mode: executing {len(sampled_mutants) + len(reserve_mutants)}/{len(mutantIdx2mutantInfo)} mutants (seed {seed}).")
+        return {
+            mutantIdx: mutantIdx2mutantInfo[mutantIdx]
+            for mutantIdx in sampled_mutants + reserve_mutants
+        }
+
+    @traced()
+    def deduplicate_mutants(self, mutantIdx2mutantInfo):
+        normalize = self.EXP_CONFIG.get("mutant_dedup_normalize", False)
+        duplicates, equivalent = group_duplicate_mutants(
+            mutantIdx2mutantInfo, self.target_bin_classes_dir, normalize
+        )
+
+        num_mutants = len(mutantIdx2mutantInfo)
+        dedup_info = {
+            "normalize": normalize,
+            "num_mutants": num_mutants,
+            "num_unique": num_mutants - len(duplicates) - len(equivalent),
+            "num_duplicates": len(duplicates),
+            "num_equivalent": len(equivalent),
+            "duplicates": duplicates,
+            "equivalent": equivalent
+        }
+        with open(os.path.join(self.RESULT_DIR, "subjectInfo/mutant_dedup.json"), 'w') as f:
+            json.dump(dedup_info, f)
+
+        LOGGER.info(f"Dedup: {len(duplicates)} duplicate and {len(equivalent)} equivalent mutants out of {num_mutants} are not executed.")
+        return {
+            mutantIdx: mutantInfo
+            for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items()
+            if mutantIdx not in duplicates and mutantIdx not in equivalent
+        }
+
+    @traced()
     def prepare_for_mutation_testing(self):
+        self.log_cds_startup()
+        if not self.COVERAGE_FREE and self.EXP_CONFIG.get("persistent_runner", True):
+            LOGGER.info("persistent_runner only applies to coverage-free mode, each mutant starts its GZoltar JVMs.")
+        self.set_core_workspaces()
         for core in range(self.PARALLEL):
             self.reset_working_directory(core)
 
+    def log_cds_startup(self):
+        cds_json = os.path.join(self.RESULT_DIR, "subjectInfo/cds_startup.json")
+        if not os.path.exists(cds_json):
+            return
+        with open(cds_json, 'r') as f:
+            cds_info = json.load(f)
+        LOGGER.info(f"CDS archive {cds_info['archive']} ({cds_info['num_classes']} classes): JVM startup {cds_info['without_cds_ms']} ms -> {cds_info['with_cds_ms']} ms (saving {cds_info['saving_ms']} ms per launch).")
+
+    def set_core_workspaces(self):
+        # core -> scratch workspace of the core, None when the core directory stays on disk
+        self.CORE_WORKSPACES = {core: None for core in range(self.PARALLEL)}
+        self.WORKSPACE_DIR = None
+
+        workspace_dir = self.EXP_CONFIG.get("workspace_dir")
+        if not workspace_dir:
+            return
+
+        self.WORKSPACE_DIR = os.path.join(workspace_dir, self.EL, f"{self.PID}-{self.BID}b")
+        os.makedirs(self.WORKSPACE_DIR, exist_ok=True)
+
+        # working classes, instrumented classes, gzoltar.ser and the report of one mutant
+        self.CORE_WORKSPACE_BYTES = 3 * get_directory_size(self.target_bin_classes_dir)
+        self.WORKSPACE_CAP_BYTES = self.EXP_CONFIG.get("workspace_cap_mb", 0) * 1024 * 1024
+        workspace_cores = assign_core_workspaces(
+            self.PARALLEL, self.CORE_WORKSPACE_BYTES, self.WORKSPACE_CAP_BYTES, get_free_space(self.WORKSPACE_DIR)
+        )
+        for core in workspace_cores:
+            self.CORE_WORKSPACES[core] = self.WORKSPACE_DIR
+
+        LOGGER.info(f"Workspace {self.WORKSPACE_DIR}: {len(workspace_cores)} of {self.PARALLEL} cores placed (~{self.CORE_WORKSPACE_BYTES // (1024 * 1024)} MB each), the others fall back to disk.")
+
+    def get_core_dir(self, core):
+        return os.path.join(self.CORE_WORKSPACES[core] or self.REPO_DIR, f"core{core}")
+
+    def get_core_env(self, core):
+        if self.CORE_WORKSPACES[core] is None:
+            return None
+        return {**os.environ, "CORE_WORKSPACE": self.CORE_WORKSPACES[core]}
+
+    def move_core_to_disk(self, core):
+        LOGGER.warning(f"Workspace {self.WORKSPACE_DIR} is running out of space, moving core{core} to disk.")
+        shutil.rmtree(self.get_core_dir(core), ignore_errors=True)
+        self.CORE_WORKSPACES[core] = None
+        self.reset_working_directory(core)
+
+    def clean_workspace(self):
+        if self.WORKSPACE_DIR is not None:
+            shutil.rmtree(self.WORKSPACE_DIR, ignore_errors=True)
+
     def reset_working_directory(self, core):
-        core_working_dir = os.path.join(self.REPO_DIR, f"core{core}")
+        core_working_dir = self.get_core_dir(core)
         working_classes_dir = os.path.join(core_working_dir, "working_classes")
         if os.path.exists(working_classes_dir):
             shutil.rmtree(working_classes_dir)
@@ -213,7 +581,12 @@ class MutationTestingEngine:
 
         shutil.copytree(self.target_bin_classes_dir, working_classes_dir, dirs_exist_ok=True)
 
-    def start_mutation_testing(self, mutantIdx2mutantInfo):
+    def start_mutation_testing(self, mutantIdx2mutantInfo, mutantIdx2cost, num_finished=0, num_mutants=None):
+        # mutants finished by previous (interrupted) runs count as done
+        num_mutants = num_mutants if num_mutants is not None else len(mutantIdx2mutantInfo)
+        progress = {"done": num_finished}
+        progress_lock = threading.Lock()
+
         def replace_class(core, srcClassPath, tgtClassPath):
             """
             srcClassPath (name can differ to tgtClassPath)
@@ -225,80 +598,169 @@ class MutationTestingEngine:
             except Exception as e:
                 LOGGER.error(f"core{core} Failed to replace class {tgtClassPath} with {srcClassPath}: {e}")
 
-        def worker(task_queue, core):
-            """Worker function that conducts mutation testing for a mutant from a shared queue"""
-            coreDir = os.path.join(self.REPO_DIR, f"core{core}")
-            working_classes_dir = os.path.join(coreDir, "working_classes")
-
+        def worker(scheduler, core):
+            """Worker function that conducts mutation testing for the mutants the scheduler dispatches to a core"""
+            name_thread(f"core{core}")
             while True:
+                task = scheduler.get_task(core)
+                if task is None:
+                    break
+                mutantIdx, mutantInfo = task
+
+                # fall back to disk when the scratch workspace fills up (free space or cap)
+                if self.CORE_WORKSPACES[core] is not None and not workspace_has_room(self.WORKSPACE_DIR, self.CORE_WORKSPACE_BYTES, self.WORKSPACE_CAP_BYTES):
+                    self.move_core_to_disk(core)
+                working_classes_dir = os.path.join(self.get_core_dir(core), "working_classes")
+                env = self.get_core_env(core)
+
+                LOGGER.info(f"Starting mutation testing for mutant {mutantIdx}")
+
+                # 0. set information
+                mutantClassFilePath = mutantInfo["classFilePath"]
+                className = mutantInfo["className"]
+                relClassPath = className.replace('.', '/') + ".class"
+
+                # 1. replace ogClass with mutantClass
+                tgtClassPath = os.path.join(working_classes_dir, relClassPath)
+                srcClassPath = mutantClassFilePath
+                replace_class(core, srcClassPath, tgtClassPath)
+
+                state = "error"
+                workName = f"mutant_{mutantIdx}"
+                mutantResultDir = os.path.join(self.RESULT_DIR, f"coverage_results/{workName}")
+                self.LEDGER.update(mutantIdx, "running")
                 try:
-                    mutantIdx, mutantInfo = task_queue.get(timeout=1)
-                    if mutantIdx is None:
-                        break
-
-                    LOGGER.info(f"Starting mutation testing for mutant {mutantIdx}")
+                    if self.COVERAGE_FREE:
+                        # 2-5. execute uninstrumented, only the outcomes are written
+                        try:
+                            if self.execute_mutant_outcomes(core, workName, srcClassPath, env):
+                                state = "done"
+                        except sp.TimeoutExpired:
+                            LOGGER.warning(f"Core {core}: Mutant {mutantIdx} timed out (likely infinite loop)")
+                            state = "timeout"
+                    else:
+                        # 2. instrument
+                        with span("instrument", "subprocess", mutant=mutantIdx):
+                            instrument(self.PID, self.BID, self.EL, core, workName, self.SCRIPTS_DIR, srcClassPath, env=env)
 
-                    # 0. set information
-                    mutantClassFilePath = mutantInfo["classFilePath"]
-                    className = mutantInfo["className"]
-                    relClassPath = className.replace('.', '/') + ".class"
+                        # 3. execute
+                        try:
+                            with span("execute_with_coverage", "subprocess", mutant=mutantIdx):
+                                execute_with_coverage(self.PID, self.BID, self.EL, core, workName, "relevant_tests", self.SCRIPTS_DIR, srcClassPath, timeout=self.EXEC_DURATION_SECS, env=env)
+                        except sp.TimeoutExpired:
+                            LOGGER.warning(f"Core {core}: Mutant {mutantIdx} timed out (likely infinite loop)")
+                            state = "timeout"
 
-                    # 1. replace ogClass with mutantClass
+                        # 5. process cov
+                        with span("process_cov", "subprocess", mutant=mutantIdx):
+                            covered = process_cov(self.PID, self.BID, self.EL, core, workName, self.SCRIPTS_DIR, srcClassPath, env=env)
+                        if covered and state != "timeout":
+                            state = "done"
+
+                except sp.CalledProcessError as e:
+                    if e.returncode == 124:  # timeout exit code
+                        LOGGER.warning(f"Core {core}: Mutant {mutantIdx} execution timed out")
+                        state = "timeout"
+                    else:
+                        LOGGER.error(f"Core {core}: Mutant {mutantIdx} failed with exit code {e.returncode}")
+                except Exception as e:
+                    LOGGER.error(f"Core {core}: Mutant {mutantIdx} failed: {type(e).__name__}: {str(e)}")
+                finally:
+                    # 6. replace mutantClass to ogClass
                     tgtClassPath = os.path.join(working_classes_dir, relClassPath)
-                    srcClassPath = mutantClassFilePath
+                    srcClassPath = os.path.join(self.REPO_DIR, self.BIN_CLASSES_DIRNAME, relClassPath)
                     replace_class(core, srcClassPath, tgtClassPath)
 
-                    try:
-                        # 2. instrument
-                        instrument(self.PID, self.BID, self.EL, core, f"mutant_{mutantIdx}", self.SCRIPTS_DIR, srcClassPath)
+                    # 7. record the state of the mutant in the ledger
+                    checksum = compute_result_checksum(mutantResultDir, self.REPORT_FILES) if state == "done" else None
+                    if state == "done" and checksum is None:
+                        state = "error"
+                    self.LEDGER.update(mutantIdx, state, mutantResultDir, checksum)
+                    if self.STREAM_RESULTS:
+                        self.STREAM_QUEUE.put((mutantIdx, state))
 
-                        # 3. execute
-                        execute_with_coverage(self.PID, self.BID, self.EL, core, f"mutant_{mutantIdx}", "relevant_tests", self.SCRIPTS_DIR, srcClassPath, timeout=self.EXEC_DURATION_SECS)
+                    scheduler.task_done(core, mutantIdx)
+                    with progress_lock:
+                        progress["done"] += 1
+                        num_done = progress["done"]
+                    self.TELEMETRY.progress("mutants", num_done, num_mutants)
 
-                        # 5. process cov
-                        process_cov(self.PID, self.BID, self.EL, core, f"mutant_{mutantIdx}", self.SCRIPTS_DIR, srcClassPath)
-
-                    except sp.TimeoutExpired:
-                        LOGGER.warning(f"Core {core}: Mutant {mutantIdx} timed out (likely infinite loop)")
-                    except sp.CalledProcessError as e:
-                        if e.returncode == 124:  # timeout exit code
-                            LOGGER.warning(f"Core {core}: Mutant {mutantIdx} execution timed out")
-                        else:
-                            LOGGER.error(f"Core {core}: Mutant {mutantIdx} failed with exit code {e.returncode}")
-                    except Exception as e:
-                        LOGGER.error(f"Core {core}: Mutant {mutantIdx} failed: {type(e).__name__}: {str(e)}")
-                    finally:
-                        # 6. replace mutantClass to ogClass
-                        tgtClassPath = os.path.join(working_classes_dir, relClassPath)
-                        srcClassPath = os.path.join(self.REPO_DIR, self.BIN_CLASSES_DIRNAME, relClassPath)
-                        replace_class(core, srcClassPath, tgtClassPath)
-                        
-                        task_queue.task_done()
-                except queue.Empty:
-                    break
 
+        # core -> (persistent runner, workspace it was started in), coverage-free mode only
+        self.RUNNERS = {}
 
-        task_queue = queue.Queue()
+        scheduler = TaskScheduler(
+            range(self.PARALLEL),
+            policy=self.EXP_CONFIG.get("mutant_scheduler", "fifo"),
+            work_stealing=self.EXP_CONFIG.get("mutant_work_stealing", False)
+        )
         for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items():
-            task_queue.put((mutantIdx, mutantInfo))
-            LOGGER.debug(f"Added mutant {mutantIdx}")
+            scheduler.submit(mutantIdx, mutantInfo, cost=mutantIdx2cost[mutantIdx])
+            LOGGER.debug(f"Added mutant {mutantIdx} (estimated cost: {mutantIdx2cost[mutantIdx]:.1f} ms)")
+        scheduler.start()
 
         # Start worker threads
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.PARALLEL) as executor:
             futures = [
-                executor.submit(worker, task_queue, core) for core in range(self.PARALLEL)
+                executor.submit(worker, scheduler, core) for core in range(self.PARALLEL)
             ]
 
-            # Wait for all tasks to be completed
-            task_queue.join()
-
-            # Signal all workers to shut down by adding sentinel values
-            for _ in range(self.PARALLEL):
-                task_queue.put((None, None))
-            
             # Wait for all workers to finish
             for future in concurrent.futures.as_completed(futures):
                 try:
                     future.result()
                 except Exception as e:
                     LOGGER.error(f"Mutation testing failed: {e}")
+
+        for runner, _ in self.RUNNERS.values():
+            runner.close()
+        self.TELEMETRY.progress("mutants", progress["done"], num_mutants, force=True)
+        self.save_schedule_report(scheduler)
+        self.clean_workspace()
+
+    def get_runner(self, core):
+        workspace = self.CORE_WORKSPACES[core]
+        runner, runner_workspace = self.RUNNERS.get(core, (None, None))
+        if runner is not None and runner_workspace != workspace:
+            # the core moved to disk, its classes are loaded from another directory
+            runner.close()
+            runner = None
+        if runner is None:
+            runner = JvmRunner(
+                f"./3_start_outcome_server.sh {self.PID} {self.BID} {self.EL} {core}",
+                core, cwd=self.SCRIPTS_DIR, env=self.get_core_env(core)
+            )
+            self.RUNNERS[core] = (runner, workspace)
+        return runner
+
+    @traced()
+    def execute_mutant_outcomes(self, core, workName, srcClassPath, env):
+        """
+        Execute the relevant tests on a mutant without coverage, on the persistent runner of the core
+        unless persistent_runner is disabled in .experiment_config.
+        :raises sp.TimeoutExpired: If the execution exceeds EXEC_DURATION_SECS.
+        """
+        if not self.EXP_CONFIG.get("persistent_runner", True):
+            return execute_outcomes(self.PID, self.BID, self.EL, core, workName, "relevant_tests", self.SCRIPTS_DIR, srcClassPath, timeout=self.EXEC_DURATION_SECS, env=env)
+
+        work_cov_dir = os.path.join(self.RESULT_DIR, f"coverage_results/{workName}")
+        shutil.rmtree(work_cov_dir, ignore_errors=True)
+        os.makedirs(os.path.join(work_cov_dir, "sfl/txt"), exist_ok=True)
+        try:
+            return self.get_runner(core).run(
+                os.path.join(self.RESULT_DIR, "subjectInfo/relevant_tests.txt"),
+                os.path.join(work_cov_dir, "sfl/txt/tests.csv"),
+                timeout=self.EXEC_DURATION_SECS
+            )
+        except RuntimeError as e:
+            LOGGER.error(f"Core {core}: {e}")
+            return False
+
+    def save_schedule_report(self, scheduler):
+        report = scheduler.get_report()
+        with open(os.path.join(self.RESULT_DIR, "subjectInfo/mutation_schedule.json"), 'w') as f:
+            json.dump(report, f)
+
+        LOGGER.info(f"Schedule ({report['policy']}): makespan {report['makespan_sec']:.1f}s, utilization {report['utilization']:.2%}, idle {report['total_idle_sec']:.1f} core-seconds.")
+        for core, stats in report["workers"].items():
+            LOGGER.debug(f"core{core}: {stats['num_tasks']} mutants ({stats['num_stolen']} stolen), busy {stats['busy_sec']:.1f}s, idle {stats['idle_sec']:.1f}s")
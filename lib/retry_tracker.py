@@ -0,0 +1,104 @@
+import threading
+import logging
+
+from utils.failure_utils import is_transient_failure
+
+LOGGER = logging.getLogger(__name__)
+
+BUG_STATES = ["running", "retrying", "done", "failed"]
+
+class RetryTracker:
+    """
+    Tracks the attempts of each bug and its final status. A bug that fails with a transient
+    failure (see utils.failure_utils) is retried, up to max_retries times, on a server where it did not fail yet
+    (any server once it failed on all of them); other failures are final.
+    """
+    def __init__(self, servers, max_retries=2):
+        self.servers = list(servers)
+        self.max_retries = max_retries
+
+        self.lock = threading.Lock()
+        self.running = {}  # bid -> number of running attempts
+        self.attempts = {}  # bid -> [{"server", "failure"}]
+        self.status = {}  # bid -> one of BUG_STATES
+        self.failures = {}  # bid -> failure type of the last failed attempt
+        self.pending = []  # bugs to retry, in order of failure
+
+    def start(self, bid, server):
+        with self.lock:
+            self.running[bid] = self.running.get(bid, 0) + 1
+            self.attempts.setdefault(bid, [])
+            if self.status.get(bid) != "done":
+                self.status[bid] = "running"
+
+    def abandon(self, bid, server):
+        """
+        Record the end of an attempt that was cancelled (e.g., a duplicate that lost).
+        """
+        with self.lock:
+            self.running[bid] -= 1
+
+    def finish(self, bid, server, failure=None):
+        """
+        Record the end of an attempt.
+        :param failure: Failure type of the attempt, None if it succeeded.
+        :return: True if the bug is queued to be retried.
+        """
+        with self.lock:
+            self.running[bid] -= 1
+            self.attempts[bid].append({"server": server, "failure": failure})
+            if failure is None:
+                self.status[bid] = "done"
+                return False
+            self.failures[bid] = failure
+            if self.status.get(bid) == "done" or self.running[bid] > 0:
+                # another attempt (a duplicate) decides the status of the bug
+                return False
+
+            num_retries = len(self.attempts[bid]) - 1
+            if is_transient_failure(failure) and num_retries < self.max_retries:
+                self.status[bid] = "retrying"
+                self.pending.append(bid)
+                LOGGER.warning(f"Bug {bid} failed on server {server} ({failure}), retrying it on another server.")
+                return True
+            self.status[bid] = "failed"
+            LOGGER.warning(f"Bug {bid} failed on server {server} ({failure}) after {num_retries} retries.")
+            return False
+
+    def get_retry(self, server):
+        """
+        Get a bug to retry on a server.
+        :return: Bug ID or None.
+        """
+        with self.lock:
+            for bid in self.pending:
+                failed_servers = {attempt["server"] for attempt in self.attempts[bid]}
+                if server not in failed_servers or failed_servers.issuperset(self.servers):
+                    self.pending.remove(bid)
+                    return bid
+            return None
+
+    def has_work(self):
+        """
+        True while bugs are running (they may fail) or waiting to be retried.
+        """
+        with self.lock:
+            return len(self.pending) > 0 or any(count > 0 for count in self.running.values())
+
+    def get_failed(self):
+        with self.lock:
+            return [bid for bid, status in self.status.items() if status == "failed"]
+
+    def get_report(self):
+        """
+        :return: Mapping of bug IDs to {"status", "failure", "attempts"}.
+        """
+        with self.lock:
+            return {
+                str(bid): {
+                    "status": status,
+                    "failure": self.failures.get(bid) if status != "done" else None,
+                    "attempts": [dict(attempt) for attempt in self.attempts.get(bid, [])]
+                }
+                for bid, status in self.status.items()
+            }
@@ -1,6 +1,9 @@
 from lib.database import CRUD
 from utils.data_read_utils import *
 from utils.general_utils import *
+from lib.mutant_ledger import MutantLedger, FINISHED_STATES
+from lib.tracer import traced, start_tracing, stop_tracing
+from lib.memory_profiler import start_profiling, stop_profiling, profile_task
 
 import csv
 import json
@@ -11,12 +14,23 @@ import shutil
 
 LOGGER = logging.getLogger(__name__)
 
+# *_cov_sim value of mutants executed in coverage-free mode (coverage is not measured)
+COV_SIM_SENTINEL = -1.0
+
+MUTATION_INFO_COLUMNS = [
+    "fault_idx", "mutation_idx", "class", "method", "line", "mutator",
+    "result_transition", "exception_type_transition", "exception_msg_transition", "stacktrace_transition",
+    "f2p_cov_sim", "p2f_cov_sim", "f2f_cov_sim", "p2p_cov_sim", "status", "num_tests_run"
+]
+
 class SaverEngine:
-    def __init__(self, pid, bid, experiment_label, timeMeasurement=False):
+    def __init__(self, pid, bid, experiment_label, timeMeasurement=False, trace=False, profileMemory=False):
         self.PID = pid
         self.BID = bid
         self.EL = experiment_label
         self.TIME_MEASUREMENT = timeMeasurement
+        self.TRACE = trace
+        self.PROFILE_MEMORY = profileMemory
 
         load_dotenv()
         self.os_copy = os.environ.copy()
@@ -34,13 +48,48 @@ class SaverEngine:
         self.WORK_DIR = f"{self.D4J_DIR}{self.EL}/{self.PID}"
         self.REPO_DIR = f"{self.WORK_DIR}/{self.PID}-{self.BID}b"
         self.RESULT_DIR = f"{self.WORK_DIR}/out_dir/{self.PID}-{self.BID}b-result"
+        self.TRACE_FILE = f"{self.WORK_DIR}/out_dir/{self.PID}-{self.BID}b-trace.json"
+        self.MEMORY_PROFILE_FILE = f"{self.WORK_DIR}/out_dir/{self.PID}-{self.BID}b-memory.json"
 
     def run(self):
+        if self.TRACE:
+            start_tracing(self.TRACE_FILE, f"saver {self.PID}-{self.BID}")
+        if self.PROFILE_MEMORY:
+            start_profiling(self.MEMORY_PROFILE_FILE)
+        try:
+            with profile_task(f"{self.PID}-{self.BID}"):
+                self.save_results()
+        finally:
+            stop_profiling()
+            stop_tracing()
+
+    def save_results(self):
         if self.TIME_MEASUREMENT:
             self.write_time_measurement_to_db()
             return
         
         self.fault_idx = self.save_fault()
+        baseline_results, relevant_tests, relevant_lines = self.save_baseline()
+
+        # mutants on non-relevant lines are pruned before mutation testing as well
+        mutantIdx2mutantInfo = prune_mutants_to_lines(self.get_mutants(), relevant_lines)
+        mutantIdx2mutantInfo = self.filter_sampled_mutants(mutantIdx2mutantInfo)
+        self.process_mutant_results(
+            relevant_tests, mutantIdx2mutantInfo, len(baseline_results["lineIdx2lineInfo"]),
+            self.get_baseline_outcomes() if self.COVERAGE_FREE else None
+        )
+        self.set_mutant_status(mutantIdx2mutantInfo)
+        self.apply_dedup_results(relevant_tests, mutantIdx2mutantInfo)
+        self.save_mutation_info(mutantIdx2mutantInfo)
+        self.zip_result_dir()
+    
+    @traced()
+    def save_baseline(self):
+        """
+        Save the relevant lines and tests of the baseline.
+        :return: (baseline_results, relevant_tests, relevant_lines)
+        """
+        self.COVERAGE_FREE = self.is_coverage_free()
 
         self.tcName2tcIdx = self.getTcName2tcIdx()
         baseline_results = self.get_results("baseline")
@@ -49,23 +98,26 @@ class SaverEngine:
         relevant_lines = get_relevant_lines(baseline_results, linesExecutedByFailTcsBitVal)
         set_relevant_line_cov_bit(relevant_tests, relevant_lines, baseline_results)
 
-        self.save_line_info(relevant_lines)
-        self.save_tc_info(
-            relevant_tests,
-            len(baseline_results["lineIdx2lineInfo"]),
-            len(relevant_lines)
-        )
+        # a resumed streaming run already saved the baseline of the fault
+        if not self.DB.value_exists("d4j_line_info", {"fault_idx": self.fault_idx}):
+            self.save_line_info(relevant_lines)
+        if not self.DB.value_exists("d4j_tc_info", {"fault_idx": self.fault_idx}):
+            self.save_tc_info(
+                relevant_tests,
+                len(baseline_results["lineIdx2lineInfo"]),
+                len(relevant_lines)
+            )
 
+        return baseline_results, relevant_tests, relevant_lines
 
-        mutantIdx2mutantInfo = self.get_mutants()
-        self.process_mutant_results(relevant_tests, mutantIdx2mutantInfo, len(baseline_results["lineIdx2lineInfo"]))
-        self.save_mutation_info(mutantIdx2mutantInfo)
-        self.zip_result_dir()
-    
+    @traced()
     def write_time_measurement_to_db(self):
         time_measurement_json = os.path.join(self.RESULT_DIR, "subjectInfo/time_measurement.json")
         with open(time_measurement_json, 'r') as f:
             time_data = json.load(f)
+            # tables created before the mutants after pruning were measured
+            if "num_executed_mutants" in time_data and not self.DB.column_exists("d4j_time_measurement_info", "num_executed_mutants"):
+                self.DB.add_column("d4j_time_measurement_info", "num_executed_mutants INTEGER")
             col = time_data.keys()
             col_str = ", ".join(col)
             self.DB.insert(
@@ -79,13 +131,17 @@ class SaverEngine:
         # Remove repo directory
         shutil.rmtree(self.REPO_DIR, ignore_errors=True)
 
+    @traced()
     def save_fault(self):
-        values = [self.PID, self.BID, self.EL]
-        self.DB.insert(
-            "d4j_fault_info",
-            "project, bug_id, experiment_label",
-            values
-        )
+        conditions = {"project": self.PID, "bug_id": self.BID, "experiment_label": self.EL}
+        # a resumed streaming run reuses the fault saved when it started
+        if not self.DB.value_exists("d4j_fault_info", conditions):
+            values = [self.PID, self.BID, self.EL]
+            self.DB.insert(
+                "d4j_fault_info",
+                "project, bug_id, experiment_label",
+                values
+            )
 
         fault_idx = self.DB.read(
             "d4j_fault_info",
@@ -103,6 +159,26 @@ class SaverEngine:
         LOGGER.info(f"Fault information saved for subject {self.PID}, bug ID {self.BID}, experiment label {self.EL} with fault index {fault_idx[0][0]}.")
         return fault_idx[0][0]
     
+    def is_coverage_free(self):
+        mode_json = os.path.join(self.RESULT_DIR, "subjectInfo/mutation_testing_mode.json")
+        if not os.path.exists(mode_json):
+            return False
+        with open(mode_json, 'r') as f:
+            return json.load(f).get("coverage_free", False)
+
+    def get_baseline_outcomes(self):
+        """
+        Outcomes of the original program under the runner of coverage-free mode,
+        exceptions and stacktraces of mutants are compared to these instead of the GZoltar baseline.
+        """
+        tcIdx2tcInfo, _ = get_test_info(os.path.join(
+            self.RESULT_DIR, "coverage_results/baseline_outcomes/sfl/txt/tests.csv"
+        ))
+        return {
+            f"{tcInfo['className']}#{tcInfo['methodName']}": tcInfo
+            for tcInfo in tcIdx2tcInfo.values()
+        }
+
     def getTcName2tcIdx(self):
         relevant_tests_txt = os.path.join(self.RESULT_DIR, "subjectInfo/relevant_tests.txt")
         tcName2tcIdx = {}
@@ -119,14 +195,22 @@ class SaverEngine:
     def get_results(self, work_name):
         LOGGER.debug(f"Getting results for work name: {work_name}")
         # Get the results for the specified work name
-        lineIdx2lineInfo = get_line_info(os.path.join(
-            self.RESULT_DIR, f"coverage_results/{work_name}/sfl/txt/spectra.csv"
-        ))
-
         tcIdx2tcInfo, tcsResults = get_test_info(os.path.join(
             self.RESULT_DIR, f"coverage_results/{work_name}/sfl/txt/tests.csv"
         ))
 
+        if self.COVERAGE_FREE and work_name != "baseline":
+            # mutants of coverage-free mode only write tests.csv (no spectra.csv or matrix.txt)
+            return {
+                "lineIdx2lineInfo": {},
+                "tcIdx2tcInfo": tcIdx2tcInfo,
+                "tcsResults": tcsResults
+            }
+
+        lineIdx2lineInfo = get_line_info(os.path.join(
+            self.RESULT_DIR, f"coverage_results/{work_name}/sfl/txt/spectra.csv"
+        ))
+
         get_test_cov(os.path.join(
             self.RESULT_DIR, f"coverage_results/{work_name}/sfl/txt/matrix.txt"
         ), tcIdx2tcInfo)
@@ -212,6 +296,7 @@ class SaverEngine:
         LOGGER.info(f"Save {unique_tc_idx+1} tcs information for subject {self.PID}, bug ID {self.BID}, experiment label {self.EL}.")
         LOGGER.info(f"Total failing tcs: {failing_tcs_count}, passing tcs: {passing_tcs_count} for subject {self.PID}, bug ID {self.BID}, experiment label {self.EL}.")
 
+    @traced()
     def get_mutants(self):
         mutants_dir = os.path.join(self.RESULT_DIR, "pit-results/mutants")
         # traverse through mutant files
@@ -229,25 +314,51 @@ class SaverEngine:
                     mutantIdx2mutantInfo[mutantIdx] = mutantInfo
         return mutantIdx2mutantInfo
 
-    def process_mutant_results(self, relevant_tests, mutantIdx2mutantInfo, num_lines):
-        coverage_results_dir = os.path.join(self.RESULT_DIR, "coverage_results")
-        
-        # Initialize all mutants with default transition results in case they don't have coverage data
+    def filter_sampled_mutants(self, mutantIdx2mutantInfo):
+        """
+        In sampling mode only the sampled (and reserve) mutants were executed,
+        the other mutants must not be saved with default transitions.
+        """
+        sampling_json = os.path.join(self.RESULT_DIR, "subjectInfo/mutant_sampling.json")
+        if not os.path.exists(sampling_json):
+            return mutantIdx2mutantInfo
+
+        with open(sampling_json, 'r') as f:
+            sampling_info = json.load(f)
+        executed_mutants = set(sampling_info["sampled_mutants"] + sampling_info["reserve_mutants"])
+        LOGGER.info(f"Saving {len(executed_mutants)} sampled mutants (seed {sampling_info['seed']}).")
+        return {
+            mutantIdx: mutantInfo
+            for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items()
+            if mutantIdx in executed_mutants
+        }
+
+    def get_default_transitions(self, baseline_outcomes=None):
+        """
+        Transition results of a mutant without (valid) results.
+        """
         num_tests = len(self.tcName2tcIdx)
         default_bit_sequence = "0" * num_tests
+        default_cov_sim = COV_SIM_SENTINEL if baseline_outcomes is not None else 1.0
+        return {
+            "result_transition": default_bit_sequence,
+            "exception_type_transition": default_bit_sequence,
+            "exception_msg_transition": default_bit_sequence,
+            "stacktrace_transition": default_bit_sequence,
+            "f2p_cov_sim": [default_cov_sim] * num_tests,
+            "p2f_cov_sim": [default_cov_sim] * num_tests,
+            "f2f_cov_sim": [default_cov_sim] * num_tests,
+            "p2p_cov_sim": [default_cov_sim] * num_tests,
+        }
+
+    @traced()
+    def process_mutant_results(self, relevant_tests, mutantIdx2mutantInfo, num_lines, baseline_outcomes=None):
+        coverage_results_dir = os.path.join(self.RESULT_DIR, "coverage_results")
         
+        # Initialize all mutants with default transition results in case they don't have coverage data
         for mutantIdx in mutantIdx2mutantInfo:
             if "result_transition" not in mutantIdx2mutantInfo[mutantIdx]:
-                mutantIdx2mutantInfo[mutantIdx].update({
-                    "result_transition": default_bit_sequence,
-                    "exception_type_transition": default_bit_sequence,
-                    "exception_msg_transition": default_bit_sequence,
-                    "stacktrace_transition": default_bit_sequence,
-                    "f2p_cov_sim": [1.0] * num_tests,
-                    "p2f_cov_sim": [1.0] * num_tests,
-                    "f2f_cov_sim": [1.0] * num_tests,
-                    "p2p_cov_sim": [1.0] * num_tests,
-                })
+                mutantIdx2mutantInfo[mutantIdx].update(self.get_default_transitions(baseline_outcomes))
         
         for dirName in os.listdir(coverage_results_dir):
             if not dirName.startswith("mutant"):
@@ -260,94 +371,196 @@ class SaverEngine:
                 LOGGER.warning(f"Found results for mutant {mutantIdx} but no mutant info available")
                 continue
 
-            try:
-                mutantResults = self.get_results(dirName)
-                
-                # Check if we got valid results
-                if not mutantResults["tcIdx2tcInfo"]:
-                    LOGGER.warning(f"No test results found for mutant {mutantIdx}, skipping")
-                    continue
-                    
-            except Exception as e:
-                LOGGER.error(f"Failed to get results for mutant {mutantIdx}: {e}")
+            transition_results = self.get_mutant_transitions(mutantIdx, dirName, relevant_tests, num_lines, baseline_outcomes)
+            if transition_results is None:
                 continue
 
-            transition_results = {
-                "result_transition": "",
-                "exception_type_transition": "",
-                "exception_msg_transition": "",
-                "stacktrace_transition": "",
-                "f2p_cov_sim": [],
-                "p2f_cov_sim": [],
-                "f2f_cov_sim": [],
-                "p2p_cov_sim": [],
-            }
+            # add the processed information to mutantIdx2mutantInfo
+            mutantIdx2mutantInfo[mutantIdx].update(transition_results)
 
-            reversedMutantTcName2TcIdxInfo = {
-                f"{tcInfo['className']}#{tcInfo['methodName']}": {
-                    "tcIdx": tcIdx,
-                    "className": tcInfo["className"],
-                    "methodName": tcInfo["methodName"],
-                    "result": tcInfo["result"],
-                    "exception_type": tcInfo["exception_type"],
-                    "exception_msg": tcInfo["exception_msg"],
-                    "stacktrace": tcInfo["stacktrace"],
-                    "covBitVal": tcInfo["covBitVal"]
-                } for tcIdx, tcInfo in mutantResults["tcIdx2tcInfo"].items()
-            }
-            reversedRelevantTcName2tcIdxInfo = {
-                f"{tcInfo['className']}#{tcInfo['methodName']}": {
-                    "tcIdx": tcIdx,
-                    "className": tcInfo["className"],
-                    "methodName": tcInfo["methodName"],
-                    "result": tcInfo["result"],
-                    "exception_type": tcInfo["exception_type"],
-                    "exception_msg": tcInfo["exception_msg"],
-                    "stacktrace": tcInfo["stacktrace"],
-                    "covBitVal": tcInfo["covBitVal"]
-                } for tcIdx, tcInfo in relevant_tests.items()
-            }
-            for classNameSharpMethodName, tcIdx in self.tcName2tcIdx.items():
-                if classNameSharpMethodName not in reversedRelevantTcName2tcIdxInfo:
-                    LOGGER.error(f"Test case {classNameSharpMethodName} not found in relevant tests for mutant {mutantIdx}.")
-                    raise ValueError(f"Test case {classNameSharpMethodName} not found in relevant tests for mutant {mutantIdx}.")
-
-                baselineTcInfo = reversedRelevantTcName2tcIdxInfo[classNameSharpMethodName]
-                if classNameSharpMethodName in reversedMutantTcName2TcIdxInfo:
-                    mutantTcInfo = reversedMutantTcName2TcIdxInfo[classNameSharpMethodName]
-                    # LOGGER.debug(f"Processing mutant {mutantIdx} for test case {tcIdx}.")
-                    # LOGGER.debug(f"Baseline TC Info: {baselineTcInfo}")
-                    # LOGGER.debug(f"Mutant TC Info: {mutantTcInfo}")
-                    assert baselineTcInfo["className"] == mutantTcInfo["className"]
-                    assert baselineTcInfo["methodName"] == mutantTcInfo["methodName"]
-
-                    resultBit = self.returnTransitionBit(baselineTcInfo["result"], mutantTcInfo["result"])
-                    exceptionTypeBit = self.returnTransitionBit(baselineTcInfo["exception_type"], mutantTcInfo["exception_type"])
-                    exceptionMsgBit = self.returnTransitionBit(baselineTcInfo["exception_msg"], mutantTcInfo["exception_msg"])
-                    stacktraceBit = self.returnTransitionBit(baselineTcInfo["stacktrace"], mutantTcInfo["stacktrace"])
-                    
-                    transition_type, cov_sim = self.returnCovSim(baselineTcInfo, mutantTcInfo, num_lines, len(mutantResults["lineIdx2lineInfo"]))
-                    transition_results[f"{transition_type}_cov_sim"].append(cov_sim)
+            LOGGER.info(f"Processed results for mutant {mutantIdx} with {len(relevant_tests)}:{len(self.tcName2tcIdx)} relevant tests.")
+
+    def get_mutant_transitions(self, mutantIdx, dirName, relevant_tests, num_lines, baseline_outcomes=None):
+        """
+        Compare the results of a mutant (coverage_results/<dirName>) to the baseline.
+        :return: Transition results of the mutant, None if its results cannot be read.
+        """
+        default_cov_sim = COV_SIM_SENTINEL if baseline_outcomes is not None else 1.0
+
+        try:
+            mutantResults = self.get_results(dirName)
+            
+            # Check if we got valid results
+            if not mutantResults["tcIdx2tcInfo"]:
+                LOGGER.warning(f"No test results found for mutant {mutantIdx}, skipping")
+                return None
+                
+        except Exception as e:
+            LOGGER.error(f"Failed to get results for mutant {mutantIdx}: {e}")
+            return None
+
+        transition_results = {
+            "result_transition": "",
+            "exception_type_transition": "",
+            "exception_msg_transition": "",
+            "stacktrace_transition": "",
+            "f2p_cov_sim": [],
+            "p2f_cov_sim": [],
+            "f2f_cov_sim": [],
+            "p2p_cov_sim": [],
+        }
+
+        reversedMutantTcName2TcIdxInfo = {
+            f"{tcInfo['className']}#{tcInfo['methodName']}": {
+                "tcIdx": tcIdx,
+                "className": tcInfo["className"],
+                "methodName": tcInfo["methodName"],
+                "result": tcInfo["result"],
+                "exception_type": tcInfo["exception_type"],
+                "exception_msg": tcInfo["exception_msg"],
+                "stacktrace": tcInfo["stacktrace"],
+                "covBitVal": tcInfo.get("covBitVal", 0)
+            } for tcIdx, tcInfo in mutantResults["tcIdx2tcInfo"].items()
+        }
+        reversedRelevantTcName2tcIdxInfo = {
+            f"{tcInfo['className']}#{tcInfo['methodName']}": {
+                "tcIdx": tcIdx,
+                "className": tcInfo["className"],
+                "methodName": tcInfo["methodName"],
+                "result": tcInfo["result"],
+                "exception_type": tcInfo["exception_type"],
+                "exception_msg": tcInfo["exception_msg"],
+                "stacktrace": tcInfo["stacktrace"],
+                "covBitVal": tcInfo["covBitVal"]
+            } for tcIdx, tcInfo in relevant_tests.items()
+        }
+        if baseline_outcomes is not None:
+            # compare exceptions with the outcomes of the same (uninstrumented) runner
+            for name, tcInfo in reversedRelevantTcName2tcIdxInfo.items():
+                if name in baseline_outcomes:
+                    tcInfo.update({
+                        key: baseline_outcomes[name][key]
+                        for key in ["exception_type", "exception_msg", "stacktrace"]
+                    })
+        for classNameSharpMethodName, tcIdx in self.tcName2tcIdx.items():
+            if classNameSharpMethodName not in reversedRelevantTcName2tcIdxInfo:
+                LOGGER.error(f"Test case {classNameSharpMethodName} not found in relevant tests for mutant {mutantIdx}.")
+                raise ValueError(f"Test case {classNameSharpMethodName} not found in relevant tests for mutant {mutantIdx}.")
+
+            baselineTcInfo = reversedRelevantTcName2tcIdxInfo[classNameSharpMethodName]
+            if classNameSharpMethodName in reversedMutantTcName2TcIdxInfo:
+                mutantTcInfo = reversedMutantTcName2TcIdxInfo[classNameSharpMethodName]
+                # LOGGER.debug(f"Processing mutant {mutantIdx} for test case {tcIdx}.")
+                # LOGGER.debug(f"Baseline TC Info: {baselineTcInfo}")
+                # LOGGER.debug(f"Mutant TC Info: {mutantTcInfo}")
+                assert baselineTcInfo["className"] == mutantTcInfo["className"]
+                assert baselineTcInfo["methodName"] == mutantTcInfo["methodName"]
+
+                resultBit = self.returnTransitionBit(baselineTcInfo["result"], mutantTcInfo["result"])
+                exceptionTypeBit = self.returnTransitionBit(baselineTcInfo["exception_type"], mutantTcInfo["exception_type"])
+                exceptionMsgBit = self.returnTransitionBit(baselineTcInfo["exception_msg"], mutantTcInfo["exception_msg"])
+                stacktraceBit = self.returnTransitionBit(baselineTcInfo["stacktrace"], mutantTcInfo["stacktrace"])
+                
+                if baseline_outcomes is not None:
+                    transition_type = self.returnTransitionType(baselineTcInfo["result"], mutantTcInfo["result"])
+                    cov_sim = COV_SIM_SENTINEL
                 else:
-                    resultBit = "0"
-                    exceptionTypeBit = "0"
-                    exceptionMsgBit = "0"
-                    stacktraceBit = "0"
+                    transition_type, cov_sim = self.returnCovSim(baselineTcInfo, mutantTcInfo, num_lines, len(mutantResults["lineIdx2lineInfo"]))
+                transition_results[f"{transition_type}_cov_sim"].append(cov_sim)
+            else:
+                resultBit = "0"
+                exceptionTypeBit = "0"
+                exceptionMsgBit = "0"
+                stacktraceBit = "0"
+
+                if baselineTcInfo["result"] == 1:
+                    transition_results["f2f_cov_sim"].append(default_cov_sim)
+                elif baselineTcInfo["result"] == 0:
+                    transition_results["p2p_cov_sim"].append(default_cov_sim)
+
+            transition_results["result_transition"] += resultBit
+            transition_results["exception_type_transition"] += exceptionTypeBit
+            transition_results["exception_msg_transition"] += exceptionMsgBit
+            transition_results["stacktrace_transition"] += stacktraceBit
+
+        return transition_results
+
+    @traced()
+    def set_mutant_status(self, mutantIdx2mutantInfo):
+        """
+        Set the status of each executed mutant from the mutant ledger (done/timeout/error).
+        """
+        ledger_file = os.path.join(self.RESULT_DIR, "subjectInfo/mutant_ledger.jsonl")
+        if not os.path.exists(ledger_file):
+            return
 
-                    if baselineTcInfo["result"] == 1:
-                        transition_results["f2f_cov_sim"].append(1.0)
-                    elif baselineTcInfo["result"] == 0:
-                        transition_results["p2p_cov_sim"].append(1.0)
+        ledger = MutantLedger(ledger_file)
+        for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items():
+            mutantInfo["status"] = ledger.get_state(mutantIdx)
+
+    @traced()
+    def apply_dedup_results(self, relevant_tests, mutantIdx2mutantInfo):
+        """
+        Share the results of the executed representative with its duplicate mutants,
+        and give mutants identical to the original class the baseline results.
+        """
+        dedup_json = os.path.join(self.RESULT_DIR, "subjectInfo/mutant_dedup.json")
+        if not os.path.exists(dedup_json):
+            return
 
-                transition_results["result_transition"] += resultBit
-                transition_results["exception_type_transition"] += exceptionTypeBit
-                transition_results["exception_msg_transition"] += exceptionMsgBit
-                transition_results["stacktrace_transition"] += stacktraceBit
+        with open(dedup_json, 'r') as f:
+            dedup_info = json.load(f)
 
-            # add the processed information to mutantIdx2mutantInfo
-            mutantIdx2mutantInfo[mutantIdx].update(transition_results)
+        transition_keys = [
+            "result_transition", "exception_type_transition", "exception_msg_transition", "stacktrace_transition",
+            "f2p_cov_sim", "p2f_cov_sim", "f2f_cov_sim", "p2p_cov_sim"
+        ]
+        for dupIdx, repIdx in dedup_info["duplicates"].items():
+            dupIdx, repIdx = int(dupIdx), int(repIdx)
+            if dupIdx not in mutantIdx2mutantInfo or repIdx not in mutantIdx2mutantInfo:
+                continue
+            repInfo = mutantIdx2mutantInfo[repIdx]
+            mutantIdx2mutantInfo[dupIdx].update({key: repInfo[key] for key in transition_keys})
+            mutantIdx2mutantInfo[dupIdx]["status"] = "duplicate"
 
-            LOGGER.info(f"Processed results for mutant {mutantIdx} with {len(relevant_tests)}:{len(self.tcName2tcIdx)} relevant tests.")
+        for mutantIdx in dedup_info["equivalent"]:
+            if mutantIdx not in mutantIdx2mutantInfo:
+                continue
+            mutantIdx2mutantInfo[mutantIdx].update(self.get_equivalent_transitions(relevant_tests))
+
+        self.save_dedup_info(dedup_info)
+
+    def get_equivalent_transitions(self, relevant_tests):
+        """
+        Transition results of a mutant identical to the original class
+        (coverage similarity is not measured in coverage-free mode, like for the other mutants).
+        """
+        num_tests = len(self.tcName2tcIdx)
+        num_failing_tcs = sum(1 for tcInfo in relevant_tests.values() if tcInfo["result"] == 1)
+        cov_sim = COV_SIM_SENTINEL if self.COVERAGE_FREE else 1.0
+        return {
+            "result_transition": "0" * num_tests,
+            "exception_type_transition": "0" * num_tests,
+            "exception_msg_transition": "0" * num_tests,
+            "stacktrace_transition": "0" * num_tests,
+            "f2p_cov_sim": [],
+            "p2f_cov_sim": [],
+            "f2f_cov_sim": [cov_sim] * num_failing_tcs,
+            "p2p_cov_sim": [cov_sim] * (num_tests - num_failing_tcs),
+            "status": "equivalent"
+        }
+
+    def save_dedup_info(self, dedup_info):
+        values = [
+            self.fault_idx, dedup_info["normalize"], dedup_info["num_mutants"],
+            dedup_info["num_unique"], dedup_info["num_duplicates"], dedup_info["num_equivalent"]
+        ]
+        self.DB.insert(
+            "d4j_mutant_dedup_info",
+            "fault_idx, normalize, num_mutants, num_unique, num_duplicates, num_equivalent",
+            values
+        )
+        LOGGER.info(f"Shared results with {dedup_info['num_duplicates']} duplicate mutants and marked {dedup_info['num_equivalent']} equivalent mutants.")
 
     def returnTransitionBit(self, baselineResult, mutantResult):
         if baselineResult != mutantResult:
@@ -369,54 +582,167 @@ class SaverEngine:
         mutantCovBitStr = format(mutantCovBitVal, f'0{max_num_lines}b')
 
         cosine_sim = cosine_similarity(baselineCovBitStr, mutantCovBitStr)
+        return (self.returnTransitionType(baselineResult, mutantResult), cosine_sim)
+
+    def returnTransitionType(self, baselineResult, mutantResult):
         if baselineResult == 1 and mutantResult == 0:
-            return ("f2p", cosine_sim)
+            return "f2p"
         elif baselineResult == 0 and mutantResult == 1:
-            return ("p2f", cosine_sim)
+            return "p2f"
         elif baselineResult == 1 and mutantResult == 1:
-            return ("f2f", cosine_sim)
+            return "f2f"
         elif baselineResult == 0 and mutantResult == 0:
-            return ("p2p", cosine_sim)
-
+            return "p2p"
+
+    def get_mutation_values(self, mutation_idx, mutantInfo):
+        """
+        Row of d4j_mutation_info (MUTATION_INFO_COLUMNS) for a mutant.
+        """
+        # All mutants should now have transition data (either real or default)
+        return [
+            self.fault_idx, mutation_idx,
+            mutantInfo["className"], mutantInfo["methodName"], mutantInfo["lineNumber"], mutantInfo["mutator"],
+            mutantInfo["result_transition"], mutantInfo["exception_type_transition"],
+            mutantInfo["exception_msg_transition"], mutantInfo["stacktrace_transition"],
+            mutantInfo["f2p_cov_sim"], mutantInfo["p2f_cov_sim"], mutantInfo["f2f_cov_sim"], mutantInfo["p2p_cov_sim"],
+            mutantInfo.get("status"), len(mutantInfo["result_transition"])
+        ]
+
+    def get_mutation_indices(self, mutantIdx2mutantInfo):
+        """
+        Mutation index of each saved mutant, in the order of the mutant indices,
+        so that batch and streamed saving (and a resumed run) number the mutants of a bug the same way.
+        """
+        return {mutantIdx: mutation_idx for mutation_idx, mutantIdx in enumerate(sorted(mutantIdx2mutantInfo))}
+
+    @traced()
     def save_mutation_info(self, mutantIdx2mutantInfo):
-        unique_mutation_idx = -1
-        for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items():
-            className = mutantInfo["className"]
-            methodName = mutantInfo["methodName"]
-            lineNumber = mutantInfo["lineNumber"]
-            mutator = mutantInfo["mutator"]
-            
-            # All mutants should now have transition data (either real or default)
-            numTestsRun = len(mutantInfo["result_transition"])
-            result_transition = mutantInfo["result_transition"]
-            exception_type_transition = mutantInfo["exception_type_transition"]
-            exception_msg_transition = mutantInfo["exception_msg_transition"]
-            stacktrace_transition = mutantInfo["stacktrace_transition"]
-            f2p_cov_sim = mutantInfo["f2p_cov_sim"]
-            p2f_cov_sim = mutantInfo["p2f_cov_sim"]
-            f2f_cov_sim = mutantInfo["f2f_cov_sim"]
-            p2p_cov_sim = mutantInfo["p2p_cov_sim"]
-
-            unique_mutation_idx += 1
-            values = [
-                self.fault_idx, unique_mutation_idx, className, methodName, lineNumber, mutator,
-                result_transition, exception_type_transition, exception_msg_transition, stacktrace_transition,
-                f2p_cov_sim, p2f_cov_sim, f2f_cov_sim, p2p_cov_sim, numTestsRun
-            ]
-            columns = [
-                "fault_idx", "mutation_idx", "class", "method", "line", "mutator",
-                "result_transition", "exception_type_transition", "exception_msg_transition", "stacktrace_transition",
-                "f2p_cov_sim", "p2f_cov_sim", "f2f_cov_sim", "p2p_cov_sim", "num_tests_run"
-            ]
-            col_str = ", ".join(columns)
+        col_str = ", ".join(MUTATION_INFO_COLUMNS)
+        mutantIdx2mutationIdx = self.get_mutation_indices(mutantIdx2mutantInfo)
+        for mutantIdx in sorted(mutantIdx2mutantInfo):
             self.DB.insert(
                 "d4j_mutation_info",
                 col_str,
-                values
+                self.get_mutation_values(mutantIdx2mutationIdx[mutantIdx], mutantIdx2mutantInfo[mutantIdx])
+            )
+
+        LOGGER.info(f"Save {len(mutantIdx2mutantInfo)} mutation info for subject {self.PID}, bug ID {self.BID}, experiment label {self.EL}.")
+
+    def prepare_streaming(self, ledger, batch_size=50):
+        """
+        Prepare to ingest the results of each mutant as soon as it finishes
+        (see MutationTestingEngine with stream_results), instead of walking all results at the end.
+        :param ledger: MutantLedger of the mutation testing run, ingested mutants are recorded as saved.
+        :param batch_size: Number of rows written to the DB at once.
+        """
+        self.fault_idx = self.save_fault()
+        baseline_results, self.stream_relevant_tests, relevant_lines = self.save_baseline()
+        self.stream_num_lines = len(baseline_results["lineIdx2lineInfo"])
+        self.stream_baseline_outcomes = self.get_baseline_outcomes() if self.COVERAGE_FREE else None
+        self.stream_ledger = ledger
+        self.stream_batch_size = batch_size
+        self.stream_batch = []
+        self.stream_pending = []
+
+        mutantIdx2mutantInfo = prune_mutants_to_lines(self.get_mutants(), relevant_lines)
+        self.set_stream_mutants(self.filter_sampled_mutants(mutantIdx2mutantInfo))
+
+        self.stream_dedup_info = None
+        self.stream_duplicates = {}
+        dedup_json = os.path.join(self.RESULT_DIR, "subjectInfo/mutant_dedup.json")
+        if os.path.exists(dedup_json):
+            with open(dedup_json, 'r') as f:
+                self.stream_dedup_info = json.load(f)
+            for dupIdx, repIdx in self.stream_dedup_info["duplicates"].items():
+                self.stream_duplicates.setdefault(int(repIdx), []).append(int(dupIdx))
+            for mutantIdx in self.stream_dedup_info["equivalent"]:
+                if mutantIdx in self.stream_mutants:
+                    self.add_stream_row(mutantIdx, self.get_equivalent_transitions(self.stream_relevant_tests))
+
+        LOGGER.info(f"Streaming results of {len(self.stream_mutants)} mutants for subject {self.PID}, bug ID {self.BID}, experiment label {self.EL}.")
+
+    def set_stream_mutants(self, mutantIdx2mutantInfo):
+        self.stream_mutants = mutantIdx2mutantInfo
+        # a resumed run rewrites the same rows
+        self.stream_mutation_idx = self.get_mutation_indices(mutantIdx2mutantInfo)
+
+    def add_stream_row(self, mutantIdx, transition_results):
+        mutantInfo = {**self.stream_mutants[mutantIdx], **transition_results}
+        self.stream_batch.append(self.get_mutation_values(self.stream_mutation_idx[mutantIdx], mutantInfo))
+
+    def ingest_mutant(self, mutantIdx, state):
+        """
+        Compute the transitions of a finished mutant (and its duplicates) and queue their rows.
+        :param mutantIdx: Mutant index.
+        :param state: Ledger state of the mutant.
+        """
+        if mutantIdx not in self.stream_mutants:
+            LOGGER.warning(f"Mutant {mutantIdx} is not saved (pruned or not sampled).")
+            return
+
+        work_name = f"mutant_{mutantIdx}"
+        transition_results = None
+        if os.path.isdir(os.path.join(self.RESULT_DIR, "coverage_results", work_name)):
+            transition_results = self.get_mutant_transitions(
+                mutantIdx, work_name, self.stream_relevant_tests, self.stream_num_lines, self.stream_baseline_outcomes
+            )
+        if transition_results is None:
+            transition_results = self.get_default_transitions(self.stream_baseline_outcomes)
+
+        self.add_stream_row(mutantIdx, {**transition_results, "status": state})
+        for dupIdx in self.stream_duplicates.get(mutantIdx, []):
+            if dupIdx in self.stream_mutants:
+                self.add_stream_row(dupIdx, {**transition_results, "status": "duplicate"})
+        self.stream_pending.append((mutantIdx, state))
+
+        if len(self.stream_batch) >= self.stream_batch_size:
+            self.flush_stream()
+
+    def flush_stream(self):
+        """
+        Write the queued rows, then delete the result directories of their mutants.
+        """
+        if self.stream_batch:
+            # rows of a mutant ingested right before an interruption may already exist
+            self.DB.safe_execute(
+                "DELETE FROM d4j_mutation_info WHERE fault_idx = %s AND mutation_idx = ANY(%s)",
+                [self.fault_idx, [row[1] for row in self.stream_batch]]
             )
+            self.DB.insert_many("d4j_mutation_info", ", ".join(MUTATION_INFO_COLUMNS), self.stream_batch)
+
+        for mutantIdx, state in self.stream_pending:
+            shutil.rmtree(os.path.join(self.RESULT_DIR, f"coverage_results/mutant_{mutantIdx}"), ignore_errors=True)
+            # failed mutants are executed again by a resumed run (their rows are then replaced)
+            if state in FINISHED_STATES:
+                self.stream_ledger.update(mutantIdx, "saved")
+
+        LOGGER.debug(f"Saved {len(self.stream_batch)} mutation rows.")
+        self.stream_batch = []
+        self.stream_pending = []
+
+    @traced()
+    def finish_streaming(self):
+        """
+        Ingest the mutants that were not streamed (e.g., finished by an earlier run), write the
+        remaining rows and the dedup information, and clean up the result directory.
+        """
+        duplicates = {dupIdx for dupIdxs in self.stream_duplicates.values() for dupIdx in dupIdxs}
+        equivalent = set(self.stream_dedup_info["equivalent"]) if self.stream_dedup_info else set()
+        for mutantIdx in sorted(self.stream_mutants):
+            if mutantIdx in duplicates or mutantIdx in equivalent:
+                continue
+            state = self.stream_ledger.get_state(mutantIdx)
+            if state != "saved" and mutantIdx not in [idx for idx, _ in self.stream_pending]:
+                self.ingest_mutant(mutantIdx, state)
+        self.flush_stream()
+
+        if self.stream_dedup_info and not self.DB.value_exists("d4j_mutant_dedup_info", {"fault_idx": self.fault_idx}):
+            self.save_dedup_info(self.stream_dedup_info)
 
-        LOGGER.info(f"Save {unique_mutation_idx+1} mutation info for subject {self.PID}, bug ID {self.BID}, experiment label {self.EL}.")
+        LOGGER.info(f"Streamed {len(self.stream_mutants)} mutation info for subject {self.PID}, bug ID {self.BID}, experiment label {self.EL}.")
+        self.zip_result_dir()
 
+    @traced()
     def zip_result_dir(self):
         zip_file = f"{self.RESULT_DIR}.zip"
         if os.path.exists(zip_file):
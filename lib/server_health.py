@@ -0,0 +1,84 @@
+import threading
+import time
+import logging
+
+from utils.health_utils import check_server_health, check_save_health
+
+LOGGER = logging.getLogger(__name__)
+
+class ServerHealth:
+    """
+    Admission of servers: a server gets new bugs only while its last probe (at most probe_interval_sec old)
+    passes the thresholds (see utils.health_utils.check_server_health). An unhealthy server is drained
+    (its running bugs continue, it gets no new bugs) and re-admitted once a later probe passes.
+    """
+    def __init__(self, probe, min_free_disk_gb, max_load_per_core, min_mem_available_gb, probe_interval_sec=300, clock=time.time):
+        """
+        :param probe: Function that probes a server and returns its health (see parse_health_probe), None if the probe failed.
+        """
+        self.probe = probe
+        self.min_free_disk_gb = min_free_disk_gb
+        self.max_load_per_core = max_load_per_core
+        self.min_mem_available_gb = min_mem_available_gb
+        self.probe_interval_sec = probe_interval_sec
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.probed_at = {}
+        self.servers = {}  # server -> {"healthy", "problems", "health", "num_drains"}
+
+    def check(self, server, force=False):
+        """
+        Whether a server may get new work, probing it when its last probe is older than probe_interval_sec.
+        :param force: Probe the server even if the last probe is recent.
+        :return: True if the server is healthy.
+        """
+        with self.lock:
+            now = self.clock()
+            probed_at = self.probed_at.get(server)
+            if not force and probed_at is not None and now - probed_at < self.probe_interval_sec:
+                return self.servers[server]["healthy"]
+            # other slots of the server use the previous result while it is probed
+            self.probed_at[server] = now
+            self.servers.setdefault(server, {"healthy": True, "problems": [], "health": None, "num_drains": 0})
+
+        return self.update(server, self.probe(server))
+
+    def check_save(self, server):
+        """
+        Whether the results of a bug that finished on a server may be saved, probing the server:
+        only its reachability and free disk are checked (see check_save_health), the probe still updates its admission.
+        :return: True if the results may be saved.
+        """
+        with self.lock:
+            self.probed_at[server] = self.clock()
+            self.servers.setdefault(server, {"healthy": True, "problems": [], "health": None, "num_drains": 0})
+
+        health = self.probe(server)
+        self.update(server, health)
+        problems = check_save_health(health, self.min_free_disk_gb)
+        if problems:
+            LOGGER.warning(f"Server {server} cannot save results ({', '.join(problems)}).")
+        return len(problems) == 0
+
+    def update(self, server, health):
+        """
+        Admit or drain a server from the result of a probe.
+        :return: True if the server is healthy.
+        """
+        problems = check_server_health(health, self.min_free_disk_gb, self.max_load_per_core, self.min_mem_available_gb)
+
+        with self.lock:
+            state = self.servers[server]
+            healthy = len(problems) == 0
+            if state["healthy"] and not healthy:
+                state["num_drains"] += 1
+                LOGGER.warning(f"Server {server} is unhealthy ({', '.join(problems)}), draining it.")
+            elif not state["healthy"] and healthy:
+                LOGGER.info(f"Server {server} recovered, re-admitting it.")
+            state.update({"healthy": healthy, "problems": problems, "health": health})
+            return healthy
+
+    def get_report(self):
+        with self.lock:
+            return {str(server): dict(state) for server, state in self.servers.items()}
@@ -0,0 +1,52 @@
+from lib.database import CRUD
+from lib.telemetry import PROGRESS_TABLE
+from utils.telemetry_utils import summarize_progress, format_status
+
+import os
+import json
+import time
+import logging
+from dotenv import load_dotenv
+
+LOGGER = logging.getLogger(__name__)
+
+class StatusEngine:
+    """
+    Prints the progress of a running experiment from its progress events (see Telemetry):
+    bugs finished/failed/running, throughput, ETA, mutants/sec per server and the slowest in-flight bugs.
+    """
+    def __init__(self, experiment_label, pid=None):
+        self.EL = experiment_label
+        self.PID = pid
+
+        load_dotenv()
+        self.os_copy = os.environ.copy()
+
+        self.DB = CRUD(
+            host=self.os_copy.get("DB_HOST"),
+            port=self.os_copy.get("DB_PORT"),
+            user=self.os_copy.get("DB_USER"),
+            password=self.os_copy.get("DB_PASSWORD"),
+            database=self.os_copy.get("DB"),
+            slack_channel=self.os_copy.get("SLACK_CHANNEL"),
+            slack_token=self.os_copy.get("SLACK_TOKEN"),
+        )
+
+    def run(self):
+        events = self.get_events()
+        if not events:
+            print(f"No progress events for {self.EL}.")
+            return
+        print(format_status(summarize_progress(events, time.time())))
+
+    def get_events(self):
+        if not self.DB.table_exists(PROGRESS_TABLE):
+            return []
+        conditions = {"experiment_label": self.EL}
+        if self.PID is not None:
+            conditions["project"] = self.PID
+        rows = self.DB.read(PROGRESS_TABLE, "project, bug_id, server, event, stage, data, ts", conditions, "ORDER BY ts")
+        return [
+            {"pid": pid, "bid": bid, "server": server, "event": event, "stage": stage, "data": json.loads(data) if data else {}, "ts": ts}
+            for pid, bid, server, event, stage, data, ts in rows
+        ]
@@ -0,0 +1,140 @@
+import threading
+import time
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+class StragglerTracker:
+    """
+    Tracks the attempts of running bugs to find stragglers: bugs whose elapsed time exceeds
+    straggler_factor x their expected time. The expected time is the estimated cost of the bug
+    scaled by the median duration/cost ratio of the finished bugs (with equal costs, the median duration).
+    An idle slot runs a duplicate attempt of a straggler on another server;
+    the first attempt that reaches the save step wins, the others are cancelled.
+    A duplicate reruns the whole bug, so at most max_duplicates run at once and a duplicate
+    that runs longer than straggler_factor x the expected time of the bug is cancelled (see find_expired_duplicates).
+    """
+    def __init__(self, straggler_factor=1.5, min_elapsed_sec=600, max_duplicates=1, clock=time.time):
+        self.straggler_factor = straggler_factor
+        self.min_elapsed_sec = min_elapsed_sec
+        self.max_duplicates = max_duplicates
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.costs = {}
+        self.attempts = {}  # bid -> {slot: (server, started_at)}
+        self.finished_ratios = []
+        self.winners = {}
+        self.cancelled = set()  # (bid, slot)
+        self.speculated = {}  # bid -> {"server", "elapsed_sec", "expected_sec", "winner"}
+
+    def start(self, bid, slot, server, cost=1.0):
+        with self.lock:
+            self.costs.setdefault(bid, cost)
+            if bid in self.speculated and self.attempts.get(bid):
+                self.speculated[bid]["slot"] = slot
+            self.attempts.setdefault(bid, {})[slot] = (server, self.clock())
+
+    def finish(self, bid, slot, success):
+        """
+        Record the end of an attempt.
+        """
+        with self.lock:
+            server, started_at = self.attempts.get(bid, {}).pop(slot, (None, None))
+            if started_at is not None and success and self.winners.get(bid, slot) == slot:
+                self.finished_ratios.append((self.clock() - started_at) / max(self.costs[bid], 1e-9))
+            if not self.attempts.get(bid):
+                self.attempts.pop(bid, None)
+
+    def has_running(self):
+        with self.lock:
+            return len(self.attempts) > 0
+
+    def _get_expected_sec(self, bid):
+        if not self.finished_ratios:
+            return None
+        ratios = sorted(self.finished_ratios)
+        return self.costs[bid] * ratios[len(ratios) // 2]
+
+    def find_straggler(self, server):
+        """
+        Find the straggler to duplicate on a server: running on one other server only,
+        the largest elapsed/expected ratio first.
+        :return: Bug ID or None.
+        """
+        with self.lock:
+            num_running = len([bid for bid in self.speculated if self._is_duplicated(bid)])
+            if num_running >= self.max_duplicates:
+                return None
+            now = self.clock()
+            candidates = []
+            for bid, attempts in self.attempts.items():
+                if len(attempts) != 1 or bid in self.speculated:
+                    continue
+                attempt_server, started_at = next(iter(attempts.values()))
+                if attempt_server == server:
+                    continue
+                expected_sec = self._get_expected_sec(bid)
+                elapsed_sec = now - started_at
+                if expected_sec is None or elapsed_sec < self.min_elapsed_sec:
+                    continue
+                if elapsed_sec > self.straggler_factor * expected_sec:
+                    candidates.append((elapsed_sec / max(expected_sec, 1e-9), bid, elapsed_sec, expected_sec))
+            if not candidates:
+                return None
+            _, bid, elapsed_sec, expected_sec = max(candidates)
+            self.speculated[bid] = {"server": server, "elapsed_sec": elapsed_sec, "expected_sec": expected_sec}
+            LOGGER.info(f"Bug {bid} is a straggler ({elapsed_sec:.0f}s elapsed, {expected_sec:.0f}s expected), duplicating it on server {server}.")
+            return bid
+
+    def _is_duplicated(self, bid):
+        info = self.speculated[bid]
+        return bid in self.attempts and "winner" not in info and not info.get("expired", False)
+
+    def find_expired_duplicates(self):
+        """
+        Cancel the duplicates that ran longer than straggler_factor x the expected time of their bug
+        without winning, the original attempt continues.
+        :return: List of (bid, slot, server) of the cancelled duplicates.
+        """
+        with self.lock:
+            now = self.clock()
+            expired = []
+            for bid, info in self.speculated.items():
+                slot = info.get("slot")
+                if slot is None or not self._is_duplicated(bid) or slot not in self.attempts[bid]:
+                    continue
+                server, started_at = self.attempts[bid][slot]
+                if now - started_at > self.straggler_factor * info["expected_sec"]:
+                    info["expired"] = True
+                    self.cancelled.add((bid, slot))
+                    expired.append((bid, slot, server))
+                    LOGGER.info(f"Duplicate of bug {bid} on {slot} ran {now - started_at:.0f}s without finishing, cancelling it.")
+            return expired
+
+    def claim_win(self, bid, slot):
+        """
+        Claim the result of a bug for an attempt (called before saving).
+        :return: (True if the attempt won, list of (slot, server) of the other attempts to cancel).
+        """
+        with self.lock:
+            if bid in self.winners:
+                return self.winners[bid] == slot, []
+            self.winners[bid] = slot
+            losers = [
+                (other_slot, server) for other_slot, (server, _) in self.attempts.get(bid, {}).items()
+                if other_slot != slot
+            ]
+            for other_slot, _ in losers:
+                self.cancelled.add((bid, other_slot))
+            if bid in self.speculated:
+                self.speculated[bid]["winner"] = slot
+            return True, losers
+
+    def is_cancelled(self, bid, slot):
+        with self.lock:
+            return (bid, slot) in self.cancelled
+
+    def get_report(self):
+        with self.lock:
+            return {str(bid): dict(info) for bid, info in self.speculated.items()}
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import deque
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+SCHEDULING_POLICIES = ["fifo", "lpt"]
+
+class TaskScheduler:
+    """
+    Dispatches tasks to workers (e.g., cores of a server or servers of the cluster).
+        - fifo: workers pick up tasks from one shared queue in submission order.
+        - lpt: tasks are assigned longest-processing-time-first to the worker that would finish them
+          first (weighted by worker speed); with work_stealing, a worker whose queue is empty takes
+          the cheapest remaining task of the most loaded worker.
+    """
+    def __init__(self, workers, policy="fifo", work_stealing=False, worker_speeds=None, clock=time.time):
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unknown scheduling policy {policy}, expected one of {SCHEDULING_POLICIES}.")
+
+        self.workers = list(workers)
+        self.policy = policy
+        self.work_stealing = work_stealing
+        self.worker_speeds = {worker: (worker_speeds or {}).get(worker, 1.0) for worker in self.workers}
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.submitted = []
+        self.shared_queue = deque()
+        self.worker_queues = {worker: deque() for worker in self.workers}
+        self.projected_loads = {worker: 0.0 for worker in self.workers}
+        self.running = {}
+        self.finished_tasks = []
+        self.worker_stats = {
+            worker: {"busy_sec": 0.0, "num_tasks": 0, "num_stolen": 0} for worker in self.workers
+        }
+        self.start_time = None
+        self.end_time = None
+
+    def submit(self, task_id, payload=None, cost=1.0):
+        """
+        Add a task before the scheduler is started.
+        :param task_id: Identifier of the task (e.g., mutant index, bug ID).
+        :param payload: Data handed to the worker with the task.
+        :param cost: Estimated cost of the task (any unit, only relative values matter).
+        """
+        self.submitted.append((task_id, payload, cost))
+
+    def start(self):
+        """
+        Distribute the submitted tasks according to the policy.
+        """
+        with self.lock:
+            if self.policy == "fifo":
+                self.shared_queue.extend(self.submitted)
+            else:
+                for task in sorted(self.submitted, key=lambda task: task[2], reverse=True):
+                    worker = min(
+                        self.workers,
+                        key=lambda w: (self.projected_loads[w] + task[2]) / self.worker_speeds[w]
+                    )
+                    self.worker_queues[worker].append(task)
+                    self.projected_loads[worker] += task[2]
+            self.submitted = []
+            self.start_time = self.clock()
+
+        LOGGER.info(f"Scheduler started with policy {self.policy} (work stealing: {self.work_stealing}) on {len(self.workers)} workers.")
+
+    def get_task(self, worker):
+        """
+        Get the next task of a worker.
+        :return: (task_id, payload) or None when the worker has no more work.
+        """
+        with self.lock:
+            task = None
+            if self.policy == "fifo":
+                if self.shared_queue:
+                    task = self.shared_queue.popleft()
+            elif self.worker_queues[worker]:
+                task = self.worker_queues[worker].popleft()
+            elif self.work_stealing:
+                task = self._steal(worker)
+
+            if task is None:
+                return None
+
+            task_id, payload, cost = task
+            self.running[task_id] = (worker, self.clock(), cost)
+            return task_id, payload
+
+    def num_queued(self):
+        """
+        Number of tasks that no worker got yet.
+        """
+        with self.lock:
+            return len(self.shared_queue) + sum(len(queue) for queue in self.worker_queues.values())
+
+    def _steal(self, thief):
+        victims = [w for w in self.workers if w != thief and self.worker_queues[w]]
+        if not victims:
+            return None
+        victim = max(
+            victims,
+            key=lambda w: sum(task[2] for task in self.worker_queues[w]) / self.worker_speeds[w]
+        )
+        # queues are sorted longest-first, the tail holds the cheapest task
+        task = self.worker_queues[victim].pop()
+        self.worker_stats[thief]["num_stolen"] += 1
+        LOGGER.debug(f"Worker {thief} stole task {task[0]} from worker {victim}.")
+        return task
+
+    def task_done(self, worker, task_id):
+        """
+        Record that a worker finished a task.
+        """
+        with self.lock:
+            if task_id not in self.running:
+                return
+            _, started_at, cost = self.running.pop(task_id)
+            now = self.clock()
+            self.worker_stats[worker]["busy_sec"] += now - started_at
+            self.finished_tasks.append({
+                "task_id": task_id, "worker": str(worker), "cost": cost,
+                "start_sec": started_at - self.start_time, "duration_sec": now - started_at
+            })
+            self.worker_stats[worker]["num_tasks"] += 1
+            self.end_time = now
+
+    def get_report(self, include_tasks=False):
+        """
+        Summarize the schedule: makespan, per-worker utilization and idle time.
+        :param include_tasks: Also list the worker, estimated cost and actual duration of each finished task.
+        """
+        with self.lock:
+            makespan = 0.0
+            if self.start_time is not None and self.end_time is not None:
+                makespan = self.end_time - self.start_time
+
+            workers = {}
+            for worker, stats in self.worker_stats.items():
+                idle_sec = max(makespan - stats["busy_sec"], 0.0)
+                workers[str(worker)] = {
+                    **stats,
+                    "idle_sec": idle_sec,
+                    "utilization": stats["busy_sec"] / makespan if makespan > 0 else 0.0
+                }
+
+            total_busy = sum(stats["busy_sec"] for stats in self.worker_stats.values())
+            report = {
+                "policy": self.policy,
+                "work_stealing": self.work_stealing,
+                "num_workers": len(self.workers),
+                "makespan_sec": makespan,
+                "total_idle_sec": sum(stats["idle_sec"] for stats in workers.values()),
+                "utilization": total_busy / (makespan * len(self.workers)) if makespan > 0 and self.workers else 0.0,
+                "workers": workers
+            }
+            if self.policy == "lpt":
+                report["projected_makespan"] = max(
+                    [self.projected_loads[w] / self.worker_speeds[w] for w in self.workers] or [0.0]
+                )
+            if include_tasks:
+                report["tasks"] = list(self.finished_tasks)
+            return report
@@ -0,0 +1,104 @@
+import json
+import time
+import socket
+import threading
+import contextlib
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+PROGRESS_TABLE = "d4j_progress_events"
+
+class Telemetry:
+    """
+    Emits structured progress events of an experiment (bug started/finished, stage durations, mutants done/total)
+    to a local JSONL file and to the d4j_progress_events table (read by main.py --status).
+    Telemetry never fails the run: events that cannot be written are logged and dropped.
+    """
+    def __init__(self, experiment_label, pid=None, bid=None, jsonl_file=None, db=None, server=None, progress_interval_sec=30, clock=time.time):
+        self.EL = experiment_label
+        self.PID = pid
+        self.BID = bid
+        self.JSONL_FILE = jsonl_file
+        self.DB = db
+        self.SERVER = server or socket.gethostname()
+        self.progress_interval_sec = progress_interval_sec
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        self.last_progress = {}  # stage -> time of the last progress event
+
+    def create_table(self):
+        if self.DB is None or self.DB.table_exists(PROGRESS_TABLE):
+            return
+        columns = [
+            "event_idx SERIAL PRIMARY KEY",
+            "experiment_label TEXT NOT NULL",
+            "project TEXT",
+            "bug_id TEXT",
+            "server TEXT",
+            "event TEXT NOT NULL",
+            "stage TEXT",
+            "data TEXT",  # -- json
+            "ts DOUBLE PRECISION NOT NULL",  # -- seconds since the epoch
+        ]
+        self.DB.create_table(PROGRESS_TABLE, ", ".join(columns))
+        self.DB.create_index(PROGRESS_TABLE, "idx_d4j_progress_events_label", "experiment_label, ts")
+
+    def emit(self, event, stage=None, bid=None, server=None, **data):
+        """
+        Emit an event.
+        :param event: Event name (e.g., "bug_started", "stage_finished", "progress").
+        :param stage: Stage of the event (e.g., "compile2prepare", "baseline", "mutants").
+        :param bid: Bug ID (the bug of this telemetry by default).
+        :param server: Server of the event (this machine by default).
+        :param data: Event data (json serializable).
+        """
+        bid = bid if bid is not None else self.BID
+        record = {
+            "ts": self.clock(), "experiment_label": self.EL, "pid": self.PID,
+            "bid": str(bid) if bid is not None else None,
+            "server": server or self.SERVER, "event": event, "stage": stage, "data": data
+        }
+        with self.lock:
+            if self.JSONL_FILE is not None:
+                try:
+                    with open(self.JSONL_FILE, 'a') as f:
+                        f.write(json.dumps(record) + "\n")
+                except OSError as e:
+                    LOGGER.warning(f"Failed to write event {event} to {self.JSONL_FILE}: {e}")
+            if self.DB is not None:
+                try:
+                    self.DB.insert(
+                        PROGRESS_TABLE, "experiment_label, project, bug_id, server, event, stage, data, ts",
+                        [self.EL, record["pid"], record["bid"], record["server"], event, stage, json.dumps(data), record["ts"]]
+                    )
+                except Exception as e:
+                    LOGGER.warning(f"Failed to save event {event} to {PROGRESS_TABLE}: {e}")
+                    with contextlib.suppress(Exception):
+                        self.DB.db.rollback()
+
+    @contextlib.contextmanager
+    def stage(self, stage, bid=None, server=None):
+        """
+        Emit stage_started and stage_finished (with duration_sec and success) around a block.
+        """
+        started_at = self.clock()
+        self.emit("stage_started", stage, bid, server)
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.emit("stage_finished", stage, bid, server, duration_sec=self.clock() - started_at, success=success)
+
+    def progress(self, stage, done, total, force=False):
+        """
+        Emit the progress of a stage, at most every progress_interval_sec unless forced.
+        """
+        with self.lock:
+            now = self.clock()
+            if not force and now - self.last_progress.get(stage, float("-inf")) < self.progress_interval_sec:
+                return
+            self.last_progress[stage] = now
+        self.emit("progress", stage, done=done, total=total)
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import functools
+import threading
+import logging
+
+from lib.memory_profiler import get_profiler
+
+LOGGER = logging.getLogger(__name__)
+
+# events kept in memory before they are appended to the trace file
+FLUSH_EVENTS = 10000
+
+class Tracer:
+    """
+    Records spans (name, start, duration) of each thread of a process as Chrome trace events
+    (JSON array format, loadable in chrome://tracing and https://ui.perfetto.dev).
+    Events are appended to the trace file, so several processes of a bug (e.g., mutation testing and saving)
+    share one file, each in its own process lane. The array is left open: trace viewers accept
+    a missing closing bracket, see read_trace_events.
+    """
+    def __init__(self, trace_file, process_name=None, flush_events=FLUSH_EVENTS):
+        self.TRACE_FILE = trace_file
+        self.PID = os.getpid()
+        self.flush_events = flush_events
+
+        self.lock = threading.Lock()
+        self.events = []
+        self.thread_names = set()  # tids with a thread_name event
+        self.add_metadata("process_name", process_name or f"pid {self.PID}")
+
+    def add_metadata(self, name, value, tid=0):
+        self.events.append({"name": name, "ph": "M", "pid": self.PID, "tid": tid, "args": {"name": value}})
+
+    def name_thread(self, name):
+        """
+        Name the lane of the current thread (e.g., "core3"), the thread name is used otherwise.
+        """
+        tid = threading.get_ident()
+        with self.lock:
+            self.thread_names.add(tid)
+            self.add_metadata("thread_name", name, tid)
+
+    def add_span(self, name, category, started_at, duration_sec, args=None):
+        tid = threading.get_ident()
+        event = {
+            "name": name, "cat": category, "ph": "X", "pid": self.PID, "tid": tid,
+            "ts": int(started_at * 1e6), "dur": int(duration_sec * 1e6)
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            if tid not in self.thread_names:
+                self.thread_names.add(tid)
+                self.add_metadata("thread_name", threading.current_thread().name, tid)
+            self.events.append(event)
+            if len(self.events) >= self.flush_events:
+                self.flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if not self.events:
+            return
+        lines = "".join(json.dumps(event) + ",\n" for event in self.events)
+        try:
+            with open(self.TRACE_FILE, 'a') as f:
+                if f.tell() == 0:
+                    lines = "[\n" + lines
+                f.write(lines)
+        except OSError as e:
+            LOGGER.warning(f"Failed to write {len(self.events)} trace events to {self.TRACE_FILE}: {e}")
+        self.events = []
+
+
+# tracer of this process, None while tracing is disabled
+_TRACER = None
+
+class Span:
+    """
+    Context manager of a span. The duration is measured even when tracing is disabled (duration_sec),
+    it is only recorded by an active tracer. The memory of stage spans is recorded by an active memory profiler.
+    """
+    __slots__ = ("name", "category", "args", "started_at", "duration_sec", "memory_record")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.started_at = None
+        self.duration_sec = None
+        self.memory_record = None
+
+    def __enter__(self):
+        if self.category == "stage":
+            profiler = get_profiler()
+            if profiler is not None:
+                self.memory_record = profiler.enter_stage(self.name)
+        self.started_at = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration_sec = time.time() - self.started_at
+        if self.memory_record is not None:
+            get_profiler().exit_stage(self.memory_record)
+        tracer = _TRACER
+        if tracer is not None:
+            args = self.args
+            if exc_type is not None:
+                args = dict(args or {}, error=exc_type.__name__)
+            tracer.add_span(self.name, self.category, self.started_at, self.duration_sec, args)
+        return False
+
+def span(name, category="stage", **args):
+    """
+    Span of a block: with span("baseline", bid=1): ...
+    :param category: Category of the span (e.g., "stage", "step", "subprocess").
+    :param args: Arguments shown with the span (json serializable).
+    """
+    return Span(name, category, args)
+
+def traced(name=None, category="stage"):
+    """
+    Decorator that records each call of a function as a span (named after the function by default).
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _TRACER is None and get_profiler() is None:
+                return func(*args, **kwargs)
+            with Span(span_name, category, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def start_tracing(trace_file, process_name=None):
+    """
+    Record the spans of this process to trace_file (appended) until stop_tracing.
+    """
+    global _TRACER
+    _TRACER = Tracer(trace_file, process_name)
+    LOGGER.info(f"Tracing to {trace_file}")
+    return _TRACER
+
+def stop_tracing():
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None:
+        tracer.flush()
+
+def name_thread(name):
+    tracer = _TRACER
+    if tracer is not None:
+        tracer.name_thread(name)
+
+def read_trace_events(trace_file):
+    """
+    Read the events of a trace file (closing the array left open by Tracer).
+    """
+    with open(trace_file, 'r') as f:
+        content = f.read().rstrip().rstrip(",")
+    if not content:
+        return []
+    if not content.endswith("]"):
+        content += "]"
+    return json.loads(content)
@@ -0,0 +1,104 @@
+from lib.database import CRUD
+from lib.job_queue import JobQueue
+from lib.bug_pipeline import BugPipeline
+from lib.telemetry import Telemetry
+from lib.tracer import span, start_tracing, stop_tracing
+
+from utils.command_utils import execute_local_command
+
+import os
+import socket
+import time
+import logging
+from dotenv import load_dotenv
+
+LOGGER = logging.getLogger(__name__)
+
+class WorkerEngine:
+    """
+    Processes bugs of the job queue (see ExtractorEngine.enqueue_jobs) on this server until no job is queued.
+    """
+    HEARTBEAT_INTERVAL_SEC = 30
+
+    def __init__(self, experiment_label, worker_id=None):
+        self.EL = experiment_label
+        self.WORKER_ID = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+        load_dotenv()
+        self.os_copy = os.environ.copy()
+
+        self.DB = self.connect_db()
+        self.JOB_QUEUE = JobQueue(self.DB, self.WORKER_ID)
+        # progress events get their own connection, the one of the job queue is shared with the heartbeat thread
+        self.TELEMETRY_DB = self.connect_db()
+
+        self.D4J_DIR = self.os_copy.get("SERVER_HOME") + f"defects4j/"
+
+    def connect_db(self):
+        return CRUD(
+            host=self.os_copy.get("DB_HOST"),
+            port=self.os_copy.get("DB_PORT"),
+            user=self.os_copy.get("DB_USER"),
+            password=self.os_copy.get("DB_PASSWORD"),
+            database=self.os_copy.get("DB"),
+            slack_channel=self.os_copy.get("SLACK_CHANNEL"),
+            slack_token=self.os_copy.get("SLACK_TOKEN"),
+        )
+
+    def run(self):
+        self.JOB_QUEUE.create_table()
+        Telemetry(self.EL, db=self.TELEMETRY_DB).create_table()
+
+        num_jobs = 0
+        while True:
+            job = self.JOB_QUEUE.claim(self.EL)
+            if job is None:
+                break
+            num_jobs += 1
+
+            options = job["options"]
+            pipeline = BugPipeline(
+                job["pid"], self.EL, options.get("parallel", 10), self.D4J_DIR,
+                with_mutation_coverage=options.get("with_mutation_coverage", False),
+                time_measurement=options.get("time_measurement", False),
+                coverage_free=options.get("coverage_free", False),
+                class_data_sharing=options.get("class_data_sharing", False),
+                stream_results=options.get("stream_results", False),
+                trace=options.get("trace", False),
+                profile_memory=options.get("profile_memory", False)
+            )
+
+            telemetry = Telemetry(self.EL, job["pid"], db=self.TELEMETRY_DB)
+            telemetry.emit("bug_started", bid=job["bid"], worker=self.WORKER_ID)
+            started_at = time.time()
+
+            if pipeline.TRACE:
+                start_tracing(pipeline.get_trace_file(job["bid"]), f"worker {self.WORKER_ID}")
+            stop_heartbeat, lost_job = self.JOB_QUEUE.start_heartbeat(job["job_idx"], self.HEARTBEAT_INTERVAL_SEC)
+            success = False
+            try:
+                with span(f"{job['pid']}-{job['bid']}", "bug"):
+                    # a job that was re-queued to another worker is abandoned before its next step and not saved
+                    success = pipeline.run(
+                        job["bid"], execute_local_command, f"Worker {self.WORKER_ID}",
+                        is_cancelled=lost_job.is_set, telemetry=telemetry
+                    )
+            except Exception as e:
+                LOGGER.error(f"Worker {self.WORKER_ID} failed on bug {job['bid']}: {e}")
+            finally:
+                stop_tracing()
+                stop_heartbeat.set()
+                if lost_job.is_set():
+                    telemetry.emit("bug_cancelled", bid=job["bid"], worker=self.WORKER_ID)
+                else:
+                    self.JOB_QUEUE.finish(job["job_idx"], success)
+                    telemetry.emit("bug_finished", bid=job["bid"], success=bool(success), duration_sec=time.time() - started_at)
+
+            if lost_job.is_set():
+                LOGGER.warning(f"Worker {self.WORKER_ID} abandoned bug {job['bid']} (the job was re-queued)")
+            elif success:
+                LOGGER.info(f"Worker {self.WORKER_ID} completed bug {job['bid']}")
+            else:
+                LOGGER.warning(f"Worker {self.WORKER_ID} failed to process bug {job['bid']}")
+
+        LOGGER.info(f"Worker {self.WORKER_ID} processed {num_jobs} jobs, no job is queued for {self.EL}: {self.JOB_QUEUE.count_states(self.EL)}")
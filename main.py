@@ -8,12 +8,17 @@ from lib.mutation_testing_engine import MutationTestingEngine
 from lib.saver_engine import SaverEngine
 from lib.constructor_engine import ConstructorEngine
 from lib.postprocessor_engine import PostProcessorEngine
+from lib.worker_engine import WorkerEngine
+from lib.status_engine import StatusEngine
 from lib.slack import Slack
+from lib.task_scheduler import SCHEDULING_POLICIES
 
 def make_parser():
     parser = argparse.ArgumentParser(description="Extract dynamic data from defects4j")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
     parser.add_argument("-d", "--debug", action="store_true", help="Enable debug output")
+    parser.add_argument("-pm", "--profile-memory", action="store_true", help="Record the peak RSS and top tracemalloc allocation sites of each stage of the saver and constructor tasks")
+    parser.add_argument("-tr", "--trace", action="store_true", help="Record the spans of each stage, thread and subprocess as a Chrome trace (out_dir/<pid>-<bid>b-trace.json of each bug)")
 
     # General arguments
     parser.add_argument("-pid", "--project-id", type=str, help="Project ID to extract data from")
@@ -24,9 +29,31 @@ def make_parser():
     parser.add_argument("-p", "--parallel", type=int, default=10, help="Number of parallel processes to run")
     parser.add_argument("-wmc", "--with-mutation-coverage", action="store_true", help="Enable mutation coverage")
     parser.add_argument("-tm", "--time-measurement", action="store_true", help="Enable time measurement")
+    parser.add_argument("-cds", "--class-data-sharing", action="store_true", help="Prepare a class-data-sharing archive of the GZoltar toolchain for each bug")
+    parser.add_argument("-cf", "--coverage-free", action="store_true", help="Run mutants without coverage (test outcomes only, *_cov_sim are not measured), on one persistent runner JVM per core unless persistent_runner is false in .experiment_config (it has no effect without this flag)")
+    parser.add_argument("-bs", "--bug-scheduler", type=str, default="fifo", choices=SCHEDULING_POLICIES, help="How bugs are dispatched to servers (lpt: longest estimated bug first, from d4j_time_measurement_info)")
+    parser.add_argument("-str", "--stream-results", action="store_true", help="Save the results of each mutant to db as soon as it finishes (no separate save step)")
+    parser.add_argument("-spec", "--speculate", action="store_true", help="Duplicate straggler bugs on idle servers, the first attempt to finish is saved")
+    parser.add_argument("-ns", "--num-shards", type=int, default=1, help="Split the mutants of the largest bugs across this many servers")
+    parser.add_argument("-nsb", "--num-sharded-bugs", type=int, default=0, help="Number of (largest estimated) bugs to shard, default: one per group of --num-shards servers")
+    parser.add_argument("-rf", "--retry-failed", action="store_true", help="Only process the bugs that failed in the last run (see reports/bug_status_<pid>_<el>.json)")
+    parser.add_argument("-loc", "--local", action="store_true", help="Run the bugs on this machine (no ssh, no deployment), its cores are partitioned across concurrent bugs")
+    parser.add_argument("-sim", "--simulate", action="store_true", help="Simulate the bug schedule of each policy on the server slots instead of running the bugs")
+    parser.add_argument("-simb", "--simulate-bugs", type=int, default=0, help="Simulate this many synthetic bugs instead of the bugs of the project")
+    parser.add_argument("-simn", "--simulate-noise", type=float, default=0.3, help="Log-normal error of the estimated bug costs in the simulation")
+    parser.add_argument("-eq", "--enqueue", action="store_true", help="Queue the bugs in the job queue (d4j_job_queue) and start workers on the servers instead of dispatching them from this process")
+
+    # Arguments for WorkerEngine
+    parser.add_argument("-w", "--worker", action="store_true", help="Process bugs of the job queue of the experiment on this server")
+
+    # Arguments for StatusEngine
+    parser.add_argument("-st", "--status", action="store_true", help="Print the progress of the experiment (bugs done, ETA, mutants/sec per server, slowest bugs)")
 
     # Arguments for MutationTestingEngine
     parser.add_argument("-mt", "--mutation-testing", action="store_true", help="Run the mutation testing engine")
+    parser.add_argument("-shp", "--shard-prepare", action="store_true", help="Only run the baseline and select the mutants to test in shards")
+    parser.add_argument("-sh", "--shard", type=str, help="Test the mutants of shard <index>/<number of shards> of a prepared bug")
+    parser.add_argument("-msh", "--merge-shards", type=int, default=0, help="Merge the ledgers of the given number of shards")
 
     # Arguments for SaverEngine
     parser.add_argument("-sr", "--save-results", action="store_true", help="Save the extracted data to db")
@@ -34,6 +61,7 @@ def make_parser():
 
     # Arguments for ConstructorEngine
     parser.add_argument("-c", "--constructor", action="store_true", help="Run the constructor engine")
+    parser.add_argument("-mb", "--memory-budget-gb", type=float, default=0, help="Soft memory budget of the constructor: new tasks wait while the RSS is close to it (0: no budget)")
 
     # Arguments for PostProcessorEngine
     parser.add_argument("-pp", "--postprocessor", action="store_true", help="Run the postprocessor engine")
@@ -56,6 +84,11 @@ def main():
     set_logger(verbose=args.verbose, debug=args.debug)
     load_dotenv()
 
+    if args.status:
+        # read-only, no slack notification
+        StatusEngine(args.experiment_label, args.project_id).run()
+        return
+
     slack = Slack(
         slack_channel=os.getenv("SLACK_CHANNEL"),
         slack_token=os.getenv("SLACK_TOKEN"),
@@ -69,15 +102,45 @@ def main():
         if not args.project_id:
             logging.error("Project ID is required when running the extractor.")
             return
-        extractor_engine = ExtractorEngine(args.project_id, args.parallel, args.experiment_label, args.with_mutation_coverage, args.time_measurement)
+        if args.local and args.enqueue:
+            logging.error("The job queue starts workers over ssh, it cannot be used with --local.")
+            return
+        extractor_engine = ExtractorEngine(
+            args.project_id,
+            parallel=args.parallel,
+            experiment_label=args.experiment_label,
+            with_mutation_coverage=args.with_mutation_coverage,
+            time_measurement=args.time_measurement,
+            coverage_free=args.coverage_free,
+            class_data_sharing=args.class_data_sharing,
+            stream_results=args.stream_results,
+            bug_scheduler=args.bug_scheduler,
+            speculate=args.speculate,
+            num_shards=args.num_shards,
+            num_sharded_bugs=args.num_sharded_bugs,
+            retry_failed=args.retry_failed,
+            local=args.local,
+            trace=args.trace,
+            profile_memory=args.profile_memory,
+        )
         function_name = "ExtractorEngine"
         slack.send_message(f"Starting {function_name} for project {args.project_id} with parallel={args.parallel} with_mutation_coverage={args.with_mutation_coverage}.")
-        extractor_engine.run()
+        if args.simulate:
+            extractor_engine.simulate(args.simulate_bugs, args.simulate_noise)
+        elif args.enqueue:
+            extractor_engine.enqueue_jobs()
+        else:
+            extractor_engine.run()
+    elif args.worker:
+        worker_engine = WorkerEngine(args.experiment_label)
+        function_name = "WorkerEngine"
+        worker_engine.run()
     elif args.mutation_testing:
         if not args.project_id:
             logging.error("Project ID is required when running the mutation testing.")
             return
-        mutation_testing_engine = MutationTestingEngine(args.project_id, args.bug_id, args.experiment_label, args.parallel, args.time_measurement)
+        shard = tuple(int(value) for value in args.shard.split("/")) if args.shard else None
+        mutation_testing_engine = MutationTestingEngine(args.project_id, args.bug_id, args.experiment_label, args.parallel, args.time_measurement, args.coverage_free, args.stream_results, shard, args.shard_prepare, args.merge_shards, args.trace)
         function_name = "MutationTestingEngine"
         slack.send_message(f"Starting {function_name} for project {args.project_id} and bug {args.bug_id} with parallel={args.parallel}.")
         mutation_testing_engine.run()
@@ -88,7 +151,7 @@ def main():
         if not args.bug_id:
             logging.error("Bug ID is required when saving results.")
             return
-        saver_engine = SaverEngine(args.project_id, args.bug_id, args.experiment_label, args.time_measurement)
+        saver_engine = SaverEngine(args.project_id, args.bug_id, args.experiment_label, args.time_measurement, args.trace, args.profile_memory)
         function_name = "SaverEngine"
         slack.send_message(f"Starting {function_name} for project {args.project_id} and bug {args.bug_id}.")
         saver_engine.run()
@@ -96,7 +159,7 @@ def main():
         if not args.project_id:
             logging.error("Project ID is required when running the constructor.")
             return
-        constructor_engine = ConstructorEngine(args.project_id, args.experiment_label, args.parallel)
+        constructor_engine = ConstructorEngine(args.project_id, args.experiment_label, args.parallel, args.trace, args.profile_memory, args.memory_budget_gb)
         function_name = "ConstructorEngine"
         slack.send_message(f"Starting {function_name} for project {args.project_id} with {args.parallel} parallel workers.")
         constructor_engine.run()
@@ -28,10 +28,40 @@ mkdir -p "$subjectInfo_dir"
 # mkdir -p "$perFileLog_dir"
 
 cd "$pid_dir"
+repo_dir="$pid_dir/$PID-${BID}b"
+
+# Compiled checkouts are cached per (pid, bid, toolchain version) and shared by all experiment labels
+cache_root="/ssd_home/yangheechan/defects4j/checkout_cache"
+# without the Defects4J revision, installs with different project patches would share entries: no cache
+use_cache=1
+d4j_version=$(git -C "$D4J_HOME" rev-parse HEAD 2>/dev/null) || {
+    use_cache=0
+    echo "[WARNING] $D4J_HOME is not a git checkout, the checkout cache is not used"
+}
+java_version=$(java -version 2>&1 | head -n 1)
+cache_key=$(echo "$PID $BID $d4j_version $java_version" | sha256sum | cut -d ' ' -f 1)
+cache_dir="$cache_root/$cache_key"
+# absolute paths of the checkout (e.g., in cp_test.txt) are stored with this placeholder
+repo_placeholder="@REPO_DIR@"
+SUBJECT_INFO_FILES="classes_relevant.txt classes_relevant-pit.txt test_relevant.txt dir_src_classes.txt dir_src_tests.txt dir_bin_classes.txt dir_bin_tests.txt cp_test.txt"
+
+if [ "$use_cache" = 1 ] && [ -f "$cache_dir/complete" ]; then
+    # Materialize the bug as a copy of the cache (copy-on-write clones where the file system supports them),
+    # never hardlinks: a step that rewrites a file in place (e.g., javac) would corrupt the cache and other checkouts
+    echo "[INFO] Using cached checkout $cache_dir for $PID-${BID}b"
+    rm -rf "$repo_dir"
+    cp -a --reflink=auto "$cache_dir/checkout" "$repo_dir"
+    # the last use of an entry decides which entries scripts/clean_checkout_cache.sh removes first
+    touch "$cache_dir/last_used"
+    for info_file in $SUBJECT_INFO_FILES; do
+        sed "s|$repo_placeholder|$repo_dir|g" "$cache_dir/subjectInfo/$info_file" > "$subjectInfo_dir/$info_file"
+    done
+    exit 0
+fi
 
 # Checkout
 rm -rf "$PID-${BID}b"; defects4j checkout -p "$PID" -v "${BID}b" -w "$PID-${BID}b"
-cd "$pid_dir/$PID-${BID}b"
+cd "$repo_dir"
 
 
 classes_relevant=$(defects4j export -p classes.relevant | tr '\n' ':' | sed 's/:$//')
@@ -59,3 +89,21 @@ echo $cp_test > "$subjectInfo_dir/cp_test.txt"
 
 # Compile the project
 defects4j compile
+
+
+if [ "$use_cache" = 0 ]; then
+    exit 0
+fi
+
+# Add the compiled checkout to the cache: it is filled in a temporary directory and renamed,
+# so concurrent bugs with the same key never see a partial entry
+mkdir -p "$cache_root"
+tmp_cache_dir=$(mktemp -d "$cache_root/$cache_key.tmp.XXXXXX")
+cp -a --reflink=auto "$repo_dir" "$tmp_cache_dir/checkout"
+mkdir -p "$tmp_cache_dir/subjectInfo"
+for info_file in $SUBJECT_INFO_FILES; do
+    sed "s|$repo_dir|$repo_placeholder|g" "$subjectInfo_dir/$info_file" > "$tmp_cache_dir/subjectInfo/$info_file"
+done
+echo "$PID $BID $d4j_version $java_version" > "$tmp_cache_dir/key.txt"
+touch "$tmp_cache_dir/complete" "$tmp_cache_dir/last_used"
+mv -T "$tmp_cache_dir" "$cache_dir" 2>/dev/null || rm -rf "$tmp_cache_dir"
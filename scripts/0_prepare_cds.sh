@@ -0,0 +1,128 @@
+#!/bin/bash
+
+set -e
+
+if [ "$#" -ne 3 ]; then
+    echo "Usage: $0 <PID> <BID> <EXPERIMENT-LABEL>"
+    exit 1
+fi
+
+PID=$1
+BID=$2
+EXPERIMENT_LABEL=$3
+
+# number of launches measured with and without the archive
+NUM_RUNS=3
+
+pid_dir="/ssd_home/yangheechan/defects4j/${EXPERIMENT_LABEL}/${PID}"
+out_dir="${pid_dir}/out_dir"
+result_dir="$out_dir/$PID-${BID}b-result"
+subjectInfo_dir="$result_dir/subjectInfo"
+
+dir_bin_classes=$(cat "$subjectInfo_dir/dir_bin_classes.txt")
+dir_bin_tests=$(cat "$subjectInfo_dir/dir_bin_tests.txt")
+cp_test=$(cat "$subjectInfo_dir/cp_test.txt")
+classes_relevant=$(cat "$subjectInfo_dir/classes_relevant.txt")
+
+repo_dir="$pid_dir/${PID}-${BID}b"
+cd $repo_dir
+
+# the archive may only contain classes from jars, and the classpath of a launch must start
+# with the classpath of the archive: all GZoltar launches start with the CLI and agent jars
+cds_cp="$GZOLTAR_CLI_JAR:$GZOLTAR_AGENT_JAR"
+
+# one archive per server for all bugs and experiments, keyed by the jars and the JVM it was dumped with
+cds_home="/ssd_home/yangheechan/defects4j/cds"
+cds_key=$( { sha256sum "$GZOLTAR_CLI_JAR" "$GZOLTAR_AGENT_JAR" | awk '{print $1}'; java -version 2>&1; } | sha256sum | cut -c1-16)
+cds_archive="$cds_home/gzoltar-${cds_key}.jsa"
+cds_stats="$cds_home/gzoltar-${cds_key}.json"
+mkdir -p "$cds_home"
+
+# the scripts of the bug read the archive from here (see 2_instrument.sh)
+echo "$cds_archive" > "$subjectInfo_dir/cds_archive.txt"
+
+# bugs prepared at the same time on this server wait for the first one to dump the archive
+exec 9> "$cds_home/gzoltar-${cds_key}.lock"
+flock 9
+if [ -f "$cds_archive" ] && [ -f "$cds_stats" ]; then
+  cp "$cds_stats" "$subjectInfo_dir/cds_startup.json"
+  echo "[INFO] CDS archive $cds_archive already exists"
+  exit 0
+fi
+
+cds_dir="$repo_dir/cds"
+rm -rf "$cds_dir"
+mkdir -p "$cds_dir"
+class_list="$cds_dir/classes.lst"
+
+
+# 1. record the classes loaded by the four GZoltar commands of the pipeline
+java -XX:DumpLoadedClassList="$cds_dir/list_tests.lst" \
+  -cp "$cds_cp:$dir_bin_tests:$dir_bin_classes:$cp_test" \
+  com.gzoltar.cli.Main listTestMethods \
+  $dir_bin_tests \
+  --outputFile "$cds_dir/all_tests.txt"
+
+java -XX:DumpLoadedClassList="$cds_dir/instrument.lst" \
+  -cp "$cds_cp:$cp_test" \
+  com.gzoltar.cli.Main instrument \
+  $dir_bin_classes \
+  --outputDirectory "$cds_dir/instrument_classes"
+
+# one test is enough to load the classes of the runner and the agent (it may fail)
+head -n 1 "$cds_dir/all_tests.txt" > "$cds_dir/one_test.txt"
+(
+  cd "$cds_dir"
+  java -XX:DumpLoadedClassList="$cds_dir/run_tests.lst" \
+    -cp "$cds_cp:$cds_dir/instrument_classes:$repo_dir/$dir_bin_tests:$cp_test" \
+    com.gzoltar.cli.Main runTestMethods \
+    --testMethods "$cds_dir/one_test.txt" \
+    --collectCoverage \
+    --offline || true
+
+  java -XX:DumpLoadedClassList="$cds_dir/report.lst" \
+    -cp "$cds_cp" \
+    com.gzoltar.cli.Main faultLocalizationReport \
+    --buildLocation "$repo_dir/$dir_bin_classes" \
+    --granularity line \
+    --includes $classes_relevant \
+    --dataFile gzoltar.ser \
+    --outputDirectory "$cds_dir/report" \
+    --family sfl || true
+)
+
+cat "$cds_dir"/*.lst | sort -u > "$class_list"
+
+
+# 2. dump the archive (classes outside of the jars are skipped), renamed into place once complete
+java -Xshare:dump \
+  -XX:SharedClassListFile="$class_list" \
+  -XX:SharedArchiveFile="$cds_archive.tmp" \
+  -cp "$cds_cp"
+mv "$cds_archive.tmp" "$cds_archive"
+
+
+# 3. measure the startup of a launch with and without the archive
+measure_ms() {
+  local total=0
+  for i in $(seq 1 $NUM_RUNS); do
+    local start=$(date +%s%N)
+    java "$@" -cp "$cds_cp:$dir_bin_tests:$dir_bin_classes:$cp_test" \
+      com.gzoltar.cli.Main listTestMethods \
+      $dir_bin_tests \
+      --outputFile "$cds_dir/all_tests.txt" > /dev/null 2>&1 || true
+    local end=$(date +%s%N)
+    total=$((total + (end - start) / 1000000))
+  done
+  echo $((total / NUM_RUNS))
+}
+
+without_cds_ms=$(measure_ms -Xshare:off)
+with_cds_ms=$(measure_ms -Xshare:auto -XX:SharedArchiveFile="$cds_archive")
+
+echo "{\"archive\": \"$cds_archive\", \"num_classes\": $(wc -l < "$class_list"), \"num_runs\": $NUM_RUNS, \"without_cds_ms\": $without_cds_ms, \"with_cds_ms\": $with_cds_ms, \"saving_ms\": $((without_cds_ms - with_cds_ms))}" \
+  > "$cds_stats"
+cp "$cds_stats" "$subjectInfo_dir/cds_startup.json"
+echo "[INFO] CDS archive $cds_archive: startup ${without_cds_ms}ms -> ${with_cds_ms}ms"
+
+rm -rf "$cds_dir"
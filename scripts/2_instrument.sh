@@ -26,6 +26,13 @@ cp_test=$(echo "$cp_test" | sed "s|$dir_bin_classes|core${CORE}/working_classes|
 
 repo_dir="$pid_dir/${PID}-${BID}b"
 core_dir="$repo_dir/core${CORE}"
+
+# place the core directory in a scratch workspace (e.g., tmpfs) when CORE_WORKSPACE is set
+if [ -n "$CORE_WORKSPACE" ]; then
+  core_dir="$CORE_WORKSPACE/core${CORE}"
+  cp_test=$(echo "$cp_test" | sed "s|$repo_dir/core${CORE}/working_classes|$core_dir/working_classes|g")
+fi
+
 cd $core_dir
 
 
@@ -48,7 +55,14 @@ if [ -d "$instrument_classes_dir" ]; then
 fi
 
 
-java -cp "$GZOLTAR_CLI_JAR:$GZOLTAR_AGENT_JAR:$cp_test" \
+# use the class-data-sharing archive of the server (see 0_prepare_cds.sh) unless it is missing or stale
+cds_archive=$(cat "$subjectInfo_dir/cds_archive.txt" 2>/dev/null || true)
+cds_opts=""
+if [ -n "$cds_archive" ] && [ -f "$cds_archive" ] && [ "$cds_archive" -nt "$GZOLTAR_CLI_JAR" ] && [ "$cds_archive" -nt "$GZOLTAR_AGENT_JAR" ]; then
+  cds_opts="-Xshare:auto -XX:SharedArchiveFile=$cds_archive"
+fi
+
+java $cds_opts -cp "$GZOLTAR_CLI_JAR:$GZOLTAR_AGENT_JAR:$cp_test" \
   com.gzoltar.cli.Main instrument \
   $working_classes_dir_name \
   --outputDirectory $instrument_classes_dir_name
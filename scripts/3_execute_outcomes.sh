@@ -0,0 +1,68 @@
+#!/bin/bash
+
+set -e
+
+if [ "$#" -ne 6 ]; then
+    echo "Usage: $0 <PID> <BID> <EXPERIMENT-LABEL> <CORE> <TARGET_TESTS> <WORK_NAME>"
+    exit 1
+fi
+
+PID=$1
+BID=$2
+EXPERIMENT_LABEL=$3
+CORE=$4
+TARGET_TESTS=$5
+WORK_NAME=$6
+
+scripts_dir=$(cd "$(dirname "$0")" && pwd)
+
+pid_dir="/ssd_home/yangheechan/defects4j/${EXPERIMENT_LABEL}/${PID}"
+out_dir="${pid_dir}/out_dir"
+result_dir="$out_dir/$PID-${BID}b-result"
+subjectInfo_dir="$result_dir/subjectInfo"
+
+dir_bin_classes=$(cat "$subjectInfo_dir/dir_bin_classes.txt")
+dir_bin_tests=$(cat "$subjectInfo_dir/dir_bin_tests.txt")
+cp_test=$(cat "$subjectInfo_dir/cp_test.txt")
+
+# replace text of dir_bin_classes (e.g., target/classes) in cp_test with "core${CORE}/working_classes"
+cp_test=$(echo "$cp_test" | sed "s|$dir_bin_classes|core${CORE}/working_classes|g")
+
+repo_dir="$pid_dir/${PID}-${BID}b"
+core_dir="$repo_dir/core${CORE}"
+
+# place the core directory in a scratch workspace (e.g., tmpfs) when CORE_WORKSPACE is set
+if [ -n "$CORE_WORKSPACE" ]; then
+  core_dir="$CORE_WORKSPACE/core${CORE}"
+  cp_test=$(echo "$cp_test" | sed "s|$repo_dir/core${CORE}/working_classes|$core_dir/working_classes|g")
+fi
+
+cd $core_dir
+
+
+working_classes_dir_name="working_classes"
+dir_bin_tests_dir="${repo_dir}/${dir_bin_tests}"
+
+# compile OutcomeRunner once per bug (with the JUnit version of the subject)
+runner_dir="$repo_dir/outcome_runner"
+(
+  flock 9
+  if [ ! -f "$runner_dir/OutcomeRunner.class" ]; then
+    mkdir -p "$runner_dir"
+    javac -cp "$cp_test" -d "$runner_dir" "$scripts_dir/OutcomeRunner.java"
+  fi
+) 9>"$repo_dir/outcome_runner.lock"
+
+
+work_cov_dir="$result_dir/coverage_results/$WORK_NAME"
+
+# if work_cov_dir exists remove it
+if [ -d "$work_cov_dir" ]; then
+  rm -rf "$work_cov_dir"
+fi
+mkdir -p "$work_cov_dir/sfl/txt"
+
+java -cp "$runner_dir:$working_classes_dir_name:$dir_bin_tests_dir:$cp_test" \
+  OutcomeRunner \
+  "${subjectInfo_dir}/${TARGET_TESTS}.txt" \
+  "$work_cov_dir/sfl/txt/tests.csv"
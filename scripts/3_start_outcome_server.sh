@@ -0,0 +1,59 @@
+#!/bin/bash
+
+set -e
+
+if [ "$#" -ne 4 ]; then
+    echo "Usage: $0 <PID> <BID> <EXPERIMENT-LABEL> <CORE>"
+    exit 1
+fi
+
+PID=$1
+BID=$2
+EXPERIMENT_LABEL=$3
+CORE=$4
+
+scripts_dir=$(cd "$(dirname "$0")" && pwd)
+
+pid_dir="/ssd_home/yangheechan/defects4j/${EXPERIMENT_LABEL}/${PID}"
+out_dir="${pid_dir}/out_dir"
+result_dir="$out_dir/$PID-${BID}b-result"
+subjectInfo_dir="$result_dir/subjectInfo"
+
+dir_bin_classes=$(cat "$subjectInfo_dir/dir_bin_classes.txt")
+dir_bin_tests=$(cat "$subjectInfo_dir/dir_bin_tests.txt")
+cp_test=$(cat "$subjectInfo_dir/cp_test.txt")
+
+repo_dir="$pid_dir/${PID}-${BID}b"
+core_dir="$repo_dir/core${CORE}"
+
+# place the core directory in a scratch workspace (e.g., tmpfs) when CORE_WORKSPACE is set
+if [ -n "$CORE_WORKSPACE" ]; then
+  core_dir="$CORE_WORKSPACE/core${CORE}"
+fi
+
+cd $core_dir
+
+
+working_classes_dir="$core_dir/working_classes"
+dir_bin_tests_dir="${repo_dir}/${dir_bin_tests}"
+
+# compile OutcomeRunner once per bug (with the JUnit version of the subject)
+runner_dir="$repo_dir/outcome_runner"
+(
+  flock 9
+  if [ ! -f "$runner_dir/OutcomeRunner.class" ]; then
+    mkdir -p "$runner_dir"
+    javac -cp "$cp_test" -d "$runner_dir" "$scripts_dir/OutcomeRunner.java"
+  fi
+) 9>"$repo_dir/outcome_runner.lock"
+
+# the classes of the subject are loaded by the runner for every run (to pick up the mutant),
+# so they must not be on the classpath of the JVM itself
+server_cp=$(echo "$cp_test" | tr ':' '\n' \
+  | grep -v -x -e "$dir_bin_classes" -e "$repo_dir/$dir_bin_classes" -e "$dir_bin_tests" -e "$dir_bin_tests_dir" \
+  | paste -sd ':' -)
+
+exec java -cp "$runner_dir:$server_cp" \
+  OutcomeRunner --server \
+  "$working_classes_dir" \
+  "$dir_bin_tests_dir"
@@ -28,6 +28,12 @@ cp_test=$(cat "$subjectInfo_dir/cp_test.txt")
 
 repo_dir="$pid_dir/${PID}-${BID}b"
 core_dir="$repo_dir/core${CORE}"
+
+# place the core directory in a scratch workspace (e.g., tmpfs) when CORE_WORKSPACE is set
+if [ -n "$CORE_WORKSPACE" ]; then
+  core_dir="$CORE_WORKSPACE/core${CORE}"
+fi
+
 cd $core_dir
 
 
@@ -49,16 +55,40 @@ if [ -d "$work_cov_dir" ]; then
   rm -rf "$work_cov_dir"
 fi
 
+# in a scratch workspace, generate the report next to the core directory
+# and only copy the files that are parsed later to persistent storage
+report_dir="$work_cov_dir"
+if [ -n "$CORE_WORKSPACE" ]; then
+  report_dir="$core_dir/report"
+  rm -rf "$report_dir"
+fi
+
+# use the class-data-sharing archive of the server (see 0_prepare_cds.sh) unless it is missing or stale
+cds_archive=$(cat "$subjectInfo_dir/cds_archive.txt" 2>/dev/null || true)
+cds_opts=""
+if [ -n "$cds_archive" ] && [ -f "$cds_archive" ] && [ "$cds_archive" -nt "$GZOLTAR_CLI_JAR" ] && [ "$cds_archive" -nt "$GZOLTAR_AGENT_JAR" ]; then
+  cds_opts="-Xshare:auto -XX:SharedArchiveFile=$cds_archive"
+fi
+
 if [ -f "gzoltar.ser" ]; then
-  java -cp "$GZOLTAR_CLI_JAR" \
+  # the agent jar is only on the classpath to match the classpath of the archive
+  java $cds_opts -cp "$GZOLTAR_CLI_JAR:$GZOLTAR_AGENT_JAR" \
     com.gzoltar.cli.Main faultLocalizationReport \
     --buildLocation $working_classes_dir \
     --granularity line \
     --includes $classes_relevant \
     --dataFile gzoltar.ser \
-    --outputDirectory $work_cov_dir \
+    --outputDirectory $report_dir \
     --family sfl
 else
   echo "[ERROR] No gzoltar.ser file found"
   exit 1
 fi
+
+if [ -n "$CORE_WORKSPACE" ]; then
+  mkdir -p "$work_cov_dir/sfl/txt"
+  for report_file in spectra.csv tests.csv matrix.txt; do
+    cp "$report_dir/sfl/txt/$report_file" "$work_cov_dir/sfl/txt/"
+  done
+  rm -rf "$report_dir"
+fi
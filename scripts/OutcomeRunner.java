@@ -0,0 +1,163 @@
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.FileReader;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.io.PrintWriter;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.util.ArrayList;
+import java.util.List;
+
+import org.junit.runner.JUnitCore;
+import org.junit.runner.Request;
+import org.junit.runner.Result;
+import org.junit.runner.notification.Failure;
+
+/**
+ * Runs test methods with plain JUnit (no coverage instrumentation) and writes
+ * their outcomes in the format of the tests.csv of a GZoltar report:
+ *     name,outcome,runtime,stacktrace
+ *
+ * Usage: java OutcomeRunner <test methods file> <output tests.csv>
+ *        java OutcomeRunner --server <class dir>...
+ * The test methods file has one "<type>,<class>#<method>" line per test
+ * (e.g., subjectInfo/relevant_tests.txt).
+ *
+ * In server mode the JVM stays alive and reads one command per line from stdin:
+ *     run <test methods file> <output tests.csv>
+ * and answers "done <output tests.csv>" (or "error <message>") on stdout.
+ * The class dirs (e.g., working_classes and the test classes) are loaded by a
+ * fresh class loader for every run, so a replaced (mutant) class is picked up.
+ */
+public class OutcomeRunner {
+
+    public static void main(String[] args) throws IOException {
+        if (args.length >= 1 && args[0].equals("--server")) {
+            List<File> classDirs = new ArrayList<>();
+            for (int i = 1; i < args.length; i++) {
+                classDirs.add(new File(args[i]));
+            }
+            serve(classDirs);
+        } else if (args.length == 2) {
+            runTests(args[0], args[1], OutcomeRunner.class.getClassLoader());
+        } else {
+            System.err.println("Usage: java OutcomeRunner <test methods file> <output tests.csv>");
+            System.err.println("       java OutcomeRunner --server <class dir>...");
+            System.exit(1);
+        }
+        // tests may leave non-daemon threads behind
+        System.exit(0);
+    }
+
+    static void serve(List<File> classDirs) throws IOException {
+        // keep stdout for the protocol, output of the tests is discarded
+        PrintStream protocol = new PrintStream(new FileOutputStream(FileDescriptor.out), true);
+        System.setOut(new PrintStream(new OutputStream() {
+            @Override
+            public void write(int b) {
+            }
+        }));
+
+        URL[] urls = new URL[classDirs.size()];
+        for (int i = 0; i < classDirs.size(); i++) {
+            urls[i] = classDirs.get(i).toURI().toURL();
+        }
+
+        BufferedReader commands = new BufferedReader(new InputStreamReader(System.in));
+        protocol.println("ready");
+        String line;
+        while ((line = commands.readLine()) != null) {
+            String[] command = line.trim().split(" ");
+            if (command.length == 1 && command[0].equals("exit")) {
+                break;
+            }
+            if (command.length != 3 || !command[0].equals("run")) {
+                protocol.println("error unknown command: " + line);
+                continue;
+            }
+
+            ClassLoader previous = Thread.currentThread().getContextClassLoader();
+            try (URLClassLoader loader = new URLClassLoader(urls, OutcomeRunner.class.getClassLoader())) {
+                Thread.currentThread().setContextClassLoader(loader);
+                runTests(command[1], command[2], loader);
+                protocol.println("done " + command[2]);
+            } catch (Throwable t) {
+                protocol.println("error " + String.valueOf(t).replace('\n', ' '));
+            } finally {
+                Thread.currentThread().setContextClassLoader(previous);
+            }
+        }
+    }
+
+    static void runTests(String testMethodsFile, String outputFile, ClassLoader loader) throws IOException {
+        List<String> testNames = readTestNames(testMethodsFile);
+        try (PrintWriter out = new PrintWriter(new FileWriter(outputFile))) {
+            out.println("name,outcome,runtime,stacktrace");
+            for (String testName : testNames) {
+                out.println(runTest(testName, loader));
+                out.flush();
+            }
+        }
+    }
+
+    static List<String> readTestNames(String testMethodsFile) throws IOException {
+        List<String> testNames = new ArrayList<>();
+        try (BufferedReader reader = new BufferedReader(new FileReader(testMethodsFile))) {
+            String line;
+            while ((line = reader.readLine()) != null) {
+                line = line.trim();
+                if (line.isEmpty()) {
+                    continue;
+                }
+                testNames.add(line.substring(line.indexOf(',') + 1));
+            }
+        }
+        return testNames;
+    }
+
+    static String runTest(String testName, ClassLoader loader) {
+        String className = testName.substring(0, testName.indexOf('#'));
+        String methodName = testName.substring(testName.indexOf('#') + 1);
+
+        long start = System.nanoTime();
+        String outcome;
+        String stacktrace = "";
+        try {
+            Class<?> testClass = Class.forName(className, false, loader);
+            Result result = new JUnitCore().run(Request.method(testClass, methodName));
+            if (result.wasSuccessful()) {
+                outcome = "PASS";
+            } else {
+                outcome = "FAIL";
+                Failure failure = result.getFailures().get(0);
+                stacktrace = formatThrowable(failure.getException());
+            }
+        } catch (Throwable t) {
+            outcome = "FAIL";
+            stacktrace = formatThrowable(t);
+        }
+        long runtime = System.nanoTime() - start;
+
+        return testName + "," + outcome + "," + runtime + "," + stacktrace;
+    }
+
+    static String formatThrowable(Throwable t) {
+        StringBuilder sb = new StringBuilder(String.valueOf(t));
+        for (StackTraceElement element : t.getStackTrace()) {
+            // the frames of JUnitCore and of this runner differ between the one-shot and the server mode
+            // (runTests <- main vs. runTests <- serve <- main), keep only the frames of the test
+            if (element.getClassName().equals(JUnitCore.class.getName()) || element.getClassName().equals(OutcomeRunner.class.getName())) {
+                break;
+            }
+            sb.append(" at ").append(element);
+        }
+        // one line per test, as read by data_read_utils.get_test_info
+        return sb.toString().replace('\r', ' ').replace('\n', ' ');
+    }
+}
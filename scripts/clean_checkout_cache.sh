@@ -0,0 +1,41 @@
+#!/bin/bash
+
+set -e
+
+if [ "$#" -ne 1 ]; then
+    echo "Usage: $0 <MAX-SIZE-GB>"
+    exit 1
+fi
+
+MAX_SIZE_GB=$1
+
+# the checkout cache of 0_compile2prepare.sh on this server
+cache_root="/ssd_home/yangheechan/defects4j/checkout_cache"
+if [ ! -d "$cache_root" ]; then
+    exit 0
+fi
+
+# entries left by bugs that died while filling them
+find "$cache_root" -mindepth 1 -maxdepth 1 -type d -name "*.tmp.*" -mmin +1440 -exec rm -rf {} +
+
+# entries cached before their use was recorded count as used when they were cached
+for complete in "$cache_root"/*/complete; do
+    if [ -f "$complete" ] && [ ! -f "$(dirname "$complete")/last_used" ]; then
+        touch -r "$complete" "$(dirname "$complete")/last_used"
+    fi
+done
+
+# remove the least recently used entries until the cache fits in MAX_SIZE_GB
+max_kb=$((MAX_SIZE_GB * 1024 * 1024))
+total_kb=$(du -sk "$cache_root" | cut -f 1)
+for last_used in $(ls -tr "$cache_root"/*/last_used 2>/dev/null); do
+    if [ "$total_kb" -le "$max_kb" ]; then
+        break
+    fi
+    entry_dir=$(dirname "$last_used")
+    entry_kb=$(du -sk "$entry_dir" | cut -f 1)
+    echo "[INFO] Removing $entry_dir ($(cat "$entry_dir/key.txt"), ${entry_kb} KB)"
+    rm -rf "$entry_dir"
+    total_kb=$((total_kb - entry_kb))
+done
+echo "[INFO] Checkout cache $cache_root: $((total_kb / 1024)) MB"
@@ -0,0 +1,61 @@
+import struct
+
+from utils.bytecode_utils import *
+
+
+def make_class_bytes(opcode=0xb1, line_num=10):
+    """Build a minimal class file with one method, a LineNumberTable and a SourceFile attribute."""
+    def utf8(text):
+        return b"\x01" + struct.pack(">H", len(text)) + text.encode()
+
+    constant_pool = [
+        utf8("Foo"), b"\x07" + struct.pack(">H", 1),
+        utf8("java/lang/Object"), b"\x07" + struct.pack(">H", 3),
+        utf8("run"), utf8("()V"), utf8("Code"),
+        utf8("LineNumberTable"), utf8("SourceFile"), utf8("Foo.java"),
+    ]
+    line_number_table = struct.pack(">HHH", 1, 0, line_num)
+    code = bytes([opcode])
+    code_info = struct.pack(">HHI", 0, 1, len(code)) + code + struct.pack(">H", 0) \
+        + struct.pack(">H", 1) + struct.pack(">HI", 8, len(line_number_table)) + line_number_table
+
+    data = struct.pack(">IHH", 0xCAFEBABE, 0, 55)
+    data += struct.pack(">H", len(constant_pool) + 1) + b"".join(constant_pool)
+    data += struct.pack(">HHH", 0x0021, 2, 4)
+    data += struct.pack(">H", 0)  # interfaces
+    data += struct.pack(">H", 0)  # fields
+    data += struct.pack(">H", 1) + struct.pack(">HHH", 0x0001, 5, 6)
+    data += struct.pack(">H", 1) + struct.pack(">HI", 7, len(code_info)) + code_info
+    data += struct.pack(">H", 1) + struct.pack(">HI", 9, 2) + struct.pack(">H", 10)
+    return data
+
+
+def test_normalize_class_bytes_ignores_debug_attributes():
+    assert make_class_bytes(line_num=10) != make_class_bytes(line_num=42)
+    assert normalize_class_bytes(make_class_bytes(line_num=10)) == normalize_class_bytes(make_class_bytes(line_num=42))
+    assert normalize_class_bytes(make_class_bytes(opcode=0xb1)) != normalize_class_bytes(make_class_bytes(opcode=0x00))
+
+
+def test_group_duplicate_mutants(tmp_path):
+    original_dir = tmp_path / "classes"
+    original_dir.mkdir()
+    (original_dir / "Foo.class").write_bytes(make_class_bytes())
+
+    mutant_bytes = {
+        1: make_class_bytes(opcode=0x00),
+        2: make_class_bytes(),  # identical to the original class
+        3: make_class_bytes(opcode=0x00),  # identical to mutant 1
+        4: make_class_bytes(opcode=0x00, line_num=42),  # identical to mutant 1 except debug info
+    }
+    mutantIdx2mutantInfo = {}
+    for mutantIdx, data in mutant_bytes.items():
+        class_file = tmp_path / f"{mutantIdx}_Foo.class"
+        class_file.write_bytes(data)
+        mutantIdx2mutantInfo[mutantIdx] = {"className": "Foo", "classFilePath": str(class_file)}
+
+    duplicates, equivalent = group_duplicate_mutants(mutantIdx2mutantInfo, str(original_dir))
+    assert duplicates == {3: 1}, f"Unexpected duplicates: {duplicates}"
+    assert equivalent == [2], f"Unexpected equivalent mutants: {equivalent}"
+
+    duplicates, equivalent = group_duplicate_mutants(mutantIdx2mutantInfo, str(original_dir), normalize=True)
+    assert duplicates == {3: 1, 4: 1}, f"Unexpected normalized duplicates: {duplicates}"
@@ -0,0 +1,38 @@
+import time
+
+from lib.cluster_simulator import *
+from utils.scheduling_utils import synthetic_bug_costs, perturb_costs
+
+
+def test_simulate_policies():
+    # one long bug submitted last: fifo starts it at the end, lpt first
+    task2cost = {"1": 10.0, "2": 10.0, "3": 10.0, "4": 10.0, "5": 40.0}
+    fifo = ClusterSimulator(["a", "b"], policy="fifo").run(task2cost)
+    lpt = ClusterSimulator(["a", "b"], policy="lpt", work_stealing=True).run(task2cost)
+
+    assert fifo["makespan_sec"] == 60.0
+    assert lpt["makespan_sec"] == 40.0, "lpt should start the long bug first."
+    assert lpt["lower_bound_sec"] == 40.0
+    assert lpt["tail_sec"] == 0.0 and fifo["tail_sec"] == 40.0, "With fifo, one worker is idle while the long bug runs."
+    assert len(lpt["tasks"]) == 5, "Every task should finish once."
+
+
+def test_simulate_speeds_and_cores():
+    report = ClusterSimulator(["a", "b"], policy="lpt", worker_speeds={"a": 2.0}, cores_per_worker=10).run({"1": 200.0, "2": 100.0})
+    assert report["makespan_sec"] == 10.0, "The long bug should run on the fast worker."
+
+
+def test_simulate_stragglers():
+    task2cost = {str(bid): 100.0 for bid in range(1, 11)}
+    task2duration = dict(task2cost, **{"7": 400.0})
+    report = ClusterSimulator(["a", "b", "c"], policy="fifo").run(task2cost, task2duration)
+    assert report["stragglers"]["task_ids"] == ["7"], "A bug that takes 4x its estimate should be a straggler."
+    assert report["stragglers"]["max_slowdown"] == 4.0
+
+
+def test_simulate_is_fast():
+    task2cost = synthetic_bug_costs(2000, seed=1)
+    started_at = time.monotonic()
+    report = ClusterSimulator([f"s{idx}/slot0" for idx in range(100)], policy="lpt", work_stealing=True).run(task2cost, perturb_costs(task2cost, seed=1))
+    assert time.monotonic() - started_at < 5.0, "The simulation should run in seconds."
+    assert report["makespan_sec"] >= report["lower_bound_sec"]
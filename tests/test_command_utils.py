@@ -12,4 +12,30 @@ def test_run_command():
     mock_command = "echo 'Hello, World!'"
 
     res = execute_command(mock_command, mock_server)
-    assert res is True, f"Failed to run command '{mock_command}' on server {mock_server}"
\ No newline at end of file
+    assert res is True, f"Failed to run command '{mock_command}' on server {mock_server}"
+def test_run_command_host_limit(monkeypatch):
+    import functools
+    import threading
+    import time
+
+    import utils.command_utils as command_utils
+    from utils.fanout_utils import DEFAULT_PER_HOST_LIMIT, run_fan_out
+
+    # run the commands of the "server" on this machine
+    local_fan_out = functools.partial(run_fan_out, command_builder=lambda server, command: ["sh", "-c", command])
+    monkeypatch.setattr(command_utils, "run_fan_out", local_fan_out)
+
+    exit_codes = []
+    threads = [
+        threading.Thread(target=lambda: exit_codes.append(command_utils.run_command("sleep 0.3", "host-limit-test")))
+        for _ in range(DEFAULT_PER_HOST_LIMIT + 2)
+    ]
+    started_at = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert exit_codes == [0] * len(threads)
+    assert time.monotonic() - started_at >= 0.6, \
+        f"At most {DEFAULT_PER_HOST_LIMIT} commands of a server should run at once across threads."
@@ -0,0 +1,13 @@
+from utils.failure_utils import *
+
+
+def test_classify_failure():
+    assert classify_failure("mutation-testing", 255, None) == "ssh", "Exit status 255 is a failure of ssh."
+    assert classify_failure("mutation-testing", 1, "Exception in thread \"main\" java.lang.OutOfMemoryError: Java heap space") == "oom"
+    assert classify_failure("pit", 137, None) == "oom", "A killed process is most likely out of memory."
+    assert classify_failure("mutation-testing", 124, None) == "timeout"
+    assert classify_failure("compile2prepare", 1, "BUILD FAILED") == "compile"
+    assert classify_failure("saver", 1, "psycopg2.errors.UniqueViolation") == "other"
+
+    assert is_transient_failure("ssh") and is_transient_failure("oom") and is_transient_failure("timeout")
+    assert not is_transient_failure("compile"), "A compile failure happens again on another server."
@@ -0,0 +1,43 @@
+from utils.fanout_utils import *
+
+import time
+
+
+def local_command(server, command):
+    # run the commands of all "servers" on this machine
+    return ["sh", "-c", command]
+
+
+def test_fan_out_results():
+    lines = []
+    results = run_fan_out(
+        [("a", "echo hello"), ("b", "echo world; exit 3")],
+        on_line=lambda server, line: lines.append(f"[{server}] {line}"), command_builder=local_command
+    )
+    assert [result["exit_code"] for result in results] == [0, 3], "Results should follow the order of the tasks."
+    assert results[1]["output"] == ["world"]
+    assert sorted(lines) == ["[a] hello", "[b] world"], "Output lines should be prefixed with their host."
+
+    table = format_result_table(results)
+    assert "a" in table and "b" in table
+    assert summarize_results(results)["b"]["num_failed"] == 1
+
+
+def test_fan_out_limits():
+    tasks = [("a", "sleep 0.3"), ("a", "sleep 0.3"), ("b", "sleep 0.3")]
+
+    started_at = time.monotonic()
+    run_fan_out(tasks, per_host_limit=1, command_builder=local_command)
+    assert time.monotonic() - started_at >= 0.6, "Commands of a host should run one at a time with a per-host limit of 1."
+
+    started_at = time.monotonic()
+    run_fan_out(tasks, per_host_limit=2, command_builder=local_command)
+    assert time.monotonic() - started_at < 0.6, "Commands within the limits should run concurrently."
+
+    results = run_fan_out([("a", "exec sleep 5")], timeout_sec=0.2, command_builder=local_command)
+    assert results[0]["exit_code"] == TIMEOUT_EXIT_CODE, "A command should be killed after its timeout."
+
+
+def test_fan_out_stdin():
+    results = run_fan_out([("a", "read line; echo got $line")], stdin_data="secret\n", command_builder=local_command)
+    assert results[0]["output"] == ["got secret"]
@@ -145,3 +145,27 @@ def test_receive_directory():
             for name in dirs:
                 os.rmdir(os.path.join(root, name))
         os.rmdir(received_dir)
+
+def test_build_deploy_archive(tmp_path):
+    root_dir = tmp_path / "root"
+    (root_dir / "scripts").mkdir(parents=True)
+    (root_dir / "lib/__pycache__").mkdir(parents=True)
+    (root_dir / "scripts/run.sh").write_text("echo run")
+    (root_dir / "lib/engine.py").write_text("x = 1")
+    (root_dir / "lib/__pycache__/engine.cpython-311.pyc").write_text("cache")
+
+    paths = ["scripts/run.sh", "lib", "missing.txt"]
+    first_hash = build_deploy_archive(str(root_dir), paths, str(tmp_path / "first.tar.gz"))
+    os.utime(root_dir / "lib/engine.py", (0, 0))
+    second_hash = build_deploy_archive(str(root_dir), paths, str(tmp_path / "second.tar.gz"))
+    assert first_hash == second_hash, "The hash should not depend on timestamps."
+
+    import tarfile
+    with tarfile.open(tmp_path / "first.tar.gz") as tar:
+        members = {member.name: member for member in tar.getmembers()}
+    assert sorted(members) == ["lib/engine.py", "scripts/run.sh"], f"Unexpected members: {sorted(members)}"
+    assert members["scripts/run.sh"].mode == 0o777, "Scripts should be executable."
+
+    (root_dir / "lib/engine.py").write_text("x = 2")
+    third_hash = build_deploy_archive(str(root_dir), paths, str(tmp_path / "third.tar.gz"))
+    assert third_hash != first_hash, "The hash should change with the content."
@@ -39,4 +39,20 @@ def test_execute_command():
     # Assuming execut_command returns True if the command was executed successfully
     result = execut_command(command, mock_server)
 
-    assert result is True, f"Command '{command}' should be executed successfully on server {mock_server}."
\ No newline at end of file
+    assert result is True, f"Command '{command}' should be executed successfully on server {mock_server}."
+
+def test_prune_mutants_to_lines():
+    relevant_lines = {
+        3: {"className": "org.foo.Bar", "methodName": "baz()", "lineNum": 10},
+        7: {"className": "org.foo.Bar$Inner", "methodName": "qux()", "lineNum": 22},
+    }
+    mutantIdx2mutantInfo = {
+        1: {"className": "org.foo.Bar", "lineNumber": 10},
+        2: {"className": "org.foo.Bar", "lineNumber": 11},
+        3: {"className": "org.foo.Bar$Inner", "lineNumber": 22},
+        4: {"className": "org.foo.Other", "lineNumber": 10},
+    }
+
+    kept_mutants = prune_mutants_to_lines(mutantIdx2mutantInfo, relevant_lines)
+
+    assert sorted(kept_mutants.keys()) == [1, 3], f"Unexpected kept mutants: {sorted(kept_mutants.keys())}"
@@ -0,0 +1,31 @@
+from utils.health_utils import *
+
+
+def test_parse_health_probe():
+    output = "free_disk_kb=104857600\nload1=8.00\ncores=16\nmem_available_kb=33554432\njava=1\n"
+    health = parse_health_probe(output)
+    assert health["free_disk_gb"] == 100.0
+    assert health["load_per_core"] == 0.5
+    assert health["mem_available_gb"] == 32.0
+    assert health["java"] is True
+
+    health = parse_health_probe("load1=1.0\njava=0\n")
+    assert health["free_disk_gb"] is None and health["load_per_core"] is None, "Missing values should be None."
+    assert health["java"] is False
+
+
+def test_check_server_health():
+    health = {"free_disk_gb": 100.0, "load_per_core": 0.5, "mem_available_gb": 32.0, "java": True}
+    assert check_server_health(health, 50, 2.0, 16) == [], "A server within the thresholds should be healthy."
+
+    full_disk = dict(health, free_disk_gb=10.0)
+    assert len(check_server_health(full_disk, 50, 2.0, 16)) == 1, "A server with a full disk should be unhealthy."
+    assert len(check_server_health(dict(health, java=False), 50, 2.0, 16)) == 1
+    assert check_server_health(None, 50, 2.0, 16) == ["unreachable"]
+
+
+def test_check_save_health():
+    busy = {"free_disk_gb": 100.0, "load_per_core": 4.0, "mem_available_gb": 1.0, "java": False}
+    assert check_save_health(busy, 50) == [], "Load, memory and java should not block saving."
+    assert len(check_save_health(dict(busy, free_disk_gb=1.0), 50)) == 1, "A full disk should block saving."
+    assert check_save_health(None, 50) == ["unreachable"]
@@ -0,0 +1,114 @@
+from lib.database import CRUD
+from lib.job_queue import *
+
+import os
+import threading
+from dotenv import load_dotenv
+
+TEST_LABEL = "test_job_queue"
+
+def get_crud():
+    load_dotenv()
+    db_host = os.environ.get("DB_HOST")
+    db_port = os.environ.get("DB_PORT")
+    db_user = os.environ.get("DB_USER")
+    db_password = os.environ.get("DB_PASSWORD")
+    db_name = os.environ.get("DB")
+
+    if not all([db_host, db_port, db_user, db_password, db_name]):
+        print("Database environment variables are not set correctly.")
+        return None
+
+    return CRUD(
+        host=db_host,
+        port=db_port,
+        user=db_user,
+        password=db_password,
+        database=db_name,
+    )
+
+def reset_queue(crud):
+    JobQueue(crud).create_table()
+    crud.delete(JobQueue.TABLE, {"experiment_label": TEST_LABEL})
+
+def test_claim_is_exclusive():
+    crud = get_crud()
+    if crud is None:
+        return
+    reset_queue(crud)
+
+    JobQueue(crud).enqueue("Lang", TEST_LABEL, {str(bid): bid for bid in range(1, 21)}, {"parallel": 4})
+
+    claimed = []
+    def worker(worker_id):
+        # each worker has its own connection, as on separate servers
+        job_queue = JobQueue(get_crud(), worker_id)
+        while True:
+            job = job_queue.claim(TEST_LABEL)
+            if job is None:
+                break
+            claimed.append(job["bid"])
+            job_queue.finish(job["job_idx"], True)
+
+    threads = [threading.Thread(target=worker, args=(f"worker{idx}",)) for idx in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed, key=int) == [str(bid) for bid in range(1, 21)], "Every job should be claimed exactly once."
+    assert JobQueue(crud).count_states(TEST_LABEL)["done"] == 20
+    reset_queue(crud)
+
+def test_claim_by_priority():
+    crud = get_crud()
+    if crud is None:
+        return
+    reset_queue(crud)
+
+    job_queue = JobQueue(crud, "worker0")
+    job_queue.enqueue("Lang", TEST_LABEL, {"1": 10.0, "2": 300.0, "3": 20.0}, {"parallel": 4})
+    job = job_queue.claim(TEST_LABEL)
+    assert job["bid"] == "2", "The job with the highest priority should be claimed first."
+    assert job["options"] == {"parallel": 4}
+    reset_queue(crud)
+
+def test_stale_job_is_requeued():
+    crud = get_crud()
+    if crud is None:
+        return
+    reset_queue(crud)
+
+    dead_worker = JobQueue(crud, "dead", heartbeat_timeout_sec=60, max_attempts=2)
+    dead_worker.enqueue("Lang", TEST_LABEL, {"1": 0.0}, {})
+    job = dead_worker.claim(TEST_LABEL)
+    crud.safe_execute(
+        f"UPDATE {JobQueue.TABLE} SET heartbeat_at = NOW() - INTERVAL '2 minutes' WHERE job_idx = %s",
+        [job["job_idx"]]
+    )
+    crud.commit()
+
+    live_worker = JobQueue(crud, "live", heartbeat_timeout_sec=60, max_attempts=2)
+    requeued = live_worker.claim(TEST_LABEL)
+    assert requeued is not None and requeued["bid"] == "1", "A job without heartbeat should be claimed again."
+    assert requeued["attempts"] == 2
+    assert not dead_worker.heartbeat(job["job_idx"]), "The dead worker should no longer own the job."
+
+    live_worker.finish(requeued["job_idx"], False)
+    assert live_worker.count_states(TEST_LABEL)["failed"] == 1, "A job should fail after max_attempts."
+    reset_queue(crud)
+
+def test_heartbeat_loses_job():
+    queue = JobQueue(None, "worker")
+    num_heartbeats = []
+
+    def heartbeat(job_idx):
+        num_heartbeats.append(job_idx)
+        return len(num_heartbeats) < 2
+    queue.heartbeat = heartbeat
+
+    stop, lost = queue.start_heartbeat(1, 0.01)
+    assert lost.wait(5), "The lost event should be set once the worker no longer owns the job."
+    assert not stop.is_set()
+    stop.set()
+    assert num_heartbeats == [1, 1], "Heartbeats should stop once the job is lost."
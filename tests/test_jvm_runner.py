@@ -0,0 +1,57 @@
+import sys
+
+from lib.jvm_runner import *
+
+# stands in for OutcomeRunner --server: "run <tests> <output>" writes <output>,
+# a tests file named "crash" exits the process and "hang" never answers
+FAKE_SERVER = """
+import sys, time
+print("ready", flush=True)
+for line in sys.stdin:
+    command = line.split()
+    if command[0] == "exit":
+        break
+    if command[1].endswith("crash"):
+        sys.exit(3)
+    if command[1].endswith("hang"):
+        time.sleep(60)
+    with open(command[2], "w") as f:
+        f.write("name,outcome,runtime,stacktrace\\n")
+    print("done " + command[2], flush=True)
+"""
+
+
+def make_runner(tmp_path):
+    server = tmp_path / "fake_server.py"
+    server.write_text(FAKE_SERVER)
+    return JvmRunner(f"{sys.executable} {server}", core=0, startup_timeout=10)
+
+
+def test_runner_reuses_process(tmp_path):
+    runner = make_runner(tmp_path)
+    for idx in range(3):
+        assert runner.run("tests", str(tmp_path / f"tests_{idx}.csv"), timeout=10)
+        assert (tmp_path / f"tests_{idx}.csv").exists()
+    assert runner.num_starts == 1, "All runs should share one process."
+    runner.close()
+    assert not runner.is_alive()
+
+
+def test_runner_respawns_after_crash(tmp_path):
+    runner = make_runner(tmp_path)
+    assert not runner.run("crash", str(tmp_path / "tests.csv"), timeout=10), "A crashed run should fail."
+    assert runner.run("tests", str(tmp_path / "tests.csv"), timeout=10), "The runner should be started again."
+    assert runner.num_starts == 2
+    runner.close()
+
+
+def test_runner_kills_on_timeout(tmp_path):
+    runner = make_runner(tmp_path)
+    try:
+        runner.run("hang", str(tmp_path / "tests.csv"), timeout=0.5)
+        assert False, "A hanging run should time out."
+    except sp.TimeoutExpired:
+        pass
+    assert not runner.is_alive(), "A timed out runner should be killed."
+    assert runner.run("tests", str(tmp_path / "tests.csv"), timeout=10)
+    runner.close()
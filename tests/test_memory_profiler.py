@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+
+from lib.memory_profiler import *
+from lib.tracer import span, traced
+
+
+class FakeRSS:
+    def __init__(self, rss_mb):
+        self.rss_mb = rss_mb
+
+    def __call__(self):
+        return self.rss_mb
+
+
+def test_stages_of_tasks(tmp_path):
+    report_file = str(tmp_path / "memory_profile.json")
+    profiler = start_profiling(report_file)
+    profiler.get_rss = FakeRSS(100.0)
+
+    @traced()
+    def build_structures():
+        return [list(range(1000)) for _ in range(100)]
+
+    with profile_task("repeat1-1"):
+        with span("measure_scores"):
+            profiler.get_rss.rss_mb = 300.0
+            profiler.sample()
+            structures = build_structures()
+            profiler.get_rss.rss_mb = 150.0
+        with span("subprocess", "subprocess"):
+            pass
+    stop_profiling()
+
+    with open(report_file) as f:
+        report = json.load(f)
+    stages = {record["stage"]: record for record in report["stages"]}
+    assert set(stages) == {"measure_scores", "build_structures"}, "Only stage spans should be profiled."
+    assert stages["measure_scores"]["peak_rss_mb"] == 300.0, "The sampled peak should be recorded."
+    assert stages["measure_scores"]["task"] == "repeat1-1"
+    task = report["tasks"]["repeat1-1"]
+    assert task["top_allocators"], "The top allocation sites of the task should be recorded."
+    assert task["peak_rss_mb"] == 300.0
+    assert len(structures) == 100
+
+
+def test_budget_lowers_concurrency(tmp_path):
+    profiler = MemoryProfiler(str(tmp_path / "memory_profile.json"), budget_mb=100.0, trace_allocations=False, sample_interval_sec=0.01, get_rss=FakeRSS(95.0))
+    profiler.start()
+    running = []
+    max_running = []
+
+    def task(name):
+        with profiler.task(name):
+            running.append(name)
+            max_running.append(len(running))
+            time.sleep(0.05)
+            running.remove(name)
+
+    threads = [threading.Thread(target=task, args=(f"task{idx}",)) for idx in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    profiler.stop()
+
+    report = profiler.get_report()
+    assert max(max_running) == 1, "Tasks should run one at a time above the soft budget."
+    assert report["num_throttled"] == 2 and report["max_concurrent_tasks"] == 1
+    assert len(report["tasks"]) == 3, "Every task should run eventually."
+
+
+def test_disabled():
+    stop_profiling()
+    with profile_task("task"), span("stage"):
+        pass
+    assert get_profiler() is None
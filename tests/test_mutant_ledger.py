@@ -0,0 +1,85 @@
+import os
+
+from lib.mutant_ledger import *
+
+
+def write_mock_report(result_dir, content="mock"):
+    txt_dir = os.path.join(result_dir, "sfl/txt")
+    os.makedirs(txt_dir, exist_ok=True)
+    for filename in REPORT_FILES:
+        with open(os.path.join(txt_dir, filename), 'w') as f:
+            f.write(f"{filename}:{content}")
+
+
+def test_ledger_resume(tmp_path):
+    ledger_file = str(tmp_path / "mutant_ledger.jsonl")
+    mutantIdx2mutantInfo = {idx: {"className": "Foo"} for idx in range(1, 6)}
+
+    ledger = MutantLedger(ledger_file)
+    ledger.register(mutantIdx2mutantInfo.keys())
+    assert ledger.count_states()["pending"] == 5, "All mutants should start as pending."
+
+    done_dir = str(tmp_path / "coverage_results/mutant_1")
+    write_mock_report(done_dir)
+    ledger.update(1, "running")
+    ledger.update(1, "done", done_dir, compute_result_checksum(done_dir))
+    ledger.update(2, "timeout", str(tmp_path / "coverage_results/mutant_2"))
+    ledger.update(3, "error")
+    ledger.update(4, "running")
+
+    # simulate a node dying in the middle of writing a line
+    with open(ledger_file, 'a') as f:
+        f.write('{"mutant_idx": 5, "sta')
+
+    resumed = MutantLedger(ledger_file)
+    unfinished = resumed.get_unfinished_mutants(mutantIdx2mutantInfo)
+    assert sorted(unfinished.keys()) == [3, 4, 5], f"Unexpected unfinished mutants: {sorted(unfinished.keys())}"
+
+    with open(ledger_file, 'r') as f:
+        assert len(f.readlines()) == 5, "Ledger should be compacted to one line per mutant."
+
+
+def test_ledger_detects_modified_result(tmp_path):
+    ledger = MutantLedger(str(tmp_path / "mutant_ledger.jsonl"))
+    result_dir = str(tmp_path / "coverage_results/mutant_7")
+    write_mock_report(result_dir)
+    ledger.update(7, "done", result_dir, compute_result_checksum(result_dir))
+    assert ledger.is_finished(7)
+
+    write_mock_report(result_dir, content="truncated")
+    assert not ledger.is_finished(7), "A changed report should be executed again."
+
+
+def test_ledger_rejects_unknown_state(tmp_path):
+    ledger = MutantLedger(str(tmp_path / "mutant_ledger.jsonl"))
+    try:
+        ledger.update(1, "finished")
+        assert False, "Unknown states should be rejected."
+    except ValueError:
+        pass
+
+
+def test_ledger_saved_mutant_is_finished_without_result_dir(tmp_path):
+    ledger = MutantLedger(str(tmp_path / "mutant_ledger.jsonl"))
+    result_dir = str(tmp_path / "coverage_results/mutant_3")
+    write_mock_report(result_dir)
+    ledger.update(3, "done", result_dir, compute_result_checksum(result_dir))
+    ledger.update(3, "saved")
+
+    resumed = MutantLedger(str(tmp_path / "mutant_ledger.jsonl"))
+    assert resumed.is_finished(3), "Streamed mutants should not be executed again after their result directory is deleted."
+
+
+def test_ledger_merge(tmp_path):
+    ledger = MutantLedger(str(tmp_path / "mutant_ledger.jsonl"))
+    ledger.register([1, 2])
+    ledger.update(1, "timeout")
+
+    shard_ledger = MutantLedger(str(tmp_path / "mutant_ledger.shard1.jsonl"))
+    shard_ledger.register([3, 4])
+    shard_ledger.update(3, "timeout")
+    shard_ledger.update(4, "error")
+
+    assert ledger.merge(str(tmp_path / "mutant_ledger.shard1.jsonl")) == 2
+    merged = MutantLedger(str(tmp_path / "mutant_ledger.jsonl"))
+    assert [merged.get_state(idx) for idx in [1, 2, 3, 4]] == ["timeout", "pending", "timeout", "error"], "Shard entries should be merged."
@@ -0,0 +1,63 @@
+from lib.mutation_testing_engine import *
+from lib.bug_pipeline import BugPipeline
+
+import shutil
+
+
+def write_mutant_result(result_dir, mutantIdx, outcome):
+    txt_dir = os.path.join(result_dir, f"coverage_results/mutant_{mutantIdx}/sfl/txt")
+    os.makedirs(txt_dir, exist_ok=True)
+    with open(os.path.join(txt_dir, "tests.csv"), 'w') as f:
+        f.write(f"name,outcome,runtime,stacktrace\norg.apache.FooTest#testA,{outcome},1000000,\n")
+    return os.path.join(result_dir, f"coverage_results/mutant_{mutantIdx}")
+
+
+def make_shard_engine(result_dir, shard, mergeShards=0):
+    engine = MutationTestingEngine.__new__(MutationTestingEngine)
+    engine.PID, engine.BID, engine.EL = "Lang", "1", "test"
+    engine.RESULT_DIR = str(result_dir)
+    engine.REPORT_FILES = OUTCOME_REPORT_FILES
+    engine.SHARD = shard
+    engine.MERGE_SHARDS = mergeShards
+    os.makedirs(os.path.join(engine.RESULT_DIR, "subjectInfo"), exist_ok=True)
+    return engine
+
+
+def finish_mutant(ledger, result_dir, mutantIdx, outcome):
+    mutant_dir = write_mutant_result(result_dir, mutantIdx, outcome)
+    ledger.update(mutantIdx, "done", mutant_dir, compute_result_checksum(mutant_dir, OUTCOME_REPORT_FILES))
+
+
+def test_merge_overlapping_shards(tmp_path):
+    # both servers use the same result directory path, the shard server is emulated by a second directory
+    result_dir = str(tmp_path / "result")
+    shard_server_dir = str(tmp_path / "shard_server")
+
+    # shard 1 got a half-written copy of mutant 1 of shard 0 and tested mutants 2 and 3
+    shard = make_shard_engine(result_dir, (1, 2))
+    shard.LEDGER = MutantLedger(shard.get_ledger_file(), OUTCOME_REPORT_FILES)
+    write_mutant_result(result_dir, 1, "STALE")
+    finish_mutant(shard.LEDGER, result_dir, 2, "FAIL")
+    finish_mutant(shard.LEDGER, result_dir, 3, "PASS")
+    shard.save_shard_results_list([2, 3])
+    shutil.move(result_dir, shard_server_dir)
+
+    # shard 0 finished mutant 1 on the primary
+    primary = make_shard_engine(result_dir, None, mergeShards=2)
+    finish_mutant(MutantLedger(primary.get_ledger_file(0), OUTCOME_REPORT_FILES), result_dir, 1, "FAIL")
+
+    command = BugPipeline("Lang", "test", 4, "/d4j/").copy_shard_results_to_server("1", 1, "primary")
+    assert "--files-from=" in command and "shard_results.shard1.txt" in command, "Only the listed mutant results should be copied back."
+    # copy back the listed directories (as rsync --files-from) and the ledger of the shard
+    with open(os.path.join(shard_server_dir, "subjectInfo/shard_results.shard1.txt"), 'r') as f:
+        listed = f.read().split()
+    assert listed == ["mutant_2", "mutant_3"], "Only the mutants of the shard should be listed."
+    for name in listed:
+        shutil.copytree(os.path.join(shard_server_dir, "coverage_results", name), os.path.join(result_dir, "coverage_results", name), dirs_exist_ok=True)
+    shutil.copy(os.path.join(shard_server_dir, "subjectInfo/mutant_ledger.shard1.jsonl"), os.path.join(result_dir, "subjectInfo/"))
+
+    primary.merge_shards()
+    with open(os.path.join(result_dir, "coverage_results/mutant_1/sfl/txt/tests.csv"), 'r') as f:
+        assert "STALE" not in f.read(), "The finished result of shard 0 should not be overwritten by a shard."
+    ledger = MutantLedger(primary.get_ledger_file(0), OUTCOME_REPORT_FILES)
+    assert all(ledger.is_finished(mutantIdx) for mutantIdx in [1, 2, 3]), "The merged ledger should match the merged results."
@@ -0,0 +1,58 @@
+import os
+import shutil
+import subprocess as sp
+
+import pytest
+
+from lib.jvm_runner import JvmRunner
+from utils.data_read_utils import get_test_info
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+JUNIT_JAR = os.path.join(
+    os.environ.get("D4J_HOME", os.path.expanduser("~/.d4j_src/defects4j")),
+    "framework/projects/lib/junit-4.12-hamcrest-1.3.jar"
+)
+
+FAILING_TEST = """
+package org.example;
+
+import static org.junit.Assert.assertEquals;
+import org.junit.Test;
+
+public class FooTest {
+    @Test
+    public void testFails() {
+        assertEquals("expected and actual values of the test", 1, 2);
+    }
+}
+"""
+
+
+@pytest.mark.skipif(shutil.which("javac") is None or not os.path.exists(JUNIT_JAR), reason="needs javac and the JUnit jar of defects4j")
+def test_one_shot_and_server_traces_agree(tmp_path):
+    runner_dir, tests_dir = tmp_path / "runner", tmp_path / "tests"
+    src_file = tmp_path / "org/example/FooTest.java"
+    src_file.parent.mkdir(parents=True)
+    src_file.write_text(FAILING_TEST)
+    sp.check_call(["javac", "-cp", JUNIT_JAR, "-d", str(runner_dir), os.path.join(SCRIPTS_DIR, "OutcomeRunner.java")])
+    sp.check_call(["javac", "-cp", JUNIT_JAR, "-d", str(tests_dir), str(src_file)])
+    tests_file = tmp_path / "relevant_tests.txt"
+    tests_file.write_text("fail,org.example.FooTest#testFails\n")
+
+    # baseline outcomes: one-shot mode (3_execute_outcomes.sh)
+    baseline_csv = tmp_path / "baseline.csv"
+    sp.check_call(["java", "-cp", f"{runner_dir}:{tests_dir}:{JUNIT_JAR}", "OutcomeRunner", str(tests_file), str(baseline_csv)])
+
+    # mutants: server mode (3_start_outcome_server.sh)
+    mutant_csv = tmp_path / "mutant.csv"
+    runner = JvmRunner(f"java -cp {runner_dir}:{JUNIT_JAR} OutcomeRunner --server {tests_dir}", core=0)
+    try:
+        assert runner.run(str(tests_file), str(mutant_csv), timeout=60)
+    finally:
+        runner.close()
+
+    baseline, _ = get_test_info(str(baseline_csv))
+    mutant, _ = get_test_info(str(mutant_csv))
+    assert baseline[0]["result"] == mutant[0]["result"] == 1
+    assert "FooTest.testFails" in baseline[0]["stacktrace"]
+    assert baseline[0]["stacktrace"] == mutant[0]["stacktrace"], "The stacktrace of an unchanged test should not depend on the runner mode."
@@ -0,0 +1,33 @@
+from lib.retry_tracker import *
+
+
+def test_retry_on_another_server():
+    retries = RetryTracker(["a", "b"], max_retries=1)
+    retries.start("1", "a")
+    retries.start("2", "b")
+
+    assert retries.finish("1", "a", "ssh"), "A transient failure should be retried."
+    assert not retries.finish("2", "b", "compile"), "A compile failure should not be retried."
+    assert retries.get_retry("a") is None, "A bug is not retried on the server where it failed."
+    assert retries.get_retry("b") == "1"
+
+    retries.start("1", "b")
+    assert not retries.finish("1", "b", "oom"), "A bug is retried at most max_retries times."
+    assert not retries.has_work()
+
+    report = retries.get_report()
+    assert report["1"]["status"] == "failed" and report["1"]["failure"] == "oom"
+    assert [attempt["server"] for attempt in report["1"]["attempts"]] == ["a", "b"]
+    assert sorted(retries.get_failed()) == ["1", "2"]
+
+
+def test_duplicate_decides_status():
+    retries = RetryTracker(["a", "b"], max_retries=2)
+    retries.start("1", "a")
+    retries.start("1", "b")
+
+    assert not retries.finish("1", "a", "timeout"), "A failure is not retried while a duplicate is running."
+    assert retries.has_work()
+    retries.finish("1", "b")
+    assert retries.get_report()["1"]["status"] == "done"
+    assert retries.get_report()["1"]["failure"] is None
@@ -0,0 +1,43 @@
+from utils.sampling_utils import *
+
+
+def get_mock_data():
+    # line 0 is executed only by the failing test, line 2 by every test
+    relevant_lines = {
+        0: {"className": "org.foo.Bar", "methodName": "a()", "lineNum": 10},
+        4: {"className": "org.foo.Bar", "methodName": "a()", "lineNum": 11},
+        9: {"className": "org.foo.Bar", "methodName": "b()", "lineNum": 30},
+    }
+    relevant_tests = {
+        0: {"result": 1, "relCovBitVal": int("101", 2)},
+        1: {"result": 0, "relCovBitVal": int("011", 2)},
+        2: {"result": 0, "relCovBitVal": int("011", 2)},
+    }
+    mutantIdx2mutantInfo = {}
+    for mutantIdx in range(20):
+        lineNum = [10, 11, 30][mutantIdx % 3]
+        mutantIdx2mutantInfo[mutantIdx] = {"className": "org.foo.Bar", "lineNumber": lineNum}
+    return relevant_lines, relevant_tests, mutantIdx2mutantInfo
+
+
+def test_select_target_lines():
+    relevant_lines, relevant_tests, _ = get_mock_data()
+    lineIdx2lineData, tcIdx2tcInfo = get_baseline_lineIdx2lineData(relevant_tests, relevant_lines)
+
+    selected_lineIdx = select_target_lines(lineIdx2lineData, tcIdx2tcInfo, "ochiai", 0.34)
+
+    assert [lineIdx for lineIdx, rank in selected_lineIdx] == [0], f"Unexpected selection: {selected_lineIdx}"
+
+
+def test_sample_mutants_is_reproducible():
+    relevant_lines, relevant_tests, mutantIdx2mutantInfo = get_mock_data()
+    lineIdx2lineData, tcIdx2tcInfo = get_baseline_lineIdx2lineData(relevant_tests, relevant_lines)
+    selected_lineIdx = select_target_lines(lineIdx2lineData, tcIdx2tcInfo, "ochiai", 1.0)
+
+    sampled, reserve = sample_mutants(mutantIdx2mutantInfo, lineIdx2lineData, selected_lineIdx, 2, 1, seed=7)
+    sampled_again, reserve_again = sample_mutants(mutantIdx2mutantInfo, lineIdx2lineData, selected_lineIdx, 2, 1, seed=7)
+
+    assert sampled == sampled_again and reserve == reserve_again, "Sampling should be reproducible with the same seed."
+    assert len(sampled) == 6, f"Expected 2 mutants for each of the 3 lines, got {len(sampled)}"
+    assert len(reserve) == 3, f"Expected 1 reserve mutant for each of the 3 lines, got {len(reserve)}"
+    assert not set(sampled) & set(reserve), "Reserve mutants should not overlap with sampled mutants."
@@ -0,0 +1,93 @@
+from lib.saver_engine import *
+
+
+def write_tests_csv(result_dir, work_name, rows):
+    txt_dir = result_dir / f"coverage_results/{work_name}/sfl/txt"
+    txt_dir.mkdir(parents=True)
+    with open(txt_dir / "tests.csv", 'w') as f:
+        f.write("name,outcome,runtime,stacktrace\n")
+        for row in rows:
+            f.write(",".join(row) + "\n")
+
+
+def make_coverage_free_saver(result_dir):
+    saver = SaverEngine.__new__(SaverEngine)
+    saver.PID, saver.BID, saver.EL = "Lang", "1", "test"
+    saver.RESULT_DIR = str(result_dir)
+    saver.COVERAGE_FREE = True
+    saver.tcName2tcIdx = {"org.apache.FooTest#testA": 0, "org.apache.FooTest#testB": 1}
+    return saver
+
+
+def test_coverage_free_mutant_transitions(tmp_path):
+    failure = "java.lang.AssertionError: expected 1 at org.apache.FooTest.testB(FooTest.java:10)"
+    write_tests_csv(tmp_path, "mutant_1", [
+        ("org.apache.FooTest#testA", "FAIL", "1000000", failure),
+        ("org.apache.FooTest#testB", "PASS", "1000000", ""),
+    ])
+    saver = make_coverage_free_saver(tmp_path)
+
+    # a coverage-free mutant has no spectra.csv or matrix.txt
+    results = saver.get_results("mutant_1")
+    assert len(results["tcIdx2tcInfo"]) == 2, "The outcomes of a coverage-free mutant should be read from tests.csv only."
+
+    relevant_tests = {
+        0: {"className": "org.apache.FooTest", "methodName": "testA", "result": 0, "exception_type": "None", "exception_msg": "None", "stacktrace": "None", "covBitVal": 0},
+        1: {"className": "org.apache.FooTest", "methodName": "testB", "result": 1, "exception_type": "java.lang.AssertionError", "exception_msg": "expected 1", "stacktrace": "at org.apache.FooTest.testB(FooTest.java:10)", "covBitVal": 0},
+    }
+    baseline_outcomes = {
+        "org.apache.FooTest#testA": {"exception_type": "None", "exception_msg": "None", "stacktrace": "None"},
+        "org.apache.FooTest#testB": {"exception_type": "java.lang.AssertionError", "exception_msg": "expected 1", "stacktrace": "at org.apache.FooTest.testB(FooTest.java:10)"},
+    }
+    transitions = saver.get_mutant_transitions(1, "mutant_1", relevant_tests, 10, baseline_outcomes)
+
+    assert transitions is not None, "The results of a coverage-free mutant should be readable."
+    assert transitions["result_transition"] == "11", "Both tests changed their result on the mutant."
+    assert transitions["p2f_cov_sim"] == [COV_SIM_SENTINEL] and transitions["f2p_cov_sim"] == [COV_SIM_SENTINEL]
+
+
+def test_equivalent_transitions_coverage_free(tmp_path):
+    relevant_tests = {0: {"result": 1}, 1: {"result": 0}}
+    saver = make_coverage_free_saver(tmp_path)
+    transitions = saver.get_equivalent_transitions(relevant_tests)
+    assert transitions["f2f_cov_sim"] == [COV_SIM_SENTINEL] and transitions["p2p_cov_sim"] == [COV_SIM_SENTINEL], \
+        "Equivalent mutants should not get coverage similarity in coverage-free mode."
+
+    saver.COVERAGE_FREE = False
+    transitions = saver.get_equivalent_transitions(relevant_tests)
+    assert transitions["f2f_cov_sim"] == [1.0] and transitions["p2p_cov_sim"] == [1.0]
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = []
+
+    def insert(self, table_name, columns, values):
+        self.rows.append(values)
+
+
+def test_batch_and_streamed_mutation_indices(tmp_path):
+    transitions = {
+        "result_transition": "0", "exception_type_transition": "0", "exception_msg_transition": "0", "stacktrace_transition": "0",
+        "f2p_cov_sim": [], "p2f_cov_sim": [], "f2f_cov_sim": [], "p2p_cov_sim": [], "status": "done"
+    }
+    # mutants in the order the result directories were walked
+    mutantIdx2mutantInfo = {
+        mutantIdx: {"className": f"Foo{mutantIdx}", "methodName": "bar", "lineNumber": 1, "mutator": "M"}
+        for mutantIdx in [12, 3, 7]
+    }
+
+    saver = make_coverage_free_saver(tmp_path)
+    saver.fault_idx = 1
+    saver.DB = FakeDB()
+    saver.save_mutation_info({mutantIdx: {**info, **transitions} for mutantIdx, info in mutantIdx2mutantInfo.items()})
+    batch = {(row[0], row[1]): row[2] for row in saver.DB.rows}
+
+    saver.stream_batch = []
+    saver.set_stream_mutants(mutantIdx2mutantInfo)
+    for mutantIdx in [7, 12, 3]:
+        saver.add_stream_row(mutantIdx, transitions)
+    streamed = {(row[0], row[1]): row[2] for row in saver.stream_batch}
+
+    assert batch == streamed, f"Batch {batch} and streamed {streamed} saving should number the mutants the same way."
+    assert batch[(1, 0)] == "Foo3", "Mutants should be numbered in the order of their indices."
@@ -0,0 +1,40 @@
+from lib.server_health import *
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_drain_and_readmit():
+    clock = FakeClock()
+    healthy = {"free_disk_gb": 100.0, "load_per_core": 0.5, "mem_available_gb": 32.0, "java": True}
+    probes = {"a": [healthy, dict(healthy, free_disk_gb=1.0), healthy]}
+    num_probes = []
+
+    def probe(server):
+        num_probes.append(server)
+        return probes[server].pop(0)
+
+    health = ServerHealth(probe, 50, 2.0, 16, probe_interval_sec=100, clock=clock)
+    assert health.check("a"), "A healthy server should be admitted."
+    assert health.check("a") and len(num_probes) == 1, "A recent probe should be reused."
+
+    clock.now = 150.0
+    assert not health.check("a"), "A server with a full disk should be drained."
+    assert health.check("a", force=True), "A server should be re-admitted once it recovers."
+    assert health.get_report()["a"]["num_drains"] == 1
+
+
+def test_check_save():
+    busy = {"free_disk_gb": 100.0, "load_per_core": 4.0, "mem_available_gb": 1.0, "java": True}
+    probes = {"a": [busy, dict(busy, free_disk_gb=1.0), None]}
+
+    health = ServerHealth(lambda server: probes[server].pop(0), 50, 2.0, 16)
+    assert health.check_save("a"), "The load and memory of a busy server should not block saving."
+    assert not health.check("a"), "A busy server should still be drained from new bugs."
+    assert not health.check_save("a"), "A server with a full disk should not save results."
+    assert not health.check_save("a"), "An unreachable server should not save results."
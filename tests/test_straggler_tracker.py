@@ -0,0 +1,69 @@
+from lib.straggler_tracker import *
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_find_straggler():
+    clock = FakeClock()
+    tracker = StragglerTracker(straggler_factor=1.5, min_elapsed_sec=10, max_duplicates=2, clock=clock)
+    tracker.start("1", "a/slot0", "a", cost=2.0)
+    tracker.start("2", "b/slot0", "b", cost=1.0)
+    tracker.start("3", "c/slot0", "c", cost=1.0)
+
+    clock.now = 100.0
+    tracker.finish("2", "b/slot0", True)
+    assert tracker.find_straggler("b") is None, "Bugs within their expected time are not stragglers."
+
+    clock.now = 350.0
+    # bug 3 (350s elapsed, 100s expected) is a worse straggler than bug 1 (350s elapsed, 200s expected)
+    assert tracker.find_straggler("c") == "1", "A bug is not duplicated on its own server."
+    assert tracker.find_straggler("b") == "3", "Bug 3 should be a straggler."
+    assert tracker.find_straggler("b") is None, "A straggler is duplicated once."
+    assert tracker.get_report()["3"]["expected_sec"] == 100.0
+
+
+def test_first_attempt_wins():
+    clock = FakeClock()
+    tracker = StragglerTracker(clock=clock)
+    tracker.start("1", "a/slot0", "a")
+    tracker.start("1", "b/slot0", "b")
+
+    won, losers = tracker.claim_win("1", "b/slot0")
+    assert won and losers == [("a/slot0", "a")], f"Unexpected losers: {losers}"
+    assert tracker.is_cancelled("1", "a/slot0")
+    assert not tracker.is_cancelled("1", "b/slot0")
+
+    won, losers = tracker.claim_win("1", "a/slot0")
+    assert not won and losers == [], "The second attempt should lose."
+
+    tracker.finish("1", "b/slot0", True)
+    tracker.finish("1", "a/slot0", False)
+    assert not tracker.has_running()
+
+
+def test_duplicates_are_capped():
+    clock = FakeClock()
+    tracker = StragglerTracker(straggler_factor=1.5, min_elapsed_sec=10, max_duplicates=1, clock=clock)
+    for bid, server in [("1", "a"), ("2", "b"), ("3", "c")]:
+        tracker.start(bid, f"{server}/slot0", server)
+    clock.now = 100.0
+    tracker.finish("1", "a/slot0", True)
+
+    clock.now = 200.0
+    assert tracker.find_straggler("a") in ["2", "3"]
+    assert tracker.find_straggler("a") is None, "At most max_duplicates duplicates should run at once."
+
+    duplicated = [bid for bid in ["2", "3"] if bid in tracker.get_report()][0]
+    tracker.start(duplicated, "a/slot0", "a")
+    clock.now = 300.0
+    assert tracker.find_expired_duplicates() == [], "A duplicate within 1.5x the expected time keeps running."
+    clock.now = 400.0
+    assert tracker.find_expired_duplicates() == [(duplicated, "a/slot0", "a")], "A duplicate past 1.5x the expected time should be cancelled."
+    assert tracker.is_cancelled(duplicated, "a/slot0") and not tracker.is_cancelled(duplicated, f"{'b' if duplicated == '2' else 'c'}/slot0")
+    assert tracker.find_expired_duplicates() == [], "A duplicate is cancelled once."
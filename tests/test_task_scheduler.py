@@ -0,0 +1,206 @@
+import threading
+
+from lib.task_scheduler import *
+from utils.scheduling_utils import estimate_mutant_costs, estimate_bug_costs, compute_server_slots, get_shard, partition_cores, format_cpu_list
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_to_completion(scheduler, clock, costs):
+    """Run the workers round-robin on a virtual clock, each task takes costs[task_id] seconds."""
+    busy_until = {}
+    while True:
+        for worker in scheduler.workers:
+            if worker in busy_until:
+                continue
+            task = scheduler.get_task(worker)
+            if task is not None:
+                busy_until[worker] = (clock.now + costs[task[0]], task[0])
+        if not busy_until:
+            break
+        worker, (finish_time, task_id) = min(busy_until.items(), key=lambda item: item[1][0])
+        clock.now = finish_time
+        scheduler.task_done(worker, task_id)
+        del busy_until[worker]
+
+
+def test_lpt_reduces_makespan():
+    costs = {0: 1, 1: 1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 6}
+    makespans = {}
+    for policy in SCHEDULING_POLICIES:
+        clock = FakeClock()
+        scheduler = TaskScheduler(range(2), policy=policy, clock=clock)
+        for task_id, cost in costs.items():
+            scheduler.submit(task_id, cost=cost)
+        scheduler.start()
+        run_to_completion(scheduler, clock, costs)
+        makespans[policy] = scheduler.get_report()["makespan_sec"]
+
+    assert makespans["fifo"] == 9, f"Unexpected fifo makespan: {makespans['fifo']}"
+    assert makespans["lpt"] == 6, f"Unexpected lpt makespan: {makespans['lpt']}"
+
+
+def test_work_stealing_takes_remaining_work():
+    clock = FakeClock()
+    scheduler = TaskScheduler(["a", "b"], policy="lpt", work_stealing=True, clock=clock)
+    for task_id, cost in [(1, 5), (2, 5), (3, 1), (4, 1)]:
+        scheduler.submit(task_id, cost=cost)
+    scheduler.start()
+
+    # worker a is still busy with task 1 (its cost was underestimated)
+    assert scheduler.get_task("a") == (1, None)
+    assert scheduler.get_task("b") == (2, None)
+    assert scheduler.get_task("b") == (4, None)
+    assert scheduler.get_task("b") == (3, None), "Idle worker should steal from the loaded worker."
+    assert scheduler.get_task("b") is None
+    assert scheduler.get_task("a") is None
+    assert scheduler.get_report()["workers"]["b"]["num_stolen"] == 1
+
+
+def test_report_utilization():
+    clock = FakeClock()
+    scheduler = TaskScheduler(range(2), clock=clock)
+    scheduler.submit(1)
+    scheduler.start()
+    scheduler.get_task(0)
+    clock.now = 4.0
+    scheduler.task_done(0, 1)
+
+    report = scheduler.get_report()
+    assert report["makespan_sec"] == 4.0
+    assert report["workers"]["1"]["idle_sec"] == 4.0, "Worker without tasks should be idle the whole run."
+    assert report["utilization"] == 0.5
+
+
+def test_scheduler_is_thread_safe():
+    scheduler = TaskScheduler(range(4), policy="lpt", work_stealing=True)
+    for task_id in range(200):
+        scheduler.submit(task_id, cost=task_id % 7)
+    scheduler.start()
+
+    done = []
+    def worker(core):
+        while True:
+            task = scheduler.get_task(core)
+            if task is None:
+                break
+            done.append(task[0])
+            scheduler.task_done(core, task[0])
+
+    threads = [threading.Thread(target=worker, args=(core,)) for core in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(done) == list(range(200)), "Every task should be executed exactly once."
+
+
+def test_estimate_mutant_costs():
+    baseline_results = {
+        "lineIdx2lineInfo": {
+            0: {"className": "Foo", "lineNum": 10},
+            1: {"className": "Foo", "lineNum": 20},
+        }
+    }
+    relevant_tests = {
+        0: {"covBitVal": 0b11, "duration_ms": 100},
+        1: {"covBitVal": 0b10, "duration_ms": 50},
+    }
+    mutantIdx2mutantInfo = {
+        1: {"className": "Foo", "lineNumber": 10},
+        2: {"className": "Foo", "lineNumber": 20},
+        3: {"className": "Bar", "lineNumber": 5},
+    }
+    costs = estimate_mutant_costs(mutantIdx2mutantInfo, baseline_results, relevant_tests, overhead_ms=5)
+    assert costs == {1: 155, 2: 105, 3: 5}, f"Unexpected costs: {costs}"
+
+
+def test_unknown_policy():
+    try:
+        TaskScheduler(range(2), policy="random")
+        assert False, "Unknown policies should be rejected."
+    except ValueError:
+        pass
+
+
+def test_lpt_weights_worker_speed():
+    clock = FakeClock()
+    scheduler = TaskScheduler(["slow", "fast"], policy="lpt", worker_speeds={"fast": 2.0}, clock=clock)
+    for task_id, cost in [(1, 4), (2, 2), (3, 2)]:
+        scheduler.submit(task_id, cost=cost)
+    scheduler.start()
+
+    assert scheduler.get_task("fast") == (1, None), "The longest task should go to the fast worker."
+    report = scheduler.get_report()
+    assert report["projected_makespan"] == 3.0, f"Unexpected projected makespan: {report['projected_makespan']}"
+
+
+def test_report_lists_finished_tasks():
+    clock = FakeClock()
+    scheduler = TaskScheduler(["a"], clock=clock)
+    scheduler.submit("7", cost=3.0)
+    scheduler.start()
+    scheduler.get_task("a")
+    clock.now = 5.0
+    scheduler.task_done("a", "7")
+
+    tasks = scheduler.get_report(include_tasks=True)["tasks"]
+    assert tasks == [{"task_id": "7", "worker": "a", "cost": 3.0, "start_sec": 0.0, "duration_sec": 5.0}], f"Unexpected tasks: {tasks}"
+    assert "tasks" not in scheduler.get_report()
+
+
+def test_estimate_bug_costs():
+    measurement = {
+        "instr_duration_sec": 1.0, "exec_duration_sec": 2.0, "process_duration_sec": 1.0,
+        "relevant_test_total_time_ms": 1000.0, "num_mutants": 10
+    }
+    measurements = [
+        {"bid": 1, **measurement},
+        {"bid": 2, **measurement, "num_mutants": 30},
+        {"bid": 3, **measurement, "num_mutants": 50},
+    ]
+    bid2cost, modeled_bids = estimate_bug_costs(["1", "2", "3", "4"], measurements)
+    assert bid2cost["1"] == 4 + 10 * 3, f"Unexpected cost of bug 1: {bid2cost['1']}"
+    assert modeled_bids == ["4"], f"Unexpected modeled bugs: {modeled_bids}"
+    assert bid2cost["4"] == bid2cost["2"], "Bugs without a measurement should get the median cost."
+
+    bid2cost, _ = estimate_bug_costs(["1"], [{"bid": 1, **measurement, "num_executed_mutants": 4}])
+    assert bid2cost["1"] == 4 + 4 * 3, "The mutants left after pruning should be used when they were measured."
+
+    bid2cost, modeled_bids = estimate_bug_costs(["1", "2"], [])
+    assert bid2cost == {"1": 1.0, "2": 1.0}, "Without measurements all bugs should cost the same."
+
+
+def test_compute_server_slots():
+    capacity = {"cores": 64, "memory_gb": 128, "free_disk_gb": 500}
+    assert compute_server_slots(capacity, parallel=16, bug_memory_gb=20, bug_disk_gb=10) == 4, "Cores should limit the slots."
+    assert compute_server_slots(capacity, parallel=8, bug_memory_gb=20, bug_disk_gb=10) == 6, "Memory should limit the slots."
+    assert compute_server_slots({**capacity, "free_disk_gb": 15}, parallel=8, bug_memory_gb=20, bug_disk_gb=10) == 1, "Disk should limit the slots."
+    assert compute_server_slots({"cores": 8}, parallel=16, bug_memory_gb=20, bug_disk_gb=10) == 1, "A server should have at least one slot."
+    assert compute_server_slots({**capacity, "slots": 2}, parallel=16, bug_memory_gb=20, bug_disk_gb=10) == 2, "Explicit slots should be used as is."
+    assert compute_server_slots({}, parallel=16, bug_memory_gb=20, bug_disk_gb=10) == 1
+
+
+def test_get_shard():
+    mutantIdxs = [9, 1, 5, 3, 7, 2, 8]
+    shards = [get_shard(mutantIdxs, shard_index, 3) for shard_index in range(3)]
+    assert shards == [[1, 2], [3, 5], [7, 8, 9]], f"Unexpected shards: {shards}"
+    assert get_shard([], 0, 2) == []
+    try:
+        get_shard(mutantIdxs, 3, 3)
+        assert False, "Out-of-range shards should be rejected."
+    except ValueError:
+        pass
+
+
+def test_partition_cores():
+    slots = partition_cores(num_cores=32, num_slots=3, parallel=10)
+    assert slots == [list(range(0, 10)), list(range(10, 20)), list(range(20, 30))], "Slots should get disjoint cores."
+    assert partition_cores(num_cores=8, num_slots=2, parallel=10) == [[0, 1, 2, 3], [4, 5, 6, 7]], "Small machines split their cores evenly."
+    assert format_cpu_list([0, 1, 2, 5, 7, 8]) == "0-2,5,7-8"
@@ -0,0 +1,67 @@
+import json
+
+from lib.telemetry import *
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def read_events(jsonl_file):
+    with open(jsonl_file) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_stage_events(tmp_path):
+    clock = FakeClock()
+    jsonl_file = str(tmp_path / "progress.jsonl")
+    telemetry = Telemetry("el", "Lang", 1, jsonl_file=jsonl_file, server="a", clock=clock)
+
+    with telemetry.stage("baseline"):
+        clock.now = 12.0
+
+    events = read_events(jsonl_file)
+    assert [event["event"] for event in events] == ["stage_started", "stage_finished"]
+    assert events[1]["data"] == {"duration_sec": 12.0, "success": True}, "The duration of the stage should be recorded."
+    assert events[1]["pid"] == "Lang" and events[1]["bid"] == "1" and events[1]["server"] == "a"
+
+
+def test_failed_stage(tmp_path):
+    jsonl_file = str(tmp_path / "progress.jsonl")
+    telemetry = Telemetry("el", "Lang", 1, jsonl_file=jsonl_file, clock=FakeClock())
+
+    try:
+        with telemetry.stage("mutants"):
+            raise RuntimeError("failed")
+    except RuntimeError:
+        pass
+    assert read_events(jsonl_file)[-1]["data"]["success"] is False, "A stage that raised should not be successful."
+
+
+def test_progress_is_rate_limited(tmp_path):
+    clock = FakeClock()
+    jsonl_file = str(tmp_path / "progress.jsonl")
+    telemetry = Telemetry("el", "Lang", 1, jsonl_file=jsonl_file, progress_interval_sec=30, clock=clock)
+
+    telemetry.progress("mutants", 1, 10)
+    clock.now = 10.0
+    telemetry.progress("mutants", 2, 10)
+    clock.now = 31.0
+    telemetry.progress("mutants", 3, 10)
+    telemetry.progress("mutants", 4, 10, force=True)
+
+    done = [event["data"]["done"] for event in read_events(jsonl_file)]
+    assert done == [1, 3, 4], "Progress should be emitted at most every interval unless forced."
+
+
+def test_write_failure_does_not_raise(tmp_path):
+    class BrokenDB:
+        def insert(self, *args):
+            raise RuntimeError("connection lost")
+
+    telemetry = Telemetry("el", "Lang", 1, jsonl_file=str(tmp_path / "missing" / "progress.jsonl"), db=BrokenDB(), clock=FakeClock())
+    telemetry.emit("bug_started")
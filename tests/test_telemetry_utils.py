@@ -0,0 +1,48 @@
+from utils.telemetry_utils import *
+
+
+def event(ts, name, bid=None, server="a", stage=None, **data):
+    return {"ts": ts, "pid": "Lang", "bid": bid, "server": server, "event": name, "stage": stage, "data": data}
+
+
+def test_summarize_progress():
+    events = [
+        event(0, "run_started", num_bugs=4),
+        event(0, "bug_started", "1"),
+        event(0, "bug_started", "2", server="b"),
+        event(0, "stage_started", "1", stage="mutants"),
+        event(1800, "bug_finished", "1", success=True),
+        event(1800, "stage_finished", "1", stage="mutants", duration_sec=1800.0, success=True),
+        event(1800, "bug_started", "3"),
+        event(600, "progress", "2", server="b", stage="mutants", done=10, total=100),
+        event(1200, "progress", "2", server="b", stage="mutants", done=70, total=100),
+    ]
+    summary = summarize_progress(events, now=3600)
+
+    assert summary["num_bugs"] == 4
+    assert summary["num_finished"] == 1 and summary["num_failed"] == 0 and summary["num_running"] == 2
+    assert summary["bugs_per_hour"] == 1.0, "One bug finished in one hour."
+    assert summary["eta_sec"] == 3 * 3600, "Three bugs remain at one bug per hour."
+    assert summary["server2mutants_per_sec"] == {"b": 70 / 600}, "Mutants per second should count the mutants done since the first event."
+    assert summary["stage2mean_sec"] == {"mutants": 1800.0}
+    assert [bug["bid"] for bug in summary["slowest"]] == ["2", "3"], "The longest running bug should be listed first."
+    assert summary["slowest"][0]["done"] == 70 and summary["slowest"][0]["total"] == 100
+
+
+def test_failed_and_empty():
+    events = [event(0, "bug_started", "1"), event(10, "bug_finished", "1", success=False)]
+    summary = summarize_progress(events, now=20)
+    assert summary["num_failed"] == 1 and summary["eta_sec"] is None, "Without finished bugs the ETA is unknown."
+    assert summarize_progress([], now=0)["num_bugs"] == 0
+    assert "unknown" in format_status(summary)
+
+
+def test_num_bugs_of_reruns():
+    events = [
+        event(0, "run_started", num_bugs=3, bids=["1", "2", "3"]),
+        event(100, "run_started", num_bugs=2, bids=["2", "3"]),
+        dict(event(0, "run_started", num_bugs=5), pid="Math"),
+        dict(event(100, "run_started", num_bugs=2), pid="Math"),
+    ]
+    summary = summarize_progress(events, now=200)
+    assert summary["num_bugs"] == 3 + 2, "Re-runs should not count their bugs again."
@@ -0,0 +1,63 @@
+import threading
+
+from lib.tracer import *
+
+
+def test_disabled_spans_are_not_recorded(tmp_path):
+    stop_tracing()
+    with span("baseline") as baseline_span:
+        pass
+    assert baseline_span.duration_sec is not None, "The duration should be measured without a tracer."
+
+    @traced()
+    def add(a, b):
+        return a + b
+    assert add(1, 2) == 3
+
+
+def test_spans_of_threads(tmp_path):
+    trace_file = str(tmp_path / "trace.json")
+    start_tracing(trace_file, "mutation-testing Lang-1")
+
+    @traced(category="subprocess")
+    def instrument():
+        pass
+
+    def worker(core):
+        name_thread(f"core{core}")
+        with span("mutant", mutant=core):
+            instrument()
+
+    threads = [threading.Thread(target=worker, args=(core,)) for core in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        with span("mutants"):
+            raise RuntimeError("failed")
+    except RuntimeError:
+        pass
+    stop_tracing()
+
+    events = read_trace_events(trace_file)
+    spans = [event for event in events if event["ph"] == "X"]
+    assert sorted(event["name"] for event in spans) == ["instrument", "instrument", "mutant", "mutant", "mutants"]
+    assert len({event["tid"] for event in spans if event["name"] == "mutant"}) == 2, "Each thread should have its own lane."
+    thread_names = {event["args"]["name"] for event in events if event["name"] == "thread_name"}
+    assert {"core0", "core1"} <= thread_names
+    assert [event for event in spans if event["name"] == "mutants"][0]["args"]["error"] == "RuntimeError"
+
+
+def test_processes_append_to_one_trace(tmp_path):
+    trace_file = str(tmp_path / "trace.json")
+    for process_name in ["mutation-testing", "saver"]:
+        start_tracing(trace_file, process_name)
+        with span("stage"):
+            pass
+        stop_tracing()
+
+    events = read_trace_events(trace_file)
+    process_names = [event["args"]["name"] for event in events if event["name"] == "process_name"]
+    assert process_names == ["mutation-testing", "saver"], "Both processes should append to the trace."
+    assert len([event for event in events if event["ph"] == "X"]) == 2
@@ -0,0 +1,23 @@
+from utils.workspace_utils import *
+
+
+def test_get_directory_size(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "Foo.class").write_bytes(b"x" * 10)
+    (tmp_path / "Bar.class").write_bytes(b"x" * 5)
+    assert get_directory_size(str(tmp_path)) == 15
+
+
+def test_assign_core_workspaces():
+    assert assign_core_workspaces(4, 100, 1000, 10000) == [0, 1, 2, 3]
+    assert assign_core_workspaces(4, 100, 250, 10000) == [0, 1], "Cores beyond the cap should fall back to disk."
+    assert assign_core_workspaces(4, 100, 1000, 150) == [0], "Cores beyond the free space should fall back to disk."
+    assert assign_core_workspaces(4, 100, 0, 10000) == [], "A zero cap keeps every core on disk."
+
+
+def test_workspace_has_room(tmp_path):
+    (tmp_path / "core0").mkdir()
+    (tmp_path / "core0" / "gzoltar.ser").write_bytes(b"x" * 200)
+    assert workspace_has_room(str(tmp_path), 100, 200), "A workspace filled up to its cap should have room."
+    assert not workspace_has_room(str(tmp_path), 100, 150), "A workspace past its cap should have no room."
+    assert not workspace_has_room(str(tmp_path), 2 ** 62, 2 ** 63), "A full file system should have no room."
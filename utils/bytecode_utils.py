@@ -0,0 +1,170 @@
+"""
+Bytecode utility functions for deduplicating PIT mutants.
+    - hash (optionally normalized) class files
+    - group mutants with identical bytecode
+"""
+
+import hashlib
+import os
+import struct
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+# attributes that only carry debug information and do not change the behavior of a class
+DEBUG_ATTRIBUTES = [
+    "SourceFile", "SourceDebugExtension",
+    "LineNumberTable", "LocalVariableTable", "LocalVariableTypeTable"
+]
+
+# constant pool tag -> size of the entry in bytes (without the tag)
+CONSTANT_POOL_SIZES = {
+    3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4,
+    12: 4, 15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2
+}
+
+
+class ClassReader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def read(self, size):
+        chunk = self.data[self.pos:self.pos + size]
+        if len(chunk) != size:
+            raise ValueError("Unexpected end of class file")
+        self.pos += size
+        return chunk
+
+    def u2(self):
+        return struct.unpack(">H", self.read(2))[0]
+
+    def u4(self):
+        return struct.unpack(">I", self.read(4))[0]
+
+
+def _read_constant_pool(reader):
+    utf8_entries = {}
+    cp_count = reader.u2()
+    idx = 1
+    while idx < cp_count:
+        tag = reader.read(1)[0]
+        if tag == 1:
+            length = reader.u2()
+            utf8_entries[idx] = reader.read(length).decode("utf-8", errors="replace")
+        elif tag in CONSTANT_POOL_SIZES:
+            reader.read(CONSTANT_POOL_SIZES[tag])
+        else:
+            raise ValueError(f"Unknown constant pool tag {tag}")
+        # long and double entries take two slots
+        idx += 2 if tag in (5, 6) else 1
+    return utf8_entries
+
+
+def _strip_attributes(reader, utf8_entries):
+    out = b""
+    kept = 0
+    for _ in range(reader.u2()):
+        name_idx = reader.u2()
+        info = reader.read(reader.u4())
+        name = utf8_entries.get(name_idx)
+        if name in DEBUG_ATTRIBUTES:
+            continue
+        if name == "Code":
+            info = _strip_code_attribute(info, utf8_entries)
+        out += struct.pack(">HI", name_idx, len(info)) + info
+        kept += 1
+    return struct.pack(">H", kept) + out
+
+
+def _strip_code_attribute(info, utf8_entries):
+    reader = ClassReader(info)
+    header = reader.read(4)  # max_stack, max_locals
+    code = reader.read(reader.u4())
+    exception_table_length = reader.u2()
+    exception_table = reader.read(exception_table_length * 8)
+    attributes = _strip_attributes(reader, utf8_entries)
+    return header + struct.pack(">I", len(code)) + code \
+        + struct.pack(">H", exception_table_length) + exception_table + attributes
+
+
+def normalize_class_bytes(data):
+    """
+    Remove debug attributes (source file, line numbers, local variable names) from a class file.
+    :param data: Bytes of the class file.
+    :return: Bytes of the class file without debug attributes.
+    """
+    reader = ClassReader(data)
+    header = reader.read(8)  # magic, minor, major
+    cp_start = reader.pos
+    utf8_entries = _read_constant_pool(reader)
+    out = header + data[cp_start:reader.pos]
+
+    out += reader.read(6)  # access_flags, this_class, super_class
+    interfaces_count = reader.u2()
+    out += struct.pack(">H", interfaces_count) + reader.read(interfaces_count * 2)
+
+    # fields and methods share the same layout
+    for _ in range(2):
+        members_count = reader.u2()
+        out += struct.pack(">H", members_count)
+        for _ in range(members_count):
+            out += reader.read(6)  # access_flags, name_index, descriptor_index
+            out += _strip_attributes(reader, utf8_entries)
+
+    out += _strip_attributes(reader, utf8_entries)
+    return out
+
+
+def hash_class_file(file_path, normalize=False):
+    """
+    Hash a class file.
+    :param file_path: Path to the class file.
+    :param normalize: Ignore debug attributes when True.
+    :return: Hex digest of the class file, None if the file cannot be read.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if normalize:
+            data = normalize_class_bytes(data)
+        return hashlib.sha256(data).hexdigest()
+    except Exception as e:
+        LOGGER.error(f"Failed to hash class file {file_path}: {e}")
+        return None
+
+
+def group_duplicate_mutants(mutantIdx2mutantInfo, original_classes_dir, normalize=False):
+    """
+    Group mutants with identical bytecode and find mutants identical to the original class.
+    :param mutantIdx2mutantInfo: Mapping of mutant indices to mutant information (with classFilePath).
+    :param original_classes_dir: Directory of the original compiled classes.
+    :param normalize: Ignore debug attributes when True.
+    :return: (duplicates, equivalent) where duplicates maps a duplicate mutant to the
+             representative mutant that is executed in its place, and equivalent lists
+             the mutants identical to the original class.
+    """
+    original_hashes = {}
+    hash2mutantIdx = {}
+    duplicates = {}
+    equivalent = []
+
+    for mutantIdx in sorted(mutantIdx2mutantInfo):
+        mutantInfo = mutantIdx2mutantInfo[mutantIdx]
+        mutant_hash = hash_class_file(mutantInfo["classFilePath"], normalize)
+        if mutant_hash is None:
+            continue
+
+        className = mutantInfo["className"]
+        if className not in original_hashes:
+            original_class_path = os.path.join(original_classes_dir, className.replace('.', '/') + ".class")
+            original_hashes[className] = hash_class_file(original_class_path, normalize)
+
+        if mutant_hash == original_hashes[className]:
+            equivalent.append(mutantIdx)
+        elif mutant_hash in hash2mutantIdx:
+            duplicates[mutantIdx] = hash2mutantIdx[mutant_hash]
+        else:
+            hash2mutantIdx[mutant_hash] = mutantIdx
+
+    return duplicates, equivalent
@@ -5,6 +5,8 @@ File utility functions for executing commands on remote servers.
 import subprocess as sp
 import logging
 
+from utils.fanout_utils import run_fan_out
+
 LOGGER = logging.getLogger(__name__)
 
 def execute_command(command, server):
@@ -14,10 +16,68 @@ def execute_command(command, server):
     :param server: Remote server object.
     :return: True if command execution is successful, False otherwise.
     """
-    try:
-        sp.check_call(["ssh", f"{server}", command], stderr=sp.DEVNULL, stdout=sp.DEVNULL)
+    exit_code = run_command(command, server)
+    if exit_code == 0:
         LOGGER.info(f"Command '{command}' executed successfully on server {server}.")
         return True
+    LOGGER.error(f"Failed to execute command '{command}' on server {server}: exit status {exit_code}")
+    return False
+
+def run_command(command, server):
+    """
+    Execute a command on the remote server.
+    :param command: Command to execute.
+    :param server: Remote server object.
+    :return: Exit status of the command (255 when ssh fails).
+    """
+    return run_fan_out([(server, command)])[0]["exit_code"]
+
+def read_remote_output(command, server):
+    """
+    Execute a command on the remote server and return its output.
+    :param command: Command to execute (e.g., tail of a log file).
+    :param server: Remote server object.
+    :return: Output of the command, None if it failed.
+    """
+    result = run_fan_out([(server, command)], tail_lines=None)[0]
+    if result["exit_code"] != 0:
+        LOGGER.debug(f"Failed to read the output of '{command}' on server {server}: exit status {result['exit_code']}")
+        return None
+    return "\n".join(result["output"])
+
+def execute_local_command(command):
+    """
+    Execute a command on this machine (e.g., a worker executing the steps of a bug).
+    :param command: Command to execute (shell syntax).
+    :return: True if command execution is successful, False otherwise.
+    """
+    exit_code = run_local_command(command)
+    if exit_code == 0:
+        LOGGER.info(f"Command '{command}' executed successfully.")
+        return True
+    LOGGER.error(f"Failed to execute command '{command}': exit status {exit_code}")
+    return False
+
+def run_local_command(command):
+    """
+    Execute a command on this machine.
+    :param command: Command to execute (shell syntax).
+    :return: Exit status of the command.
+    """
+    try:
+        return sp.call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL)
+    except Exception as e:
+        LOGGER.error(f"Failed to run command '{command}': {e}")
+        return 1
+
+def read_local_output(command):
+    """
+    Execute a command on this machine and return its output.
+    :param command: Command to execute (shell syntax).
+    :return: Output of the command, None if it failed.
+    """
+    try:
+        return sp.check_output(command, shell=True, stderr=sp.STDOUT).decode("utf-8", errors="replace")
     except Exception as e:
-        LOGGER.error(f"Failed to execute command '{command}' on server {server}: {e}")
-        return False
\ No newline at end of file
+        LOGGER.debug(f"Failed to read the output of '{command}': {e}")
+        return None
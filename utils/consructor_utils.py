@@ -9,6 +9,8 @@ import json
 import random
 import time
 
+from lib.tracer import span
+
 LOGGER = logging.getLogger(__name__)
 
 def get_bid2fid(DB, PID, EL):
@@ -305,19 +307,19 @@ def measure_scores(EXP_CONFIG, DB, FID, lineIdx2lineData, rid=None):
 
 
     # Stack Trace Relevance
-    st_start_time = time.time()
-    measure_ST_relevance(tcIdx2tcInfo, lineIdx2lineData)
-    st_time = time.time() - st_start_time
+    with span("measure_ST_relevance") as st_span:
+        measure_ST_relevance(tcIdx2tcInfo, lineIdx2lineData)
+    st_time = st_span.duration_sec
     LOGGER.debug(f"[rid{rid}-{FID}b] Stack Trace Relevance took {st_time:.2f} seconds.")
     # add_ST_rank(lineIdx2lineData)
 
     # SBFL
-    sbfl_start_time = time.time()
-    measure_spectrum(tcIdx2tcInfo, lineIdx2lineData)
-    measure_sbfl_susp_scores(lineIdx2lineData)
-    # Calculate ranks for SBFL formulas
-    add_sbfl_ranks(lineIdx2lineData)
-    sbfl_time = time.time() - sbfl_start_time
+    with span("sbfl") as sbfl_span:
+        measure_spectrum(tcIdx2tcInfo, lineIdx2lineData)
+        measure_sbfl_susp_scores(lineIdx2lineData)
+        # Calculate ranks for SBFL formulas
+        add_sbfl_ranks(lineIdx2lineData)
+    sbfl_time = sbfl_span.duration_sec
     LOGGER.debug(f"[rid{rid}-{FID}b] SBFL took {sbfl_time:.2f} seconds.")
     sorted_lineIdx = get_sorted_lineIdx(lineIdx2lineData, EXP_CONFIG["line_selection_formula"])
 
@@ -330,49 +332,48 @@ def measure_scores(EXP_CONFIG, DB, FID, lineIdx2lineData, rid=None):
         raise ValueError(f"No failing test cases found for fault index {FID}.")
     LOGGER.info(f"Total failing test cases: {total_failing_tcs}")
 
-    get_lineIdx2lineData_start_time = time.time()
-    lineIdx2mutation = get_lineIdx2mutation(DB, FID, lineIdx2lineData)
-    get_lineIdx2lineData_time = time.time() - get_lineIdx2lineData_start_time
+    with span("get_lineIdx2mutation") as get_lineIdx2mutation_span:
+        lineIdx2mutation = get_lineIdx2mutation(DB, FID, lineIdx2lineData)
+    get_lineIdx2lineData_time = get_lineIdx2mutation_span.duration_sec
     LOGGER.debug(f"[rid{rid}-{FID}b] get_lineIdx2lineData took {get_lineIdx2lineData_time:.2f} seconds.")
 
-    measure_transition_start_time = time.time()
-    measure_transition_counts(lineIdx2mutation, tcIdx2tcInfo, EXP_CONFIG["tcs_reduction"])
-    measure_transition_time = time.time() - measure_transition_start_time
+    with span("measure_transition_counts") as measure_transition_span:
+        measure_transition_counts(lineIdx2mutation, tcIdx2tcInfo, EXP_CONFIG["tcs_reduction"])
+    measure_transition_time = measure_transition_span.duration_sec
     LOGGER.debug(f"[rid{rid}-{FID}b] measure_transition_counts took {measure_transition_time:.2f} seconds.")
 
-    mbfl_start_time = time.time()
-    for line_cnt in EXP_CONFIG["target_lines"]:
-        target_line_perc = line_cnt / 100.0
-        selection_amount = int(len(sorted_lineIdx) * target_line_perc)
-        selected_lineIdx = sorted_lineIdx[:selection_amount]
-
-        LOGGER.info(f"Selected {len(selected_lineIdx)} lines for target line percentage {target_line_perc:.2%}.")
-
-        for mut_cnt in EXP_CONFIG["mutation_cnt"]:
-            first_key = next(iter(lineIdx2mutation))
-            if f"lineCnt{line_cnt}_mutCnt{mut_cnt}tcs{EXP_CONFIG['tcs_reduction']}_all_types_transition_final_metal_score_rank" in lineIdx2lineData[first_key]:
-                LOGGER.debug(f"Skipping line count {line_cnt} and mutation count {mut_cnt} as scores already calculated.")
-                continue
-
-            get_using_mutants_start_time = time.time()
-            using_mutants = get_using_mutants(lineIdx2mutation, selected_lineIdx, mut_cnt)
-            get_using_mutants_time = time.time() - get_using_mutants_start_time
-            LOGGER.debug(f"[rid{rid}-{FID}b] get_using_mutants took {get_using_mutants_time:.2f} seconds.")
-
-            get_overall_data_start_time = time.time()
-            overall_data = get_overall_data(using_mutants, total_failing_tcs, line_cnt, mut_cnt, EXP_CONFIG["tcs_reduction"])
-            get_overall_data_time = time.time() - get_overall_data_start_time
-            LOGGER.debug(f"[rid{rid}-{FID}b] get_overall_data took {get_overall_data_time:.2f} seconds.")
-
-            measure_mbfl_score_time = time.time()
-            measure_mbfl_susp_scores(
-                lineIdx2lineData, using_mutants, line_cnt, mut_cnt, EXP_CONFIG["tcs_reduction"], overall_data
-            )
-            measure_mbfl_score_time = time.time() - measure_mbfl_score_time
-            LOGGER.debug(f"[rid{rid}-{FID}b] measure_mbfl_susp_scores took {measure_mbfl_score_time:.2f} seconds.")
-
-    # Calculate ranks for MBFL formulas
-    add_mbfl_ranks(lineIdx2lineData, EXP_CONFIG)
-
-    mbfl_time = time.time() - mbfl_start_time
+    with span("mbfl") as mbfl_span:
+        for line_cnt in EXP_CONFIG["target_lines"]:
+            target_line_perc = line_cnt / 100.0
+            selection_amount = int(len(sorted_lineIdx) * target_line_perc)
+            selected_lineIdx = sorted_lineIdx[:selection_amount]
+
+            LOGGER.info(f"Selected {len(selected_lineIdx)} lines for target line percentage {target_line_perc:.2%}.")
+
+            for mut_cnt in EXP_CONFIG["mutation_cnt"]:
+                first_key = next(iter(lineIdx2mutation))
+                if f"lineCnt{line_cnt}_mutCnt{mut_cnt}tcs{EXP_CONFIG['tcs_reduction']}_all_types_transition_final_metal_score_rank" in lineIdx2lineData[first_key]:
+                    LOGGER.debug(f"Skipping line count {line_cnt} and mutation count {mut_cnt} as scores already calculated.")
+                    continue
+
+                with span("get_using_mutants", line_cnt=line_cnt, mut_cnt=mut_cnt) as get_using_mutants_span:
+                    using_mutants = get_using_mutants(lineIdx2mutation, selected_lineIdx, mut_cnt)
+                get_using_mutants_time = get_using_mutants_span.duration_sec
+                LOGGER.debug(f"[rid{rid}-{FID}b] get_using_mutants took {get_using_mutants_time:.2f} seconds.")
+
+                with span("get_overall_data", line_cnt=line_cnt, mut_cnt=mut_cnt) as get_overall_data_span:
+                    overall_data = get_overall_data(using_mutants, total_failing_tcs, line_cnt, mut_cnt, EXP_CONFIG["tcs_reduction"])
+                get_overall_data_time = get_overall_data_span.duration_sec
+                LOGGER.debug(f"[rid{rid}-{FID}b] get_overall_data took {get_overall_data_time:.2f} seconds.")
+
+                with span("measure_mbfl_susp_scores", line_cnt=line_cnt, mut_cnt=mut_cnt) as measure_mbfl_score_span:
+                    measure_mbfl_susp_scores(
+                        lineIdx2lineData, using_mutants, line_cnt, mut_cnt, EXP_CONFIG["tcs_reduction"], overall_data
+                    )
+                measure_mbfl_score_time = measure_mbfl_score_span.duration_sec
+                LOGGER.debug(f"[rid{rid}-{FID}b] measure_mbfl_susp_scores took {measure_mbfl_score_time:.2f} seconds.")
+
+        # Calculate ranks for MBFL formulas
+        add_mbfl_ranks(lineIdx2lineData, EXP_CONFIG)
+    mbfl_time = mbfl_span.duration_sec
     LOGGER.debug(f"[rid{rid}-{FID}b] MBFL took {mbfl_time:.2f} seconds.")
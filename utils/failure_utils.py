@@ -0,0 +1,38 @@
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+FAILURE_TYPES = ["ssh", "oom", "timeout", "unhealthy", "compile", "other"]
+# failures that may not happen again on another server
+TRANSIENT_FAILURES = ["ssh", "oom", "timeout", "unhealthy"]
+
+SSH_EXIT_CODE = 255
+TIMEOUT_EXIT_CODE = 124  # coreutils timeout
+KILLED_EXIT_CODE = 137  # SIGKILL, e.g., by the OOM killer
+
+OOM_MARKERS = ["java.lang.OutOfMemoryError", "Cannot allocate memory", "MemoryError", "Killed"]
+TIMEOUT_MARKERS = ["timed out", "TimeoutExpired"]
+COMPILE_MARKERS = ["BUILD FAILED", "COMPILATION ERROR", "Compilation failed"]
+COMPILE_STEPS = ["compile2prepare"]
+
+def classify_failure(step, exit_code, log_tail=None):
+    """
+    Classify the failure of a step of a bug (see BugPipeline.run).
+    :param step: Name of the failed step (e.g., "compile2prepare").
+    :param exit_code: Exit status of the command (255 when ssh fails), None if unknown.
+    :param log_tail: Last lines of the log of the step, None if unavailable.
+    :return: One of FAILURE_TYPES.
+    """
+    log_tail = log_tail or ""
+    if exit_code == KILLED_EXIT_CODE or any(marker in log_tail for marker in OOM_MARKERS):
+        return "oom"
+    if exit_code == TIMEOUT_EXIT_CODE or any(marker in log_tail for marker in TIMEOUT_MARKERS):
+        return "timeout"
+    if exit_code == SSH_EXIT_CODE:
+        return "ssh"
+    if step in COMPILE_STEPS or any(marker in log_tail for marker in COMPILE_MARKERS):
+        return "compile"
+    return "other"
+
+def is_transient_failure(failure_type):
+    return failure_type in TRANSIENT_FAILURES
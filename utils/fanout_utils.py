@@ -0,0 +1,158 @@
+"""
+Utility functions for running commands on many servers at once over ssh (asyncio subprocesses).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+import logging
+
+from utils.file_utils import ssh_command
+
+LOGGER = logging.getLogger(__name__)
+
+# sshd accepts 10 sessions per (multiplexed) connection by default (MaxSessions)
+DEFAULT_PER_HOST_LIMIT = 8
+DEFAULT_MAX_CONCURRENCY = 32
+TIMEOUT_EXIT_CODE = 124
+SSH_EXIT_CODE = 255
+# how often a command waiting for a session of its host checks again
+SESSION_POLL_SEC = 0.05
+
+# sessions of each host open in this process, shared by all threads and event loops
+# (each run_fan_out has its own semaphores, e.g., one per step of the ExtractorEngine)
+_host2sessions = {}
+_host2sessions_lock = threading.Lock()
+
+def get_host_sessions(server):
+    """
+    Process-wide semaphore of the sessions of a server (at most DEFAULT_PER_HOST_LIMIT at once).
+    """
+    with _host2sessions_lock:
+        if server not in _host2sessions:
+            _host2sessions[server] = threading.BoundedSemaphore(DEFAULT_PER_HOST_LIMIT)
+        return _host2sessions[server]
+
+async def acquire_host_session(server):
+    sessions = get_host_sessions(server)
+    # polled: a blocking acquire would stop the event loop, whose own commands may hold sessions
+    while not sessions.acquire(blocking=False):
+        await asyncio.sleep(SESSION_POLL_SEC)
+    return sessions
+
+async def run_remote(server, command, global_limit, host_limit, on_line=None, timeout_sec=None, tail_lines=20, stdin_data=None, command_builder=ssh_command):
+    """
+    Run a command on a server once a global and a per-host slot are free.
+    :param server: Remote server object.
+    :param command: Command to execute remotely.
+    :param global_limit: Semaphore shared by all commands.
+    :param host_limit: Semaphore shared by the commands of the server.
+    :param on_line: Function called with (server, line) for each output line (stdout and stderr).
+    :param timeout_sec: The command is killed after this many seconds (exit status 124).
+    :param tail_lines: Number of last output lines kept in the result (None keeps all).
+    :param stdin_data: Text written to the standard input of the command (e.g., a sudo -S password).
+    :param command_builder: Function (server, command) -> argument list.
+    :return: Result dict (host, command, exit_code, duration_sec, output).
+    """
+    async with global_limit, host_limit:
+        sessions = await acquire_host_session(server)
+        try:
+            return await run_session(server, command, on_line, timeout_sec, tail_lines, stdin_data, command_builder)
+        finally:
+            sessions.release()
+
+async def run_session(server, command, on_line, timeout_sec, tail_lines, stdin_data, command_builder):
+    """
+    Run a command on a server once a session is acquired (see run_remote).
+    """
+    started_at = time.monotonic()
+    lines = deque(maxlen=tail_lines)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command_builder(server, command),
+            stdin=asyncio.subprocess.PIPE if stdin_data is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+    except OSError as e:
+        LOGGER.error(f"Failed to start command '{command}' for server {server}: {e}")
+        return {"host": server, "command": command, "exit_code": SSH_EXIT_CODE, "duration_sec": 0.0, "output": [str(e)]}
+
+    async def communicate():
+        if stdin_data is not None:
+            process.stdin.write(stdin_data.encode())
+            await process.stdin.drain()
+            process.stdin.close()
+        async for raw_line in process.stdout:
+            line = raw_line.decode("utf-8", errors="replace").rstrip("\n")
+            lines.append(line)
+            if on_line is not None:
+                on_line(server, line)
+        return await process.wait()
+
+    try:
+        exit_code = await asyncio.wait_for(communicate(), timeout_sec)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        exit_code = TIMEOUT_EXIT_CODE
+        LOGGER.warning(f"Command '{command}' timed out on server {server} after {timeout_sec}s.")
+
+    return {
+        "host": server, "command": command, "exit_code": exit_code,
+        "duration_sec": time.monotonic() - started_at, "output": list(lines)
+    }
+
+async def fan_out(tasks, max_concurrency=DEFAULT_MAX_CONCURRENCY, per_host_limit=DEFAULT_PER_HOST_LIMIT, **kwargs):
+    """
+    Run commands on servers concurrently, at most max_concurrency at once and per_host_limit per server.
+    :param tasks: List of (server, command).
+    :param kwargs: Options of run_remote (on_line, timeout_sec, tail_lines, stdin_data, command_builder).
+    :return: List of result dicts, in the order of tasks.
+    """
+    global_limit = asyncio.Semaphore(max_concurrency)
+    host_limits = {server: asyncio.Semaphore(per_host_limit) for server, _ in tasks}
+    return await asyncio.gather(*[
+        run_remote(server, command, global_limit, host_limits[server], **kwargs) for server, command in tasks
+    ])
+
+def run_fan_out(tasks, **kwargs):
+    """
+    Run commands on servers concurrently (see fan_out) from synchronous code, e.g., a thread of the ExtractorEngine.
+    :return: List of result dicts, in the order of tasks.
+    """
+    return asyncio.run(fan_out(tasks, **kwargs))
+
+def print_host_line(server, line):
+    """
+    Stream the output of a command with a host prefix (on_line of run_remote).
+    """
+    print(f"[{server}] {line}", flush=True)
+
+def summarize_results(results):
+    """
+    Summarize results per host.
+    :return: Mapping of hosts to {"num_commands", "num_failed", "duration_sec", "exit_codes"}.
+    """
+    host2summary = {}
+    for result in results:
+        summary = host2summary.setdefault(result["host"], {"num_commands": 0, "num_failed": 0, "duration_sec": 0.0, "exit_codes": []})
+        summary["num_commands"] += 1
+        summary["num_failed"] += int(result["exit_code"] != 0)
+        summary["duration_sec"] += result["duration_sec"]
+        summary["exit_codes"].append(result["exit_code"])
+    return host2summary
+
+def format_result_table(results):
+    """
+    Format the per-host summary of results as a text table.
+    """
+    host2summary = summarize_results(results)
+    width = max([len("host")] + [len(str(host)) for host in host2summary])
+    rows = [f"{'host':<{width}}  {'commands':>8}  {'failed':>6}  {'duration':>9}  exit codes"]
+    for host, summary in sorted(host2summary.items(), key=lambda item: str(item[0])):
+        exit_codes = ",".join(str(exit_code) for exit_code in sorted(set(summary["exit_codes"])))
+        rows.append(
+            f"{str(host):<{width}}  {summary['num_commands']:>8}  {summary['num_failed']:>6}  {summary['duration_sec']:>8.1f}s  {exit_codes}"
+        )
+    return "\n".join(rows)
@@ -4,13 +4,85 @@ File utility functions for managing file/directory operations on remote servers.
     - send, receive, delete file/directories
     - copy file/directories
     - chmod of a file
+    - multiplexed ssh connections (one control connection per server)
+    - content-hashed deployment archives
 """
 
+import gzip
+import hashlib
+import io
+import os
+import tarfile
 import subprocess as sp
 import logging
 
 LOGGER = logging.getLogger(__name__)
 
+# ssh/rsync calls to the same server share one control connection (no handshake per call)
+SSH_CONTROL_DIR = os.path.expanduser("~/.ssh/d4j_extractor_cm")
+SSH_CONTROL_PERSIST = "10m"
+
+# written next to the unpacked deployment archive
+DEPLOY_HASH_FILE = ".deploy_hash"
+
+def ssh_options():
+    """
+    Options that make ssh reuse (or start) the control connection of a server.
+    :return: List of ssh options.
+    """
+    os.makedirs(SSH_CONTROL_DIR, mode=0o700, exist_ok=True)
+    return [
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={SSH_CONTROL_DIR}/%C",
+        "-o", f"ControlPersist={SSH_CONTROL_PERSIST}",
+    ]
+
+def ssh_command(server, command):
+    """
+    Build an ssh command line that runs command on the server over its control connection.
+    :param server: Remote server object.
+    :param command: Command to execute remotely.
+    :return: Argument list for subprocess.
+    """
+    return ["ssh", *ssh_options(), f"{server}", command]
+
+def rsync_command(src, dest):
+    """
+    Build an rsync command line whose ssh transport uses the control connection.
+    :param src: Source path (local or server:path).
+    :param dest: Destination path (local or server:path).
+    :return: Argument list for subprocess.
+    """
+    return ["rsync", "-e", " ".join(["ssh", *ssh_options()]), "-t", "-r", f"{src}", f"{dest}"]
+
+def open_control_connection(server):
+    """
+    Start the control connection of a server in the background (if it is not running yet).
+    :param server: Remote server object.
+    :return: True if the control connection is running, False otherwise.
+    """
+    options = ssh_options()
+    if sp.call(["ssh", *options, "-O", "check", f"{server}"], stdout=sp.DEVNULL, stderr=sp.DEVNULL) == 0:
+        return True
+    try:
+        sp.check_call(["ssh", *options, "-M", "-N", "-f", f"{server}"])
+        LOGGER.info(f"Control connection to server {server} opened.")
+        return True
+    except Exception as e:
+        LOGGER.error(f"Failed to open control connection to server {server}: {e}")
+        return False
+
+def close_control_connection(server):
+    """
+    Stop the control connection of a server.
+    :param server: Remote server object.
+    :return: True if a control connection was stopped, False otherwise.
+    """
+    res = sp.call(["ssh", *ssh_options(), "-O", "exit", f"{server}"], stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+    if res == 0:
+        LOGGER.info(f"Control connection to server {server} closed.")
+    return res == 0
+
 def make_directory(path, server):
     """
     Create a directory on the remote server.
@@ -19,7 +91,7 @@ def make_directory(path, server):
     :return: True if directory creation is successful, False otherwise.
     """
     try:
-        sp.check_call(["ssh", f"{server}", f"mkdir -p {path}"])
+        sp.check_call(ssh_command(server, f"mkdir -p {path}"))
         LOGGER.info(f"Directory {path} created on server {server}.")
         return True
     except Exception as e:
@@ -34,7 +106,7 @@ def delete_directory(path, server):
     :return: True if directory deletion is successful, False otherwise.
     """
     try:
-        sp.check_call(["ssh", f"{server}", f"rm -rf {path}"])
+        sp.check_call(ssh_command(server, f"rm -rf {path}"))
         LOGGER.info(f"Directory {path} deleted on server {server}.")
         return True
     except Exception as e:
@@ -50,7 +122,7 @@ def send_file(src, dest, server):
     :return: True if file transfer is successful, False otherwise.
     """
     try:
-        sp.check_call(["rsync", "-t", "-r", f"{src}", f"{server}:{dest}"])
+        sp.check_call(rsync_command(src, f"{server}:{dest}"))
         LOGGER.info(f"File {src} sent to {server}:{dest}.")
         return True
     except Exception as e:
@@ -66,7 +138,7 @@ def chmod_file(path, mode, server):
     :return: True if permission change is successful, False otherwise.
     """
     try:
-        sp.check_call(["ssh", f"{server}", f"chmod {mode} {path}"])
+        sp.check_call(ssh_command(server, f"chmod {mode} {path}"))
         LOGGER.info(f"Permissions of {path} changed to {mode} on server {server}.")
         return True
     except Exception as e:
@@ -82,7 +154,7 @@ def receive_file(src, dest, server):
     :return: True if file transfer is successful, False otherwise.
     """
     try:
-        sp.check_call(["rsync", "-t", "-r", f"{server}:{src}", f"{dest}"])
+        sp.check_call(rsync_command(f"{server}:{src}", dest))
         LOGGER.info(f"File {server}:{src} received to {dest}.")
         return True
     except Exception as e:
@@ -97,7 +169,7 @@ def delete_file(path, server):
     :return: True if file deletion is successful, False otherwise.
     """
     try:
-        sp.check_call(["ssh", f"{server}", f"rm -f {path}"])
+        sp.check_call(ssh_command(server, f"rm -f {path}"))
         LOGGER.info(f"File {path} deleted on server {server}.")
         return True
     except Exception as e:
@@ -113,7 +185,7 @@ def send_directory(src, dest, server):
     :return: True if directory transfer is successful, False otherwise.
     """
     try:
-        sp.check_call(["rsync", "-t", "-r", f"{src}", f"{server}:{dest}"])
+        sp.check_call(rsync_command(src, f"{server}:{dest}"))
         LOGGER.info(f"Directory {src} sent to {server}:{dest}.")
         return True
     except Exception as e:
@@ -129,9 +201,76 @@ def receive_directory(src, dest, server):
     :return: True if directory transfer is successful, False otherwise.
     """
     try:
-        sp.check_call(["rsync", "-t", "-r", f"{server}:{src}", f"{dest}"])
+        sp.check_call(rsync_command(f"{server}:{src}", dest))
         LOGGER.info(f"Directory {server}:{src} received to {dest}.")
         return True
     except Exception as e:
         LOGGER.error(f"Failed to receive directory {server}:{src} to {dest}: {e}")
         return False
+
+def build_deploy_archive(root_dir, paths, archive_path, executable_suffixes=(".sh",)):
+    """
+    Pack files and directories into a gzipped tarball whose bytes only depend on their content
+    (sorted entries, no timestamps or owners), so its hash changes only when the content does.
+    :param root_dir: Directory the archive paths are relative to.
+    :param paths: Files and directories (relative to root_dir) to pack, missing paths are skipped.
+    :param archive_path: Path of the archive to write.
+    :param executable_suffixes: Files with these suffixes are packed as executable (e.g., scripts).
+    :return: sha256 hex digest of the archive.
+    """
+    file_paths = []
+    for path in paths:
+        full_path = os.path.join(root_dir, path)
+        if os.path.isfile(full_path):
+            file_paths.append(path)
+        elif os.path.isdir(full_path):
+            for dirpath, dirnames, filenames in os.walk(full_path):
+                dirnames[:] = [dirname for dirname in dirnames if dirname != "__pycache__"]
+                for filename in filenames:
+                    if filename.endswith(".pyc"):
+                        continue
+                    file_paths.append(os.path.relpath(os.path.join(dirpath, filename), root_dir))
+        else:
+            LOGGER.warning(f"{full_path} does not exist, it is not deployed.")
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for path in sorted(file_paths):
+            with open(os.path.join(root_dir, path), 'rb') as f:
+                content = f.read()
+            info = tarfile.TarInfo(path)
+            info.size = len(content)
+            info.mode = 0o777 if path.endswith(tuple(executable_suffixes)) else 0o644
+            tar.addfile(info, io.BytesIO(content))
+
+    archive = gzip.compress(buffer.getvalue(), mtime=0)
+    with open(archive_path, 'wb') as f:
+        f.write(archive)
+    return hashlib.sha256(archive).hexdigest()
+
+def deploy_archive(archive_path, archive_hash, dest, server):
+    """
+    Unpack a deployment archive into dest on the remote server, unless the archive
+    with the same hash is already deployed there (see build_deploy_archive).
+    :param archive_path: Local path of the archive.
+    :param archive_hash: Hash of the archive.
+    :param dest: Destination directory on the remote server.
+    :param server: Remote server object.
+    :return: True if dest holds the archive, False otherwise.
+    """
+    hash_file = os.path.join(dest, DEPLOY_HASH_FILE)
+    if sp.call(ssh_command(server, f'test "$(cat {hash_file} 2>/dev/null)" = "{archive_hash}"')) == 0:
+        LOGGER.info(f"Deployment {archive_hash[:12]} is up to date on server {server}.")
+        return True
+
+    try:
+        with open(archive_path, 'rb') as f:
+            sp.check_call(
+                ssh_command(server, f"mkdir -p {dest} && tar -xzf - -C {dest} && echo {archive_hash} > {hash_file}"),
+                stdin=f
+            )
+        LOGGER.info(f"Deployment {archive_hash[:12]} unpacked to {server}:{dest}.")
+        return True
+    except Exception as e:
+        LOGGER.error(f"Failed to deploy {archive_path} to {server}:{dest}: {e}")
+        return False
@@ -78,6 +78,24 @@ def get_relevant_lines(baseline_results, linesExecutedByFailTcsBitVal):
 
     return relevant_lines
 
+def prune_mutants_to_lines(mutantIdx2mutantInfo, relevant_lines):
+    """
+    Drop mutants whose (class, line) is not one of the relevant lines.
+    Such mutants are never used downstream (get_lineIdx2mutation only maps relevant lines).
+    :param mutantIdx2mutantInfo: Mapping of mutant indices to mutant information.
+    :param relevant_lines: Mapping of line indices to line information (see get_relevant_lines).
+    :return: Mapping of the kept mutant indices to mutant information.
+    """
+    relevant_class_lines = set(
+        (lineInfo["className"], lineInfo["lineNum"]) for lineInfo in relevant_lines.values()
+    )
+
+    kept_mutants = {}
+    for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items():
+        if (mutantInfo["className"], mutantInfo["lineNumber"]) in relevant_class_lines:
+            kept_mutants[mutantIdx] = mutantInfo
+    return kept_mutants
+
 def set_relevant_line_cov_bit(relevant_tests, relevant_lines, baseline_results):
     for tcIdx, tcInfo in relevant_tests.items():
         tcCovBitVal = tcInfo["covBitVal"]
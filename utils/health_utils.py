@@ -0,0 +1,87 @@
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+def health_probe_command(work_dir):
+    """
+    Command that prints the health of a server as key=value lines (one ssh round trip):
+    free disk of the volume of work_dir, 1-minute load average, cores, available memory and whether java runs.
+    :param work_dir: Directory on the work volume (created if missing).
+    :return: Shell command.
+    """
+    return (
+        f"mkdir -p {work_dir}; "
+        f"df -Pk {work_dir} | tail -n 1 | awk '{{print \"free_disk_kb=\" $4}}'; "
+        "awk '{print \"load1=\" $1}' /proc/loadavg; "
+        "echo cores=$(nproc); "
+        "awk '/^MemAvailable:/ {print \"mem_available_kb=\" $2}' /proc/meminfo; "
+        "if java -version > /dev/null 2>&1; then echo java=1; else echo java=0; fi"
+    )
+
+def parse_health_probe(output):
+    """
+    Parse the output of the health probe command.
+    :param output: Output of health_probe_command.
+    :return: Dict with free_disk_gb, load_per_core, mem_available_gb and java (None for missing values).
+    """
+    values = {}
+    for line in output.splitlines():
+        key, sep, value = line.strip().partition("=")
+        if sep:
+            values[key] = value
+
+    def to_float(key):
+        try:
+            return float(values[key])
+        except (KeyError, ValueError):
+            return None
+
+    free_disk_kb = to_float("free_disk_kb")
+    load1 = to_float("load1")
+    cores = to_float("cores")
+    mem_available_kb = to_float("mem_available_kb")
+    return {
+        "free_disk_gb": free_disk_kb / 1024 ** 2 if free_disk_kb is not None else None,
+        "load_per_core": load1 / cores if load1 is not None and cores else None,
+        "mem_available_gb": mem_available_kb / 1024 ** 2 if mem_available_kb is not None else None,
+        "java": values.get("java") == "1",
+    }
+
+def check_server_health(health, min_free_disk_gb, max_load_per_core, min_mem_available_gb):
+    """
+    Check the health of a server against thresholds.
+    :param health: Health of the server (see parse_health_probe), None if the probe failed.
+    :param min_free_disk_gb: Minimum free disk on the work volume.
+    :param max_load_per_core: Maximum 1-minute load average per core.
+    :param min_mem_available_gb: Minimum available memory.
+    :return: List of problems, empty if the server is healthy.
+    """
+    problems = check_save_health(health, min_free_disk_gb)
+    if health is None:
+        return problems
+
+    if health["load_per_core"] is not None and health["load_per_core"] > max_load_per_core:
+        problems.append(f"load {health['load_per_core']:.2f} per core > {max_load_per_core}")
+    if health["mem_available_gb"] is not None and health["mem_available_gb"] < min_mem_available_gb:
+        problems.append(f"available memory {health['mem_available_gb']:.1f} GB < {min_mem_available_gb} GB")
+    if not health["java"]:
+        problems.append("java is not available")
+    return problems
+
+def check_save_health(health, min_free_disk_gb):
+    """
+    Check whether the results of a finished bug can be saved on a server: it is reachable and its disk is not full
+    (load and memory only matter for the admission of new bugs, see check_server_health).
+    :param health: Health of the server (see parse_health_probe), None if the probe failed.
+    :param min_free_disk_gb: Minimum free disk on the work volume.
+    :return: List of problems, empty if the results can be saved.
+    """
+    if health is None:
+        return ["unreachable"]
+
+    problems = []
+    if health["free_disk_gb"] is None:
+        problems.append("free disk is unknown")
+    elif health["free_disk_gb"] < min_free_disk_gb:
+        problems.append(f"free disk {health['free_disk_gb']:.1f} GB < {min_free_disk_gb} GB")
+    return problems
@@ -0,0 +1,48 @@
+import os
+import resource
+import tracemalloc
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+MB = 1024 ** 2
+
+def get_rss_mb():
+    """
+    Resident set size of this process (from /proc/self/statm, the peak RSS where /proc is unavailable).
+    :return: RSS in MB.
+    """
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, IndexError):
+        return get_peak_rss_mb()
+
+def get_peak_rss_mb():
+    """
+    Peak resident set size of this process since it started.
+    :return: Peak RSS in MB.
+    """
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def get_top_allocations(snapshot, limit=10):
+    """
+    Largest allocation sites of a tracemalloc snapshot.
+    :param snapshot: tracemalloc.Snapshot.
+    :param limit: Number of allocation sites.
+    :return: List of {"location", "size_mb", "count"}, largest first.
+    """
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_mb": stat.size / MB,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
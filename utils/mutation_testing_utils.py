@@ -11,28 +11,59 @@ def list_all_tests(PID, BID, EL, CORE, SCRIPTS_DIR):
         except sp.CalledProcessError as e:
             LOGGER.error(f"Listing tests for core {CORE} failed with error: {e}")
 
-def instrument(PID, BID, EL, CORE, WORK_NAME, SCRIPTS_DIR, srcClassPath=None):
+def instrument(PID, BID, EL, CORE, WORK_NAME, SCRIPTS_DIR, srcClassPath=None, env=None):
     command = f"./2_instrument.sh {PID} {BID} {EL} {CORE}"
     try:
-        sp.check_call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL, cwd=SCRIPTS_DIR)
+        sp.check_call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL, cwd=SCRIPTS_DIR, env=env)
         LOGGER.info(f"Instrumentation for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{srcClassPath} completed successfully.")
+        return True
     except sp.CalledProcessError as e:
         LOGGER.error(f"Instrumentation for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME} failed with error: {e}")
+        return False
 
-def execute_with_coverage(PID, BID, EL, CORE, WORK_NAME, TARGET_TESTS, SCRIPTS_DIR, srcClassPath=None, timeout=None):
+def execute_with_coverage(PID, BID, EL, CORE, WORK_NAME, TARGET_TESTS, SCRIPTS_DIR, srcClassPath=None, timeout=None, env=None):
+    """
+    Execute the target tests with coverage.
+    :param env: Environment of the script (e.g., with CORE_WORKSPACE set), inherited when None.
+    :return: True if the execution is successful, False otherwise.
+    :raises sp.TimeoutExpired: If the execution exceeds timeout (the caller decides how to record it).
+    """
     command = f"./3_execute_with_coverage.sh {PID} {BID} {EL} {CORE} {TARGET_TESTS}"
     try:
-        sp.check_call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL, cwd=SCRIPTS_DIR, timeout=timeout)
+        sp.check_call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL, cwd=SCRIPTS_DIR, timeout=timeout, env=env)
         LOGGER.info(f"Execution with coverage for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{TARGET_TESTS}-{srcClassPath} completed successfully.")
+        return True
     except sp.TimeoutExpired:
         LOGGER.warning(f"Execution with coverage for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{TARGET_TESTS} timed out")
+        raise
     except sp.CalledProcessError as e:
         LOGGER.error(f"Execution with coverage for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{TARGET_TESTS} failed with error: {e}")
+        return False
 
-def process_cov(PID, BID, EL, CORE, WORK_NAME, SCRIPTS_DIR, srcClassPath=None):
+def execute_outcomes(PID, BID, EL, CORE, WORK_NAME, TARGET_TESTS, SCRIPTS_DIR, srcClassPath=None, timeout=None, env=None):
+    """
+    Execute the target tests without coverage, only their outcomes are written to tests.csv.
+    :return: True if the execution is successful, False otherwise.
+    :raises sp.TimeoutExpired: If the execution exceeds timeout (the caller decides how to record it).
+    """
+    command = f"./3_execute_outcomes.sh {PID} {BID} {EL} {CORE} {TARGET_TESTS} {WORK_NAME}"
+    try:
+        sp.check_call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL, cwd=SCRIPTS_DIR, timeout=timeout, env=env)
+        LOGGER.info(f"Execution of outcomes for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{TARGET_TESTS}-{srcClassPath} completed successfully.")
+        return True
+    except sp.TimeoutExpired:
+        LOGGER.warning(f"Execution of outcomes for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{TARGET_TESTS} timed out")
+        raise
+    except sp.CalledProcessError as e:
+        LOGGER.error(f"Execution of outcomes for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{TARGET_TESTS} failed with error: {e}")
+        return False
+
+def process_cov(PID, BID, EL, CORE, WORK_NAME, SCRIPTS_DIR, srcClassPath=None, env=None):
     command = f"./4_process_cov.sh {PID} {BID} {EL} {CORE} {WORK_NAME}"
     try:
-        sp.check_call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL, cwd=SCRIPTS_DIR)
+        sp.check_call(command, shell=True, stderr=sp.DEVNULL, stdout=sp.DEVNULL, cwd=SCRIPTS_DIR, env=env)
         LOGGER.info(f"Process coverage for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME}-{srcClassPath} completed successfully.")
+        return True
     except sp.CalledProcessError as e:
         LOGGER.error(f"Process coverage for {PID}-{BID}-{EL}-core{CORE}-{WORK_NAME} failed with error: {e}")
+        return False
@@ -0,0 +1,76 @@
+from utils.sbfl_utils import measure_spectrum, measure_sbfl_susp_scores, get_sorted_lineIdx
+from utils.rank_utils import add_sbfl_ranks
+
+import random
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+def get_baseline_lineIdx2lineData(relevant_tests, relevant_lines):
+    """
+    Build the lineIdx2lineData/tcIdx2tcInfo pair that the constructor reads from the DB,
+    directly from the baseline results (line and test indices are reset as in SaverEngine).
+    :param relevant_tests: Mapping of test indices to test information, with relCovBitVal set (see set_relevant_line_cov_bit).
+    :param relevant_lines: Mapping of line indices to line information (see get_relevant_lines).
+    :return: (lineIdx2lineData, tcIdx2tcInfo)
+    """
+    lineIdx2lineData = {}
+    for newLineIdx, lineInfo in enumerate(relevant_lines.values()):
+        lineIdx2lineData[newLineIdx] = {
+            "class": lineInfo["className"],
+            "method": lineInfo["methodName"],
+            "line_num": lineInfo["lineNum"]
+        }
+
+    tcIdx2tcInfo = {}
+    for newTcIdx, tcInfo in enumerate(relevant_tests.values()):
+        tcIdx2tcInfo[newTcIdx] = {
+            "result": tcInfo["result"],
+            "line_coverage_bit_sequence": format(tcInfo["relCovBitVal"], f'0{len(relevant_lines)}b')
+        }
+
+    return lineIdx2lineData, tcIdx2tcInfo
+
+def select_target_lines(lineIdx2lineData, tcIdx2tcInfo, line_selection_formula, target_line_perc):
+    """
+    Rank the lines with the SBFL formula and select the top lines, as the constructor does.
+    :param line_selection_formula: SBFL formula used to rank the lines (e.g., ochiai).
+    :param target_line_perc: Percentage of lines to select (0.0 - 1.0).
+    :return: List of selected (lineIdx, rank) pairs.
+    """
+    measure_spectrum(tcIdx2tcInfo, lineIdx2lineData)
+    measure_sbfl_susp_scores(lineIdx2lineData)
+    add_sbfl_ranks(lineIdx2lineData)
+    sorted_lineIdx = get_sorted_lineIdx(lineIdx2lineData, line_selection_formula)
+
+    selection_amount = int(len(sorted_lineIdx) * target_line_perc)
+    return sorted_lineIdx[:selection_amount]
+
+def sample_mutants(mutantIdx2mutantInfo, lineIdx2lineData, selected_lineIdx, mut_cnt, reserve_cnt, seed):
+    """
+    Draw up to mut_cnt (+ reserve_cnt) mutants for each selected line.
+    :param mutantIdx2mutantInfo: Mapping of mutant indices to mutant information.
+    :param lineIdx2lineData: Mapping of line indices to line data.
+    :param selected_lineIdx: List of selected (lineIdx, rank) pairs.
+    :param mut_cnt: Number of mutants the constructor uses per line.
+    :param reserve_cnt: Number of extra mutants per line kept for later repeats.
+    :param seed: Seed of the random generator.
+    :return: (sampled mutant indices, reserve mutant indices)
+    """
+    classLine2mutantIdxs = {}
+    for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items():
+        key = (mutantInfo["className"], mutantInfo["lineNumber"])
+        classLine2mutantIdxs.setdefault(key, []).append(mutantIdx)
+
+    rng = random.Random(seed)
+    sampled_mutants = []
+    reserve_mutants = []
+    for lineIdx, rank in selected_lineIdx:
+        line_data = lineIdx2lineData[lineIdx]
+        candidates = sorted(classLine2mutantIdxs.get((line_data["class"], line_data["line_num"]), []))
+        drawn = rng.sample(candidates, min(len(candidates), mut_cnt + reserve_cnt))
+        sampled_mutants.extend(drawn[:mut_cnt])
+        reserve_mutants.extend(drawn[mut_cnt:])
+
+    LOGGER.info(f"Sampled {len(sampled_mutants)} (+{len(reserve_mutants)} reserve) mutants on {len(selected_lineIdx)} lines.")
+    return sampled_mutants, reserve_mutants
@@ -0,0 +1,195 @@
+import math
+import random
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+def estimate_mutant_costs(mutantIdx2mutantInfo, baseline_results, relevant_tests, overhead_ms=0.0):
+    """
+    Estimate the cost of executing each mutant from the baseline durations of the
+    relevant tests that cover the mutated line (tests that do not reach the mutant behave as in the baseline).
+    :param mutantIdx2mutantInfo: Mapping of mutant indices to mutant information.
+    :param baseline_results: Baseline results (see MutationTestingEngine.get_results).
+    :param relevant_tests: Mapping of test indices to relevant test information.
+    :param overhead_ms: Fixed per-mutant cost (instrumentation, report generation).
+    :return: Mapping of mutant indices to estimated cost in milliseconds.
+    """
+    num_lines = len(baseline_results["lineIdx2lineInfo"])
+    classLine2lineIdx = {
+        (lineInfo["className"], lineInfo["lineNum"]): lineIdx
+        for lineIdx, lineInfo in baseline_results["lineIdx2lineInfo"].items()
+    }
+
+    lineIdx2cost = {}
+    mutantIdx2cost = {}
+    for mutantIdx, mutantInfo in mutantIdx2mutantInfo.items():
+        lineIdx = classLine2lineIdx.get((mutantInfo["className"], mutantInfo["lineNumber"]))
+        if lineIdx is None:
+            mutantIdx2cost[mutantIdx] = overhead_ms
+            continue
+
+        if lineIdx not in lineIdx2cost:
+            # the coverage bit sequence is written with line 0 as the most significant bit
+            line_bit = 1 << (num_lines - 1 - lineIdx)
+            lineIdx2cost[lineIdx] = sum(
+                tcInfo["duration_ms"] for tcInfo in relevant_tests.values()
+                if tcInfo["covBitVal"] & line_bit
+            )
+        mutantIdx2cost[mutantIdx] = overhead_ms + lineIdx2cost[lineIdx]
+
+    return mutantIdx2cost
+
+def estimate_bug_cost(measurement):
+    """
+    Estimate the mutation testing time of a bug from its time measurement
+    (a row of d4j_time_measurement_info): the baseline run plus, for each mutant,
+    instrumentation, execution of the relevant tests and report processing.
+    The mutants are those left after pruning and sampling (num_executed_mutants) when they were measured.
+    :param measurement: Mapping of d4j_time_measurement_info columns to values.
+    :return: Estimated cost in seconds of one core.
+    """
+    per_mutant_sec = (
+        measurement["instr_duration_sec"]
+        + measurement["relevant_test_total_time_ms"] / 1000
+        + measurement["process_duration_sec"]
+    )
+    baseline_sec = (
+        measurement["instr_duration_sec"]
+        + measurement["exec_duration_sec"]
+        + measurement["process_duration_sec"]
+    )
+    num_mutants = measurement.get("num_executed_mutants")
+    if num_mutants is None:
+        num_mutants = measurement["num_mutants"]
+    return baseline_sec + num_mutants * per_mutant_sec
+
+def fit_bug_cost_model(bid2cost):
+    """
+    Fit the fallback cost of bugs without a time measurement: the median cost of the measured bugs.
+    :param bid2cost: Mapping of measured bug IDs to estimated cost in seconds.
+    :return: Fallback cost in seconds (1.0 when no bug is measured, i.e., all bugs cost the same).
+    """
+    costs = sorted(bid2cost.values())
+    if not costs:
+        return 1.0
+    mid = len(costs) // 2
+    if len(costs) % 2 == 1:
+        return costs[mid]
+    return (costs[mid - 1] + costs[mid]) / 2
+
+def estimate_bug_costs(bid_list, measurements):
+    """
+    Estimate the cost of each bug, measured bugs from their time measurement
+    (the mean when a bug was measured more than once), the others with fit_bug_cost_model.
+    :param bid_list: List of bug IDs to estimate.
+    :param measurements: List of d4j_time_measurement_info rows (mappings with a "bid" key).
+    :return: (mapping of bug IDs to estimated cost in seconds, list of bug IDs estimated by the model).
+    """
+    bid2costs = {}
+    for measurement in measurements:
+        bid2costs.setdefault(str(measurement["bid"]), []).append(estimate_bug_cost(measurement))
+    bid2measured = {
+        bid: sum(costs) / len(costs) for bid, costs in bid2costs.items() if bid in bid_list
+    }
+
+    fallback_cost = fit_bug_cost_model(bid2measured)
+    bid2cost = {}
+    modeled_bids = []
+    for bid in bid_list:
+        if bid in bid2measured:
+            bid2cost[bid] = bid2measured[bid]
+        else:
+            bid2cost[bid] = fallback_cost
+            modeled_bids.append(bid)
+
+    LOGGER.info(f"Estimated the cost of {len(bid_list) - len(modeled_bids)} bugs from time measurements, {len(modeled_bids)} bugs with the fallback cost {fallback_cost:.1f}s.")
+    return bid2cost, modeled_bids
+
+def compute_server_slots(capacity, parallel, bug_memory_gb, bug_disk_gb):
+    """
+    Compute how many bugs a server can process at once, so that the cores, memory and
+    free disk space needed by its bugs fit the server.
+    :param capacity: Capacity of the server ("cores", "memory_gb", "free_disk_gb", optional "slots" to override), missing keys are not limiting.
+    :param parallel: Number of cores used per bug (-p).
+    :param bug_memory_gb: Memory used per bug (e.g., the PIT heap).
+    :param bug_disk_gb: Disk space used per bug (checkout, mutants and results).
+    :return: Number of slots (at least 1).
+    """
+    if "slots" in capacity:
+        return max(int(capacity["slots"]), 1)
+
+    limits = []
+    if "cores" in capacity:
+        limits.append(int(capacity["cores"]) // max(parallel, 1))
+    if "memory_gb" in capacity and bug_memory_gb > 0:
+        limits.append(int(capacity["memory_gb"] // bug_memory_gb))
+    if "free_disk_gb" in capacity and bug_disk_gb > 0:
+        limits.append(int(capacity["free_disk_gb"] // bug_disk_gb))
+    if not limits:
+        return 1
+    return max(min(limits), 1)
+
+def partition_cores(num_cores, num_slots, parallel):
+    """
+    Assign disjoint cores to the slots of a machine, parallel cores per slot
+    (fewer, evenly split, if the machine has less than num_slots x parallel cores).
+    :param num_cores: Number of cores of the machine.
+    :param num_slots: Number of slots (bugs processed at once).
+    :param parallel: Number of cores used per bug (-p).
+    :return: List of the core lists of the slots.
+    """
+    cores_per_slot = max(min(parallel, num_cores // max(num_slots, 1)), 1)
+    return [
+        [(slot * cores_per_slot + core) % num_cores for core in range(cores_per_slot)]
+        for slot in range(num_slots)
+    ]
+
+def format_cpu_list(cores):
+    """
+    Format cores as a cpu list (e.g., "0-9,12") for taskset -c.
+    """
+    ranges = []
+    for core in sorted(set(cores)):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(f"{start}-{end}" if start != end else f"{start}" for start, end in ranges)
+
+def synthetic_bug_costs(num_bugs, median_sec=3600.0, sigma=1.0, seed=0):
+    """
+    Draw bug costs from a log-normal distribution (a few bugs take much longer than the median).
+    :param num_bugs: Number of bugs (IDs "1" to "<num_bugs>").
+    :param median_sec: Median cost in seconds.
+    :param sigma: Standard deviation of the logarithm of the cost.
+    :param seed: Random seed.
+    :return: Mapping of bug IDs to cost in seconds.
+    """
+    rng = random.Random(seed)
+    return {str(bid): rng.lognormvariate(math.log(median_sec), sigma) for bid in range(1, num_bugs + 1)}
+
+def perturb_costs(task2cost, sigma=0.3, seed=0):
+    """
+    Draw actual durations around estimated costs (a log-normal estimation error), e.g., for the ClusterSimulator.
+    :param task2cost: Mapping of task IDs to estimated cost.
+    :param sigma: Standard deviation of the logarithm of the error (0 for exact estimates).
+    :param seed: Random seed.
+    :return: Mapping of task IDs to actual duration.
+    """
+    rng = random.Random(seed)
+    return {task_id: cost * rng.lognormvariate(0.0, sigma) for task_id, cost in task2cost.items()}
+
+def get_shard(mutantIdxs, shard_index, num_shards):
+    """
+    Select the contiguous range of (sorted) mutant indices of a shard.
+    :param mutantIdxs: Mutant indices of the bug.
+    :param shard_index: Index of the shard (0 <= shard_index < num_shards).
+    :param num_shards: Number of shards.
+    :return: Sorted list of the mutant indices of the shard.
+    """
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"Shard {shard_index} is out of range for {num_shards} shards.")
+    mutantIdxs = sorted(mutantIdxs)
+    start = len(mutantIdxs) * shard_index // num_shards
+    end = len(mutantIdxs) * (shard_index + 1) // num_shards
+    return mutantIdxs[start:end]
@@ -0,0 +1,113 @@
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+def summarize_progress(events, now, num_slowest=5):
+    """
+    Summarize the progress events of an experiment (see Telemetry).
+    :param events: List of events (dicts with ts, pid, bid, server, event, stage, data), in any order.
+    :param now: Current time (seconds since the epoch).
+    :param num_slowest: Number of in-flight bugs to list.
+    :return: Dict with num_bugs, num_finished, num_failed, bugs_per_hour, eta_sec, server2mutants_per_sec,
+             stage2mean_sec and the slowest in-flight bugs.
+    """
+    events = sorted(events, key=lambda event: event["ts"])
+    if not events:
+        return {
+            "num_bugs": 0, "num_finished": 0, "num_failed": 0, "num_running": 0, "elapsed_sec": 0.0,
+            "bugs_per_hour": 0.0, "eta_sec": None, "server2mutants_per_sec": {}, "stage2mean_sec": {}, "slowest": []
+        }
+    started_at = events[0]["ts"]
+
+    pid2bids = {}  # pid -> bugs of all runs (e.g., a re-run of the failed bugs adds none)
+    pid2num_bugs = {}  # pid -> number of bugs of the latest run, for runs without bug IDs
+    bug2state = {}  # (pid, bid) -> {"server", "started_at", "stage", "done", "total", "finished"}
+    stage2durations = {}
+    server2mutants = {}  # server -> {"done", "first_ts", "last_ts"}
+    bug2mutants_done = {}  # (pid, bid, server) -> mutants done
+    for event in events:
+        key = (event["pid"], event["bid"])
+        data = event.get("data") or {}
+        if event["event"] == "run_started":
+            if "bids" in data:
+                pid2bids.setdefault(event["pid"], set()).update(data["bids"])
+            else:
+                pid2num_bugs[event["pid"]] = data.get("num_bugs", 0)
+        elif event["event"] == "bug_started":
+            bug2state[key] = {"server": event["server"], "started_at": event["ts"], "stage": None, "done": None, "total": None, "finished": None}
+        elif event["event"] == "bug_finished" and key in bug2state:
+            bug2state[key]["finished"] = bool(data.get("success"))
+        elif event["event"] == "stage_started" and key in bug2state:
+            bug2state[key]["stage"] = event["stage"]
+        elif event["event"] == "stage_finished":
+            stage2durations.setdefault(event["stage"], []).append(data.get("duration_sec", 0.0))
+        elif event["event"] == "progress" and event["stage"] == "mutants":
+            if key in bug2state:
+                bug2state[key].update({"done": data.get("done"), "total": data.get("total")})
+            server = server2mutants.setdefault(event["server"], {"done": 0, "first_ts": event["ts"], "last_ts": event["ts"]})
+            mutant_key = (event["pid"], event["bid"], event["server"])
+            server["done"] += data.get("done", 0) - bug2mutants_done.get(mutant_key, 0)
+            bug2mutants_done[mutant_key] = data.get("done", 0)
+            server["last_ts"] = event["ts"]
+
+    num_bugs = sum(len(pid2bids[pid]) if pid in pid2bids else pid2num_bugs[pid] for pid in set(pid2bids) | set(pid2num_bugs))
+    num_finished = len([state for state in bug2state.values() if state["finished"] is True])
+    num_failed = len([state for state in bug2state.values() if state["finished"] is False])
+    running = [(key, state) for key, state in bug2state.items() if state["finished"] is None]
+    elapsed_sec = now - started_at
+    bugs_per_hour = num_finished / (elapsed_sec / 3600) if elapsed_sec > 0 else 0.0
+
+    remaining = max(num_bugs - num_finished - num_failed, len(running))
+    eta_sec = remaining / bugs_per_hour * 3600 if bugs_per_hour > 0 else None
+
+    slowest = sorted(running, key=lambda item: item[1]["started_at"])[:num_slowest]
+    return {
+        "num_bugs": num_bugs,
+        "num_finished": num_finished,
+        "num_failed": num_failed,
+        "num_running": len(running),
+        "elapsed_sec": elapsed_sec,
+        "bugs_per_hour": bugs_per_hour,
+        "eta_sec": eta_sec,
+        "server2mutants_per_sec": {
+            server: stats["done"] / (stats["last_ts"] - stats["first_ts"]) if stats["last_ts"] > stats["first_ts"] else 0.0
+            for server, stats in server2mutants.items()
+        },
+        "stage2mean_sec": {stage: sum(durations) / len(durations) for stage, durations in stage2durations.items()},
+        "slowest": [
+            {
+                "pid": pid, "bid": bid, "server": state["server"], "elapsed_sec": now - state["started_at"],
+                "stage": state["stage"], "done": state["done"], "total": state["total"]
+            }
+            for (pid, bid), state in slowest
+        ],
+    }
+
+def format_duration(seconds):
+    if seconds is None:
+        return "unknown"
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m"
+
+def format_status(summary):
+    """
+    Format a progress summary (see summarize_progress) for the terminal.
+    """
+    lines = [
+        f"bugs: {summary['num_finished']} finished, {summary['num_failed']} failed, {summary['num_running']} running of {summary['num_bugs']}",
+        f"elapsed: {format_duration(summary['elapsed_sec'])}, {summary['bugs_per_hour']:.2f} bugs/hour, ETA: {format_duration(summary['eta_sec'])}",
+    ]
+    if summary["stage2mean_sec"]:
+        lines.append("mean stage durations: " + ", ".join(
+            f"{stage} {duration:.0f}s" for stage, duration in sorted(summary["stage2mean_sec"].items())
+        ))
+    if summary["server2mutants_per_sec"]:
+        lines.append("mutants/sec per server:")
+        for server, rate in sorted(summary["server2mutants_per_sec"].items()):
+            lines.append(f"  {server}: {rate:.2f}")
+    if summary["slowest"]:
+        lines.append("slowest in-flight bugs:")
+        for bug in summary["slowest"]:
+            progress = f", {bug['done']}/{bug['total']} mutants" if bug["total"] else ""
+            lines.append(f"  {bug['pid']}-{bug['bid']} on {bug['server']}: {format_duration(bug['elapsed_sec'])} ({bug['stage']}{progress})")
+    return "\n".join(lines)
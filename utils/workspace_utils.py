@@ -0,0 +1,66 @@
+"""
+Workspace utility functions for placing the core directories of mutation testing
+in a scratch (e.g., RAM-backed tmpfs) directory.
+    - measure directory sizes
+    - decide which cores fit in the workspace
+    - check whether the workspace still has room for a core
+"""
+
+import os
+import shutil
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+def get_directory_size(path):
+    """
+    Get the total size of the files in a directory.
+    :param path: Path of the directory.
+    :return: Size in bytes.
+    """
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for filename in files:
+            file_path = os.path.join(root, filename)
+            if not os.path.islink(file_path):
+                total += os.path.getsize(file_path)
+    return total
+
+def get_free_space(path):
+    """
+    Get the free space of the file system a directory is on.
+    :param path: Path of the directory.
+    :return: Free space in bytes, 0 if the directory cannot be read.
+    """
+    try:
+        return shutil.disk_usage(path).free
+    except OSError as e:
+        LOGGER.error(f"Failed to read free space of {path}: {e}")
+        return 0
+
+def assign_core_workspaces(num_cores, core_bytes, cap_bytes, free_bytes):
+    """
+    Decide which cores are placed in the workspace, the others fall back to disk.
+    :param num_cores: Number of cores.
+    :param core_bytes: Estimated size of one core directory.
+    :param cap_bytes: Size cap of the workspace.
+    :param free_bytes: Free space of the workspace file system.
+    :return: List of cores placed in the workspace.
+    """
+    limit = min(cap_bytes, free_bytes)
+    if core_bytes <= 0:
+        return list(range(num_cores)) if limit > 0 else []
+    return list(range(min(num_cores, limit // core_bytes)))
+
+def workspace_has_room(workspace_dir, core_bytes, cap_bytes):
+    """
+    Check whether a workspace still has room for the cores placed in it, which grow while they run
+    (e.g., gzoltar.ser and reports): the file system has room for one more core and the workspace is within its cap.
+    :param workspace_dir: Path of the workspace.
+    :param core_bytes: Estimated size of one core directory.
+    :param cap_bytes: Size cap of the workspace.
+    :return: True if the workspace has room.
+    """
+    if get_free_space(workspace_dir) < core_bytes:
+        return False
+    return get_directory_size(workspace_dir) <= cap_bytes